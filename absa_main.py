@@ -5,16 +5,29 @@ This module provides the main interface for the Aspect-Based Sentiment Analysis
 It integrates all components and provides easy-to-use classes and functions.
 """
 
+import argparse
+import contextlib
 import sys
 import os
+import time
 
 # Add src directory to path for imports
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
-from src.core.absa_engine import aspect_sentiment_analysis
-from src.models.model_manager import get_model_manager
-from src.utils.text_processing import get_stopwords
-from tests.test_cases import get_test_runner
+from config.settings import (
+    BATCH_SIZE, CHECKPOINT_INTERVAL, CPU_AFFINITY, ENGINE_MODE, MAX_DOCUMENT_CHARS, METRICS_ENABLED,
+    OVERSIZE_POLICY, PARALLEL_PRELOAD, SINGLE_PASS, RESULT_CACHE_SIZE, RESULT_CACHE_PATH, SCORING_MODE,
+    SENTENCE_CACHE_SIZE, SERVER_HOST, SERVER_PORT, SERVER_MAX_BATCH_SIZE, SERVER_MAX_WAIT_MS,
+    STANZA_PROBE_TEXT, TORCH_AUTOTUNE, TORCH_INTRA_OP_THREADS
+)
+from src.utils.cache import LRUCache, ResultCache
+from src.utils.checkpoint import Checkpoint
+from src.utils.corpus_io import FORMATS, DeadLetterWriter, ResultWriter, read_documents
+from src.utils.metrics import get_metrics_registry
+
+# NLTK, Stanza (and torch through it) take seconds to import, so the engine,
+# model and test modules are imported where they are first needed; this
+# keeps '--help' and other light commands fast.
 
 
 class ABSAAnalyzer:
@@ -22,89 +35,459 @@ class ABSAAnalyzer:
     Main ABSA Analyzer class that encapsulates all functionality.
     """
     
-    def __init__(self):
-        """Initialize the ABSA analyzer with required components."""
+    def __init__(self, single_pass=SINGLE_PASS, batch_size=BATCH_SIZE,
+                 cache_size=RESULT_CACHE_SIZE, cache_path=RESULT_CACHE_PATH,
+                 sentence_cache_size=SENTENCE_CACHE_SIZE, metrics=None, lazy=False,
+                 scoring=SCORING_MODE, engine=ENGINE_MODE, router=None):
+        """
+        Initialize the ABSA analyzer with required components.
+        
+        Args:
+            single_pass (bool): Use the single-pass Stanza-driven engine mode
+            batch_size (int): Documents per Stanza bulk call in batch analysis
+            cache_size (int): In-memory result cache entries (0 disables the cache)
+            cache_path (str): SQLite file for a persistent result cache shared across processes
+            sentence_cache_size (int): Parsed sentences kept for reuse across documents (0 disables)
+            metrics (MetricsRegistry): Registry receiving stage timings and counters
+                (defaults to the global registry when METRICS_ENABLED is set)
+            lazy (bool): Load the models on first use (or warmup()) instead of now
+            scoring (str): Default scoring mode, 'aspect' or 'context' (see
+                absa_engine.score_aspects); analysis calls can override it
+            engine (str): Default engine mode, 'stanza' or 'rules' (see
+                absa_engine.prepare_rule_sentence); analysis calls can override it
+            router (EngineRouter): Picks the engine per document in analyze_routed()
+                (see src/core/routing.py)
+        """
+        from src.core.absa_engine import check_engine, check_scoring, engine_fingerprint
+        
+        check_scoring(scoring)
+        check_engine(engine)
         print("Initializing ABSA Analyzer...")
         
-        self.model_manager = get_model_manager()
-        self.test_runner = get_test_runner()
+        self.single_pass = single_pass
+        self.batch_size = batch_size
+        self.scoring = scoring
+        self.engine = engine
+        self.router = router
+        self.cache = None
+        if cache_size or cache_path:
+            # Keys are built from the text as the engine truncates it
+            max_chars = MAX_DOCUMENT_CHARS if OVERSIZE_POLICY == 'truncate' else None
+            self.cache = ResultCache(engine_fingerprint(single_pass, scoring, engine),
+                                     cache_size, cache_path, max_chars=max_chars)
+        self.sentence_cache = LRUCache(sentence_cache_size) if sentence_cache_size else None
+        if metrics is None and METRICS_ENABLED:
+            metrics = get_metrics_registry()
+        self.metrics = metrics
+        self.model_manager = None
+        self.nlp = None
+        self.sid = None
+        self.stop_words = None
+        self._load_attempted = False
+        
+        if not lazy:
+            self.load()
+    
+    def load(self):
+        """
+        Load the models unless already attempted.
         
-        # Setup models
+        Returns:
+            bool: True if the analyzer is ready
+        """
+        if self._load_attempted:
+            return self.is_ready()
+        self._load_attempted = True
+        
+        from src.models.model_manager import get_model_manager
+        from src.utils.text_processing import get_stopwords
+        
+        self.model_manager = get_model_manager()
         if self.model_manager.setup_all():
             self.nlp, self.sid = self.model_manager.get_models()
             self.stop_words = get_stopwords()
             print("✓ ABSA Analyzer ready!")
         else:
             print("✗ Failed to initialize ABSA Analyzer")
-            self.nlp = None
-            self.sid = None
-            self.stop_words = None
+        return self.is_ready()
     
-    def analyze(self, text):
+    def warmup(self, text=STANZA_PROBE_TEXT):
+        """
+        Load the models and analyze one text so the first real request is fast.
+        
+        Besides loading, this triggers NLTK's lazily loaded tokenizer and tagger
+        data. Servers should call it before reporting readiness.
+        
+        Args:
+            text (str): Text analyzed once, bypassing the caches
+            
+        Returns:
+            bool: True if the analyzer is ready
+        """
+        from src.core.absa_engine import aspect_sentiment_analysis
+        
+        if not self.load():
+            return False
+        aspect_sentiment_analysis(text, self.stop_words, self.nlp, self.sid,
+                                  single_pass=self.single_pass, engine=self.engine)
+        return True
+    
+    @property
+    def test_runner(self):
+        """The global TestRunner (imported on first use)."""
+        from tests.test_cases import get_test_runner
+        return get_test_runner()
+    
+    def analyze(self, text, scoring=None, engine=None):
         """
         Analyze text for aspects and sentiments.
         
         Args:
             text (str): Input text to analyze
+            scoring (str): Scoring mode for this call (defaults to self.scoring)
+            engine (str): Engine mode for this call (defaults to self.engine)
             
         Returns:
             list: List of [aspect, sentiment_score] pairs
         """
-        if not self.is_ready():
+        from src.core.absa_engine import aspect_sentiment_analysis
+        
+        if not self.load():
             print("Analyzer not properly initialized!")
             return []
         
+        scoring = scoring or self.scoring
+        engine = engine or self.engine
+        cache = self._result_cache(scoring, engine)
+        start = time.perf_counter() if self.metrics is not None else 0.0
+        cached = self._cache_get(cache, text)
+        if cached is not None:
+            if self.metrics is not None:
+                self.metrics.lap('analyze', start)
+            return cached
+        
         try:
-            return aspect_sentiment_analysis(text, self.stop_words, self.nlp, self.sid)
+            results = aspect_sentiment_analysis(text, self.stop_words, self.nlp, self.sid,
+                                                single_pass=self.single_pass,
+                                                sentence_cache=self.sentence_cache,
+                                                metrics=self.metrics, scoring=scoring,
+                                                engine=engine)
         except Exception as e:
             print(f"Error during analysis: {e}")
+            if self.metrics is not None:
+                self.metrics.increment('errors')
             return []
+        
+        if cache is not None:
+            cache.put(text, results)
+        if self.metrics is not None:
+            self.metrics.lap('analyze', start)
+        return results
     
-    def analyze_with_details(self, text):
+    def analyze_batch(self, texts, batch_size=None, return_exceptions=False, scoring=None,
+                      details=False, engine=None):
+        """
+        Analyze many texts, parsing their sentences in Stanza bulk calls.
+        
+        Args:
+            texts (iterable): Input texts to analyze
+            batch_size (int): Documents per Stanza bulk call (defaults to self.batch_size)
+            return_exceptions (bool): Return a failed document's exception instead of []
+            scoring (str): Scoring mode for this call (defaults to self.scoring)
+            details (bool): Return [aspect, sentiment_score, sentence_index, linked_words]
+                records instead of pairs (not served from the result cache)
+            engine (str): Engine mode for this call (defaults to self.engine)
+            
+        Returns:
+            list: One list of [aspect, sentiment_score] pairs (or detail records) per input text
+        """
+        return self._analyze_batch(texts, batch_size, return_exceptions, scoring, details, engine)[0]
+    
+    def _analyze_batch(self, texts, batch_size=None, return_exceptions=False, scoring=None,
+                       details=False, engine=None):
+        """
+        Analyze many texts like analyze_batch(), also reporting what was actually analyzed.
+        
+        Returns:
+            tuple: (results, analyzed) where analyzed lists the distinct texts
+                that went through the engine, i.e. were not served from the result cache
+        """
+        from src.core.absa_engine import aspect_sentiment_analysis_batch
+        
+        texts = list(texts)
+        if not self.load():
+            print("Analyzer not properly initialized!")
+            return [[] for _ in texts], []
+        
+        batch_size = batch_size or self.batch_size
+        scoring = scoring or self.scoring
+        engine = engine or self.engine
+        cache = self._result_cache(scoring, engine) if not details else None
+        results = [None] * len(texts)
+        began = time.perf_counter() if self.metrics is not None else 0.0
+        
+        # Serve cached texts and analyze each distinct remaining text only once
+        pending = {}
+        for index, text in enumerate(texts):
+            cached = self._cache_get(cache, text)
+            if cached is not None:
+                results[index] = cached
+            else:
+                pending.setdefault(text, []).append(index)
+        
+        unique_texts = list(pending)
+        for start in range(0, len(unique_texts), batch_size):
+            chunk = unique_texts[start:start + batch_size]
+            try:
+                chunk_results = aspect_sentiment_analysis_batch(
+                    chunk, self.stop_words, self.nlp, self.sid,
+                    single_pass=self.single_pass, sentence_cache=self.sentence_cache,
+                    metrics=self.metrics, return_exceptions=True, scoring=scoring,
+                    details=details, engine=engine
+                )
+            except Exception as e:
+                chunk_results = [e for _ in chunk]
+            
+            if cache is not None:
+                cache.put_many([
+                    (text, result) for text, result in zip(chunk, chunk_results)
+                    if not isinstance(result, Exception)
+                ])
+            
+            for text, result in zip(chunk, chunk_results):
+                for index in pending[text]:
+                    if isinstance(result, Exception):
+                        results[index] = result
+                    else:
+                        results[index] = [list(pair) for pair in result]
+        
+        if self.metrics is not None:
+            self.metrics.lap('analyze_batch', began)
+            self.metrics.increment('errors', sum(isinstance(result, Exception) for result in results))
+        
+        if not return_exceptions:
+            for index, result in enumerate(results):
+                if isinstance(result, Exception):
+                    print(f"Error during analysis: {result}")
+                    results[index] = []
+        
+        return results, unique_texts
+    
+    def analyze_routed(self, texts, queue_depth=0, return_exceptions=False, scoring=None):
+        """
+        Analyze texts with the engine the router picks for each of them.
+        
+        Documents fitting the router's latency budget take the Stanza path,
+        the others (and all of them under overload) the rules path. Each
+        group is analyzed in one analyze_batch() call and its time feeds the
+        router's cost estimates, counting only the documents that were not
+        served from the result cache.
+        
+        Args:
+            texts (iterable): Input texts to analyze
+            queue_depth (int): Documents waiting behind these (e.g. a server queue)
+            return_exceptions (bool): Return a failed document's exception instead of ([], engine)
+            scoring (str): Scoring mode for this call (defaults to self.scoring)
+            
+        Returns:
+            list: One (results, engine) pair per input text, engine being the path that served it
+        """
+        from src.core.routing import EngineRouter, word_count
+        
+        texts = list(texts)
+        if self.router is None:
+            self.router = EngineRouter()
+        choices = self.router.route(texts, queue_depth)
+        
+        routed = [None] * len(texts)
+        for engine in ('stanza', 'rules'):
+            indexes = [index for index, (choice, _) in enumerate(choices) if choice == engine]
+            if not indexes:
+                continue
+            group = [texts[index] for index in indexes]
+            start = time.perf_counter()
+            results, analyzed = self._analyze_batch(group, return_exceptions=return_exceptions,
+                                                    scoring=scoring, engine=engine)
+            # Cache hits cost next to nothing and would drag the estimate down
+            self.router.observe(engine, sum(word_count(text) for text in analyzed),
+                                time.perf_counter() - start)
+            for index, result in zip(indexes, results):
+                routed[index] = result if isinstance(result, Exception) else (result, engine)
+        
+        if self.metrics is not None:
+            for engine, reason in choices:
+                self.metrics.increment(f'route_{engine}_{reason}')
+        return routed
+    
+    def _result_cache(self, scoring, engine):
+        """Get the result cache for a scoring and engine mode (only the analyzer's defaults are cached)."""
+        return self.cache if scoring == self.scoring and engine == self.engine else None
+    
+    def _cache_get(self, cache, text):
+        """Look a text up in a result cache (None on a miss or without a cache)."""
+        if cache is None or not isinstance(text, str):
+            return None
+        cached = cache.get(text)
+        if self.metrics is not None:
+            self.metrics.increment('result_cache_hits' if cached is not None else 'result_cache_misses')
+        return cached
+    
+    def cache_stats(self):
+        """
+        Get cache counters.
+        
+        Returns:
+            dict: Hit/miss counters of the 'results' and 'sentences' caches and
+                of the memoized VADER term 'scores' (None when disabled or not loaded)
+        """
+        return {
+            'results': self.cache.stats() if self.cache is not None else None,
+            'sentences': self.sentence_cache.stats() if self.sentence_cache is not None else None,
+            'scores': self.sid.stats() if hasattr(self.sid, 'stats') else None
+        }
+    
+    def metrics_snapshot(self, prometheus=False):
+        """
+        Get the recorded metrics, with the current cache counters published as gauges.
+        
+        Args:
+            prometheus (bool): Return Prometheus text instead of a dict
+            
+        Returns:
+            dict or str: MetricsRegistry.snapshot() or to_prometheus() output
+                (None when metrics are disabled)
+        """
+        if self.metrics is None:
+            return None
+        
+        for cache_name, stats in self.cache_stats().items():
+            self.metrics.record_cache_stats(cache_name, stats)
+        return self.metrics.to_prometheus() if prometheus else self.metrics.snapshot()
+    
+    def analyze_with_details(self, text, scoring=None, engine=None):
         """
         Analyze text and return detailed results with sentiment labels.
         
         Args:
             text (str): Input text to analyze
+            scoring (str): Scoring mode for this call (defaults to self.scoring)
+            engine (str): Engine mode for this call (defaults to self.engine)
             
         Returns:
             dict: Detailed analysis results
         """
-        results = self.analyze(text)
+        from src.core.absa_engine import detailed_results
         
-        detailed_results = {
-            'input_text': text,
-            'aspects_found': len(results),
-            'aspects': []
-        }
+        return detailed_results(text, self.analyze(text, scoring, engine))
+    
+    def imap(self, texts, batch_size=None, return_exceptions=False, scoring=None, details=False,
+             engine=None):
+        """
+        Analyze texts lazily, yielding one result per text in input order.
+        
+        Only one batch of texts is held in memory at a time.
+        
+        Args:
+            texts (iterable): Input texts to analyze
+            batch_size (int): Documents per Stanza bulk call (defaults to self.batch_size)
+            return_exceptions (bool): Yield a failed document's exception instead of []
+            scoring (str): Scoring mode for this call (defaults to self.scoring)
+            details (bool): Yield detail records instead of pairs (see analyze_batch)
+            engine (str): Engine mode for this call (defaults to self.engine)
+            
+        Yields:
+            list: List of [aspect, sentiment_score] pairs for each text
+        """
+        batch_size = batch_size or self.batch_size
+        chunk = []
+        for text in texts:
+            chunk.append(text)
+            if len(chunk) == batch_size:
+                yield from self.analyze_batch(chunk, batch_size, return_exceptions, scoring, details,
+                                              engine)
+                chunk = []
+        if chunk:
+            yield from self.analyze_batch(chunk, batch_size, return_exceptions, scoring, details, engine)
+    
+    def analyze_table(self, texts, doc_ids=None, batch_size=None, scoring=None):
+        """
+        Analyze texts into a columnar ResultTable.
+        
+        Rows hold the document id, sentence index, aspect, linked opinion
+        words, score and label; texts are processed one batch at a time.
+        
+        Args:
+            texts (iterable): Input texts to analyze
+            doc_ids (iterable): Document identifiers (defaults to 0, 1, 2, ...)
+            batch_size (int): Documents per Stanza bulk call (defaults to self.batch_size)
+            scoring (str): Scoring mode for this call (defaults to self.scoring)
+            
+        Returns:
+            ResultTable: One row per aspect (see src/utils/result_table.py)
+        """
+        from src.utils.result_table import ResultTable
         
-        for aspect, sentiment_score in results:
-            sentiment_label = self._get_sentiment_label(sentiment_score)
-            detailed_results['aspects'].append({
-                'aspect': aspect,
-                'sentiment_score': sentiment_score,
-                'sentiment_label': sentiment_label
-            })
+        return ResultTable.from_results(self.imap(texts, batch_size, scoring=scoring, details=True),
+                                        doc_ids)
+    
+    def aggregate(self, texts, groups=None, batch_size=None, scoring=None, aggregator=None):
+        """
+        Analyze texts into per-group aspect statistics.
+        
+        Only the running aggregates are kept, not the per-document results.
+        
+        Args:
+            texts (iterable): Input texts to analyze
+            groups (iterable): Group key per text, e.g. a product id (None for one global group)
+            batch_size (int): Documents per Stanza bulk call (defaults to self.batch_size)
+            scoring (str): Scoring mode for this call (defaults to self.scoring)
+            aggregator (AspectAggregator): Existing aggregate to update (a new one by default)
+            
+        Returns:
+            AspectAggregator: Counts, mean scores and label histograms (see src/utils/aggregation.py)
+        """
+        from src.utils.aggregation import AspectAggregator
         
-        return detailed_results
+        if aggregator is None:
+            aggregator = AspectAggregator()
+        aggregator.update_many(self.imap(texts, batch_size, scoring=scoring), groups)
+        return aggregator
     
     def _get_sentiment_label(self, score):
         """Convert sentiment score to label."""
-        if score > 0.1:
-            return "Positive"
-        elif score < -0.1:
-            return "Negative"
-        else:
-            return "Neutral"
+        from src.core.absa_engine import sentiment_label
+        
+        return sentiment_label(score)
     
     def run_tests(self):
         """Run all predefined test examples."""
-        if not self.is_ready():
+        if not self.load():
             print("Analyzer not properly initialized!")
             return
         
         self.test_runner.run_all_tests(self.stop_words, self.nlp, self.sid)
     
+    def compare_modes(self):
+        """Compare the two-pass and single-pass engine modes on the test examples."""
+        if not self.load():
+            print("Analyzer not properly initialized!")
+            return
+        
+        self.test_runner.compare_modes(self.stop_words, self.nlp, self.sid)
+    
+    def compare_engines(self, scoring='context'):
+        """
+        Compare the 'rules' engine with the Stanza engine on the test examples.
+        
+        Args:
+            scoring (str): Scoring mode of both runs ('context' scores depend on the linking)
+        """
+        if not self.load():
+            print("Analyzer not properly initialized!")
+            return
+        
+        self.test_runner.compare_engines(self.stop_words, self.nlp, self.sid, scoring)
+    
     def is_ready(self):
         """Check if analyzer is ready to use."""
         return all([self.nlp, self.sid, self.stop_words])
@@ -186,11 +569,211 @@ def interactive_mode():
             print(f"Error: {e}")
 
 
-if __name__ == "__main__":
+def analyze_command(args):
+    """Stream a corpus file through the analyzer and write the results."""
+    from src.core.absa_engine import engine_fingerprint
+    from src.core.corpus_analysis import analyze_corpus
+    from src.core.parallel import ParallelABSAAnalyzer
+    from src.models.model_manager import available_cpus, get_model_manager, pin_cpus
+    from src.utils.manifest import Manifest
+    
+    checkpoint = None
+    state = None
+    checkpoint_path = args.checkpoint
+    if checkpoint_path is None and args.resume and args.output != '-':
+        checkpoint_path = args.output + '.checkpoint'
+    if checkpoint_path:
+        checkpoint = Checkpoint(checkpoint_path)
+        if args.resume:
+            state = checkpoint.load()
+    
+    if state and state['completed']:
+        print(f"✓ Job already completed ({state['records']} documents)", file=sys.stderr)
+        return 0
+    if state:
+        print(f"Resuming after {state['records']} documents", file=sys.stderr)
+    
+    # Status messages go to stderr so they never mix with results on stdout
+    writer = ResultWriter(args.output, args.output_format,
+                          resume_offset=state['output_offset'] if state else None)
+    dead_letter = None
+    if args.dead_letter:
+        dead_letter = DeadLetterWriter(args.dead_letter,
+                                       resume_offset=state['dead_letter_offset'] if state else None)
+        if state:
+            dead_letter.count = state['dead_letters']
+    
+    with contextlib.redirect_stdout(sys.stderr), writer:
+        if args.workers > 1:
+            analyzer = ParallelABSAAnalyzer(workers=args.workers, chunk_size=args.batch_size,
+                                            scoring=args.scoring, engine=args.engine,
+                                            threads_per_worker=args.torch_threads,
+                                            cpu_affinity=args.cpu_affinity, preload=args.preload)
+        else:
+            if args.cpu_affinity and args.torch_threads:
+                pin_cpus(available_cpus()[:args.torch_threads])
+            get_model_manager().configure_threads(args.torch_threads)
+            analyzer = ABSAAnalyzer(batch_size=args.batch_size, scoring=args.scoring, engine=args.engine,
+                                    metrics=get_metrics_registry() if args.metrics else None)
+            if not analyzer.is_ready():
+                print("Failed to initialize analyzer. Exiting...")
+                return 1
+        
+        documents = read_documents(
+            args.input, args.input_format, args.text_field, args.id_field,
+            start_offset=state['input_offset'] if state else None,
+            start_record=state['records'] if state else 0,
+            mapped=args.mmap
+        )
+        manifest = None
+        if args.manifest:
+            manifest = Manifest(args.manifest, engine_fingerprint(analyzer.single_pass, args.scoring,
+                                                                  args.engine))
+        try:
+            count = analyze_corpus(analyzer, documents, writer, dead_letter, checkpoint,
+                                   args.checkpoint_every, manifest)
+        finally:
+            if args.workers > 1:
+                analyzer.close()
+            if dead_letter is not None:
+                dead_letter.close()
+            if manifest is not None:
+                manifest.close()
+            if args.mmap:
+                documents.close()
+        
+        print(f"✓ Analyzed {count} documents")
+        if manifest is not None:
+            print(f"✓ {manifest.reused} unchanged documents taken from {args.manifest}, "
+                  f"{manifest.analyzed} new or changed documents analyzed")
+        if dead_letter is not None and dead_letter.count:
+            print(f"⚠ {dead_letter.count} documents failed, see {args.dead_letter}")
+        if args.metrics and args.workers <= 1:
+            with open(args.metrics, 'w', encoding='utf-8') as handle:
+                handle.write(analyzer.metrics_snapshot(prometheus=True))
+            print(f"✓ Metrics written to {args.metrics}")
+    return 0
+
+
+def serve_command(args):
+    """Run the micro-batching HTTP service."""
+    from src.core.routing import EngineRouter
+    from src.models.model_manager import get_model_manager
+    from src.server.http_service import run_server
+    
+    manager = get_model_manager()
+    manager.configure_threads(args.torch_threads)
+    manager.autotune = args.autotune_threads
+    
+    def analyzer_factory():
+        router = None
+        if args.latency_budget_ms is not None:
+            router = EngineRouter(budget_ms=args.latency_budget_ms)
+        return ABSAAnalyzer(batch_size=args.max_batch_size, lazy=True, scoring=args.scoring,
+                            engine=args.engine, router=router)
+    
+    # Models load (and warm up) in the background while /health already answers
+    run_server(analyzer_factory, args.host, args.port, args.max_batch_size, args.max_wait_ms)
+    return 0
+
+
+def build_parser():
+    """Build the command line parser."""
+    parser = argparse.ArgumentParser(description="Aspect-Based Sentiment Analysis")
+    parser.add_argument('--test', action='store_true', help="Run predefined test examples")
+    parser.add_argument('--compare-modes', action='store_true',
+                        help="Compare the two-pass and single-pass engine modes on the test examples")
+    parser.add_argument('--compare-engines', action='store_true',
+                        help="Compare the rule-based and Stanza engines on the test examples")
+    
+    subparsers = parser.add_subparsers(dest='command')
+    subparsers.add_parser('prepare', help="Download all model resources once (e.g. for image builds)")
+    
+    analyze = subparsers.add_parser('analyze', help="Stream a corpus file through the analyzer")
+    analyze.add_argument('--input', default='-', help="Input file, '-' for stdin (default)")
+    analyze.add_argument('--output', default='-', help="Output file, '-' for stdout (default)")
+    analyze.add_argument('--input-format', choices=FORMATS,
+                         help="Input format (guessed from the extension by default)")
+    analyze.add_argument('--output-format', choices=('jsonl', 'csv'),
+                         help="Output format (guessed from the extension by default)")
+    analyze.add_argument('--text-field', default='text', help="JSONL key / CSV column with the text")
+    analyze.add_argument('--id-field', default='id', help="JSONL key / CSV column with the document id")
+    analyze.add_argument('--mmap', action='store_true',
+                         help="Memory-map the input and send workers document ranges instead of "
+                              "texts (JSONL and text files only)")
+    analyze.add_argument('--batch-size', type=int, default=BATCH_SIZE,
+                         help="Documents per Stanza bulk call / worker chunk")
+    analyze.add_argument('--workers', type=int, default=1, help="Number of worker processes")
+    analyze.add_argument('--scoring', choices=('aspect', 'context'), default=SCORING_MODE,
+                         help="Score the aspect word alone or with its linked opinion words")
+    analyze.add_argument('--engine', choices=('stanza', 'rules'), default=ENGINE_MODE,
+                         help="Link aspects through the Stanza parse or through POS-pattern rules")
+    analyze.add_argument('--torch-threads', type=int, default=TORCH_INTRA_OP_THREADS,
+                         help="PyTorch threads per process (default: CPUs divided by workers)")
+    analyze.add_argument('--cpu-affinity', action='store_true', default=CPU_AFFINITY,
+                         help="Pin each worker process to its own CPUs (Linux only)")
+    analyze.add_argument('--preload', action='store_true', default=PARALLEL_PRELOAD,
+                         help="Load the models once and fork the workers from it, sharing "
+                              "the model memory (Linux/macOS fork only)")
+    analyze.add_argument('--dead-letter', help="JSONL file for documents whose analysis fails")
+    analyze.add_argument('--checkpoint', help="Checkpoint file (default: <output>.checkpoint with --resume)")
+    analyze.add_argument('--checkpoint-every', type=int, default=CHECKPOINT_INTERVAL,
+                         help="Documents between checkpoints")
+    analyze.add_argument('--resume', action='store_true',
+                         help="Skip documents already processed according to the checkpoint")
+    analyze.add_argument('--manifest', help="SQLite manifest of analyzed documents: only new or changed "
+                                            "documents (or all, after a config change) are analyzed")
+    analyze.add_argument('--metrics', help="Write stage timings and counters to this file "
+                                           "(Prometheus text format, single-process runs only)")
+    
+    serve = subparsers.add_parser('serve', help="Serve the analyzer over HTTP with micro-batching")
+    serve.add_argument('--host', default=SERVER_HOST, help="Interface to listen on")
+    serve.add_argument('--port', type=int, default=SERVER_PORT, help="Port to listen on")
+    serve.add_argument('--max-batch-size', type=int, default=SERVER_MAX_BATCH_SIZE,
+                       help="Maximum documents analyzed together in one micro-batch")
+    serve.add_argument('--max-wait-ms', type=float, default=SERVER_MAX_WAIT_MS,
+                       help="Longest time a request waits for others to join its batch")
+    serve.add_argument('--scoring', choices=('aspect', 'context'), default=SCORING_MODE,
+                       help="Score the aspect word alone or with its linked opinion words")
+    serve.add_argument('--engine', choices=('stanza', 'rules'), default=ENGINE_MODE,
+                       help="Link aspects through the Stanza parse or through POS-pattern rules")
+    serve.add_argument('--torch-threads', type=int, default=TORCH_INTRA_OP_THREADS,
+                       help="PyTorch intra-op threads (default: torch's own choice)")
+    serve.add_argument('--autotune-threads', action='store_true', default=TORCH_AUTOTUNE,
+                       help="Benchmark a few torch thread counts at startup and keep the fastest")
+    serve.add_argument('--latency-budget-ms', type=float,
+                       help="Route each document to Stanza or the rules engine to stay within "
+                            "this latency, shedding to the rules under overload")
+    return parser
+
+
+def main(argv=None):
+    """Command line entry point."""
+    args = build_parser().parse_args(argv)
+    
+    if args.command == 'prepare':
+        # One-time download of all resources, e.g. during an image build
+        from src.models.model_manager import get_model_manager
+        return 0 if get_model_manager().prepare() else 1
+    if args.command == 'analyze':
+        return analyze_command(args)
+    if args.command == 'serve':
+        return serve_command(args)
+    
     # Check if user wants to run tests directly
-    if len(sys.argv) > 1 and sys.argv[1] == '--test':
+    if args.test or args.compare_modes or args.compare_engines:
         analyzer = ABSAAnalyzer()
         if analyzer.is_ready():
-            analyzer.run_tests()
+            if args.test:
+                analyzer.run_tests()
+            elif args.compare_modes:
+                analyzer.compare_modes()
+            else:
+                analyzer.compare_engines()
     else:
-        interactive_mode()
\ No newline at end of file
+        interactive_mode()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
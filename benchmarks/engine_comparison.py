@@ -0,0 +1,152 @@
+"""
+Engine Accuracy-versus-Speed Comparison
+
+This script runs the Stanza engine and the rule-based engine on the
+benchmark corpora (synthetic or loaded from corpus files) and on the
+TestRunner cases. Each engine is warmed up first and timed with its own
+empty VADER score memo. It reports per-document latency percentiles and
+docs/sec for both engines, and how closely the rule-based results match
+the Stanza ones: aspect recall and precision, and sentiment label
+agreement on the aspects both engines found.
+
+Usage:
+    python -m benchmarks.engine_comparison [--scoring context] [--output engines.json]
+    python -m benchmarks.engine_comparison --corpus reviews=data/reviews.jsonl
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from config import settings
+from benchmarks.run_benchmarks import CORPUS_SHAPES, generate_corpus
+from src.core.absa_engine import aspect_sentiment_analysis
+from src.core.scoring import fresh_scorer
+from src.models.model_manager import get_model_manager
+from src.utils.corpus_io import read_documents
+from src.utils.text_processing import get_stopwords
+from tests.test_cases import get_test_runner, result_agreement
+
+ENGINES = ('stanza', 'rules')
+
+
+def compare_corpus(corpus, stop_words, nlp, sid, scoring):
+    """
+    Analyze a corpus with both engines and compare the results.
+    
+    Returns:
+        dict: Latency and throughput per engine, and agreement of the rules with Stanza
+    """
+    report = {}
+    results = {}
+    for engine in ENGINES:
+        # Load lazily initialized state, then time with an empty score memo
+        aspect_sentiment_analysis(corpus[0], stop_words, nlp, fresh_scorer(sid), scoring=scoring,
+                                  engine=engine)
+        scorer = fresh_scorer(sid)
+        latencies = []
+        results[engine] = []
+        start = time.perf_counter()
+        for text in corpus:
+            doc_start = time.perf_counter()
+            results[engine].append(aspect_sentiment_analysis(text, stop_words, nlp, scorer,
+                                                             scoring=scoring, engine=engine))
+            latencies.append((time.perf_counter() - doc_start) * 1000)
+        seconds = time.perf_counter() - start
+        latencies = np.array(latencies)
+        report[engine] = {
+            'docs_per_sec': len(corpus) / seconds,
+            'latency_ms': {
+                'p50': float(np.percentile(latencies, 50)),
+                'p95': float(np.percentile(latencies, 95)),
+                'p99': float(np.percentile(latencies, 99))
+            }
+        }
+    
+    reference = candidate = shared = same_label = 0
+    for stanza_results, rule_results in zip(results['stanza'], results['rules']):
+        counts = result_agreement(stanza_results, rule_results)
+        reference += counts[0]
+        candidate += counts[1]
+        shared += counts[2]
+        same_label += counts[3]
+    report['agreement'] = {
+        'aspect_recall': shared / reference if reference else 1.0,
+        'aspect_precision': shared / candidate if candidate else 1.0,
+        'label_agreement': same_label / shared if shared else 1.0
+    }
+    report['speedup'] = report['rules']['docs_per_sec'] / report['stanza']['docs_per_sec']
+    return report
+
+
+def main():
+    """Run the comparison."""
+    parser = argparse.ArgumentParser(description="Rule-based versus Stanza engine comparison")
+    parser.add_argument('--corpus', action='append', default=[], metavar='NAME=PATH',
+                        help="Compare on a corpus file instead of the synthetic corpora (repeatable)")
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help="Multiply the number of synthetic documents")
+    parser.add_argument('--scoring', choices=('aspect', 'context'), default='context',
+                        help="Scoring mode of both engines ('aspect' scores do not depend on linking)")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed for synthetic corpora")
+    parser.add_argument('--output', help="Write the results as JSON to this file")
+    args = parser.parse_args()
+    
+    if args.corpus:
+        corpora = {}
+        for spec in args.corpus:
+            name, _, path = spec.partition('=')
+            corpora[name] = [text for _, text in read_documents(path or name)]
+    else:
+        rng = random.Random(args.seed)
+        corpora = {
+            name: generate_corpus(max(1, int(documents * args.scale)), low, high, paragraphs, rng)
+            for name, (documents, low, high, paragraphs) in CORPUS_SHAPES.items()
+        }
+    corpora['test_cases'] = [test_case['text'] for test_case in get_test_runner().test_cases]
+    
+    manager = get_model_manager()
+    if not manager.setup_all():
+        print("✗ Model setup failed. Cannot run the comparison.")
+        sys.exit(1)
+    nlp, sid = manager.get_models()
+    stop_words = get_stopwords()
+    
+    report = {
+        'meta': {
+            'timestamp': time.time(),
+            'stanza_processors': settings.STANZA_PROCESSORS,
+            'rule_window': settings.RULE_WINDOW,
+            'scoring': args.scoring
+        },
+        'corpora': {}
+    }
+    
+    for name, corpus in corpora.items():
+        print(f"Comparing engines on {name} ({len(corpus)} documents)...")
+        metrics = compare_corpus(corpus, stop_words, nlp, sid, args.scoring)
+        report['corpora'][name] = metrics
+        for engine in ENGINES:
+            latency = metrics[engine]['latency_ms']
+            print(f"  {engine:>6}: {metrics[engine]['docs_per_sec']:.1f} docs/sec, "
+                  f"p50 {latency['p50']:.2f} ms, p99 {latency['p99']:.2f} ms")
+        agreement = metrics['agreement']
+        print(f"  rules are {metrics['speedup']:.1f}x faster; aspect recall "
+              f"{agreement['aspect_recall']:.1%}, precision {agreement['aspect_precision']:.1%}, "
+              f"label agreement {agreement['label_agreement']:.1%}")
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"✓ Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Aspect Linking Micro-Benchmark
+
+This script compares the indexed aspect/edge linking in the engine with
+the original per-feature scan of every dependency edge, on synthetic
+sentences of growing length, and checks that both produce the same links.
+
+Timings are the fastest of several rounds with the garbage collector off
+(timeit's defaults), so a single slow round does not skew the speedup.
+
+Usage:
+    python -m benchmarks.linking_benchmark [--sizes 10 50 100 250 500] [--repeat 50] [--rounds 5]
+"""
+
+import argparse
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from config.settings import DEPENDENCY_RELATIONS
+from src.core.absa_engine import link_aspects
+
+TAGS = ['NN', 'NNS', 'JJ', 'JJR', 'RB', 'VBZ', 'DT', 'IN']
+OTHER_RELATIONS = ['det', 'case', 'cop', 'punct', 'conj', 'cc']
+
+
+def link_aspects_scan(dep_node, taggedList):
+    """Original linking: scan every edge for every candidate feature."""
+    featureList = []
+    for i in taggedList:
+        if(i[1]=='JJ' or i[1]=='NN' or i[1]=='JJR' or i[1]=='NNS' or i[1]=='RB'):
+            featureList.append(list(i))
+
+    cluster = []
+    for i in featureList:
+        filist = []
+        for j in dep_node:
+            if((j[0]==i[0] or j[1]==i[0]) and (j[2] in ["nsubj", "acl:relcl", "obj", "dobj", "agent", "advmod", "amod", "neg", "prep_of", "acomp", "xcomp", "compound"])):
+                if(j[0]==i[0]):
+                    filist.append(j[1])
+                else:
+                    filist.append(j[0])
+        cluster.append([i[0], filist])
+    return cluster
+
+
+def make_sentence(length, rng):
+    """
+    Build a synthetic parsed sentence of the given length.
+    
+    Returns:
+        tuple: (dep_node, taggedList) with one edge per token
+    """
+    words = [f"w{rng.randrange(length)}" for _ in range(length)]
+    taggedList = [(word, rng.choice(TAGS)) for word in words]
+    
+    dep_node = []
+    relations = DEPENDENCY_RELATIONS + OTHER_RELATIONS
+    for position, word in enumerate(words):
+        head = 0 if position == 0 else words[rng.randrange(length)]
+        dep_node.append([word, head, rng.choice(relations)])
+    return dep_node, taggedList
+
+
+def time_linking(function, sentence, repeat, rounds):
+    """Get the time of one linking call in microseconds, from the fastest round."""
+    best = min(timeit.repeat(lambda: function(*sentence), number=repeat, repeat=rounds))
+    return best / repeat * 1e6
+
+
+def main():
+    """Run the benchmark and print a scaling table."""
+    parser = argparse.ArgumentParser(description="Aspect linking micro-benchmark")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 50, 100, 250, 500],
+                        help="Sentence lengths in tokens")
+    parser.add_argument('--repeat', type=int, default=50, help="Calls timed per round")
+    parser.add_argument('--rounds', type=int, default=5, help="Rounds per size (the fastest counts)")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed")
+    args = parser.parse_args()
+    
+    rng = random.Random(args.seed)
+    print(f"{'tokens':>8} {'scan (us)':>12} {'indexed (us)':>14} {'speedup':>9}")
+    for size in args.sizes:
+        sentence = make_sentence(size, rng)
+        if link_aspects(*sentence) != link_aspects_scan(*sentence):
+            print(f"✗ Linking results differ for {size} tokens")
+            sys.exit(1)
+        
+        scan_us = time_linking(link_aspects_scan, sentence, args.repeat, args.rounds)
+        indexed_us = time_linking(link_aspects, sentence, args.repeat, args.rounds)
+        print(f"{size:>8} {scan_us:>12.1f} {indexed_us:>14.1f} {scan_us / indexed_us:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
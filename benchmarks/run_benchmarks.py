@@ -0,0 +1,312 @@
+"""
+ABSA Benchmark Suite
+
+This script measures the analysis engine on corpora of different shapes
+(short tweets, medium reviews, long multi-paragraph posts), either
+generated synthetically or loaded from corpus files. It reports
+per-stage timings (NLTK tokenization and tagging, Stanza parse, linking,
+VADER scoring), sequential and batched docs/sec, p50/p95/p99 latency and
+peak RSS per corpus, and writes everything as JSON so runs can be
+compared against a stored baseline. Every timed run starts with an empty
+VADER score memo, and the order of the sequential and batched runs
+alternates between corpora, so neither run profits from the other.
+
+Usage:
+    python -m benchmarks.run_benchmarks --output bench.json
+    python -m benchmarks.run_benchmarks --baseline bench.json --tolerance 0.1
+    python -m benchmarks.run_benchmarks --corpus reviews=data/reviews.jsonl
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from config import settings
+from src.core import absa_engine
+from src.core.absa_engine import ENGINE_VERSION, aspect_sentiment_analysis, aspect_sentiment_analysis_batch
+from src.core.scoring import TermScorer
+from src.models.model_manager import get_model_manager
+from src.utils.corpus_io import read_documents
+from src.utils.metrics import MetricsRegistry
+from src.utils.resource_usage import get_peak_rss_mb, get_rss_high_water_mb, reset_rss_high_water
+from src.utils.text_processing import get_stopwords
+
+STAGES = ['tokenize_tag', 'parse', 'link', 'score']
+
+ASPECTS = ['battery', 'camera', 'screen', 'price', 'delivery', 'service', 'food', 'staff',
+           'sound quality', 'build quality', 'packaging', 'customer support', 'room', 'location']
+OPINIONS = ['excellent', 'terrible', 'great', 'poor', 'amazing', 'disappointing', 'decent',
+            'awful', 'fantastic', 'slow', 'fast', 'cheap', 'expensive', 'reliable']
+TEMPLATES = [
+    "The {aspect} is {opinion}.",
+    "I think the {aspect} was really {opinion}.",
+    "The {aspect} is {opinion} but the {aspect2} is {opinion2}.",
+    "Honestly the {aspect} felt {opinion} and the {aspect2} seemed {opinion2} to me.",
+    "{opinion} {aspect}, {opinion2} {aspect2}.",
+    "After two weeks of use the {aspect} is still {opinion}, although the {aspect2} could be better."
+]
+
+# name: (documents, min sentences, max sentences, paragraphs)
+CORPUS_SHAPES = {
+    'tweets': (200, 1, 2, 1),
+    'reviews': (100, 3, 8, 1),
+    'long_posts': (20, 10, 20, 4)
+}
+
+
+def make_sentence(rng):
+    """Generate one review-like sentence."""
+    aspect, aspect2 = rng.sample(ASPECTS, 2)
+    opinion, opinion2 = rng.sample(OPINIONS, 2)
+    sentence = rng.choice(TEMPLATES).format(aspect=aspect, aspect2=aspect2,
+                                            opinion=opinion, opinion2=opinion2)
+    return sentence[0].upper() + sentence[1:]
+
+
+def generate_corpus(documents, min_sentences, max_sentences, paragraphs, rng):
+    """
+    Generate a synthetic corpus.
+    
+    Returns:
+        list: Document texts
+    """
+    corpus = []
+    for _ in range(documents):
+        blocks = []
+        for _ in range(paragraphs):
+            count = rng.randint(min_sentences, max_sentences)
+            blocks.append(' '.join(make_sentence(rng) for _ in range(count)))
+        corpus.append('\n\n'.join(blocks))
+    return corpus
+
+
+@contextlib.contextmanager
+def per_sentence_parsing():
+    """Parse long documents sentence by sentence too, instead of in one bulk call."""
+    limit = absa_engine.LONG_DOCUMENT_SENTENCES
+    absa_engine.LONG_DOCUMENT_SENTENCES = float('inf')
+    try:
+        yield
+    finally:
+        absa_engine.LONG_DOCUMENT_SENTENCES = limit
+
+
+def clear_scores(sid):
+    """Empty the score memo, so a timed run scores every term through VADER itself."""
+    if isinstance(sid, TermScorer):
+        sid.clear()
+
+
+def benchmark_corpus(corpus, stop_words, nlp, sid, single_pass, batch_size, scoring='aspect',
+                     batch_first=False):
+    """
+    Benchmark one corpus sequentially (per-document latency) and batched.
+    
+    The sequential run goes through aspect_sentiment_analysis() with a
+    MetricsRegistry, so stage timings and counts come from the engine's own
+    instrumentation and follow it whenever it changes. It parses every
+    sentence on its own, also in long documents, which the engine would
+    otherwise parse in one bulk call like the batched run. Both runs start
+    with an empty score memo.
+    
+    Args:
+        batch_first (bool): Time the batched run before the sequential one
+    
+    Returns:
+        dict: Metrics of the corpus
+    """
+    metrics = MetricsRegistry()
+    latencies = []
+    
+    def run_sequential():
+        clear_scores(sid)
+        start = time.perf_counter()
+        with per_sentence_parsing():
+            for text in corpus:
+                doc_start = time.perf_counter()
+                aspect_sentiment_analysis(text, stop_words, nlp, sid, single_pass=single_pass,
+                                          metrics=metrics, scoring=scoring)
+                latencies.append((time.perf_counter() - doc_start) * 1000)
+        return time.perf_counter() - start
+    
+    def run_batch():
+        clear_scores(sid)
+        start = time.perf_counter()
+        for offset in range(0, len(corpus), batch_size):
+            aspect_sentiment_analysis_batch(corpus[offset:offset + batch_size], stop_words, nlp, sid,
+                                            single_pass=single_pass, scoring=scoring)
+        return time.perf_counter() - start
+    
+    if batch_first:
+        batch_seconds = run_batch()
+        sequential_seconds = run_sequential()
+    else:
+        sequential_seconds = run_sequential()
+        batch_seconds = run_batch()
+    snapshot = metrics.snapshot()
+    timers, counters = snapshot['timers'], snapshot['counters']
+    
+    latencies = np.array(latencies)
+    return {
+        'documents': len(corpus),
+        'sentences': counters.get('sentences', 0),
+        'tokens': counters.get('tokens', 0),
+        'aspects': counters.get('aspects', 0),
+        'sequential': {
+            'docs_per_sec': len(corpus) / sequential_seconds,
+            'latency_ms': {
+                'mean': float(latencies.mean()),
+                'p50': float(np.percentile(latencies, 50)),
+                'p95': float(np.percentile(latencies, 95)),
+                'p99': float(np.percentile(latencies, 99))
+            },
+            'stage_ms_per_doc': {
+                stage: timers[stage]['total_seconds'] * 1000 / len(corpus) if stage in timers else 0.0
+                for stage in STAGES
+            }
+        },
+        'batch': {
+            'batch_size': batch_size,
+            'docs_per_sec': len(corpus) / batch_seconds
+        }
+    }
+
+
+def compare_to_baseline(current, baseline, tolerance):
+    """
+    Print the change of every metric against a baseline run.
+    
+    Throughput (docs_per_sec) should not drop and timings should not grow
+    by more than the tolerance. The 'meta' section (timestamp, versions,
+    options) describes the run and is not compared.
+    
+    Returns:
+        list: Descriptions of the regressions found
+    """
+    regressions = []
+    
+    def walk(current_node, baseline_node, path):
+        for key, value in current_node.items():
+            if key not in baseline_node:
+                continue
+            name = f"{path}.{key}" if path else key
+            if isinstance(value, dict):
+                walk(value, baseline_node[key], name)
+                continue
+            if not isinstance(value, float) or not baseline_node[key]:
+                continue
+            
+            change = (value - baseline_node[key]) / baseline_node[key]
+            higher_is_better = key == 'docs_per_sec'
+            regressed = -change > tolerance if higher_is_better else change > tolerance
+            marker = "✗" if regressed else "✓"
+            print(f"  {marker} {name}: {baseline_node[key]:.2f} -> {value:.2f} ({change:+.1%})")
+            if regressed:
+                regressions.append(name)
+    
+    walk({key: value for key, value in current.items() if key != 'meta'}, baseline, '')
+    return regressions
+
+
+def main():
+    """Run the benchmark suite."""
+    parser = argparse.ArgumentParser(description="ABSA benchmark suite")
+    parser.add_argument('--corpus', action='append', default=[], metavar='NAME=PATH',
+                        help="Benchmark a corpus file instead of the synthetic corpora (repeatable)")
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help="Multiply the number of synthetic documents")
+    parser.add_argument('--batch-size', type=int, default=settings.BATCH_SIZE,
+                        help="Documents per Stanza bulk call in the batched run")
+    parser.add_argument('--single-pass', action='store_true', help="Benchmark the single-pass engine mode")
+    parser.add_argument('--scoring', choices=('aspect', 'context'), default=settings.SCORING_MODE,
+                        help="Aspect scoring mode to benchmark")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed for synthetic corpora")
+    parser.add_argument('--output', help="Write the results as JSON to this file")
+    parser.add_argument('--baseline', help="Compare against a previous JSON result")
+    parser.add_argument('--tolerance', type=float, default=0.1,
+                        help="Allowed relative regression against the baseline")
+    args = parser.parse_args()
+    
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+    
+    if args.corpus:
+        corpora = {}
+        for spec in args.corpus:
+            name, _, path = spec.partition('=')
+            corpora[name] = [text for _, text in read_documents(path or name)]
+    else:
+        rng = random.Random(args.seed)
+        corpora = {
+            name: generate_corpus(max(1, int(documents * args.scale)), low, high, paragraphs, rng)
+            for name, (documents, low, high, paragraphs) in CORPUS_SHAPES.items()
+        }
+    
+    manager = get_model_manager()
+    if not manager.setup_all():
+        print("✗ Model setup failed. Cannot run benchmarks.")
+        sys.exit(1)
+    nlp, sid = manager.get_models()
+    stop_words = get_stopwords()
+    
+    report = {
+        'meta': {
+            'timestamp': time.time(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'engine_version': ENGINE_VERSION,
+            'stanza_processors': settings.STANZA_PROCESSORS,
+            'single_pass': args.single_pass,
+            'scoring': args.scoring
+        },
+        'corpora': {}
+    }
+    
+    for index, (name, corpus) in enumerate(corpora.items()):
+        print(f"Benchmarking {name} ({len(corpus)} documents)...")
+        # Without /proc the peak covers the whole run so far
+        reset_rss_high_water()
+        metrics = benchmark_corpus(corpus, stop_words, nlp, sid, args.single_pass, args.batch_size,
+                                   args.scoring, batch_first=index % 2 == 1)
+        metrics['peak_rss_mb'] = get_rss_high_water_mb()
+        report['corpora'][name] = metrics
+        sequential = metrics['sequential']
+        print(f"  {sequential['docs_per_sec']:.1f} docs/sec sequential, "
+              f"{metrics['batch']['docs_per_sec']:.1f} docs/sec batched, "
+              f"peak RSS {metrics['peak_rss_mb']:.1f} MB")
+        print(f"  latency p50 {sequential['latency_ms']['p50']:.1f} ms, "
+              f"p95 {sequential['latency_ms']['p95']:.1f} ms, p99 {sequential['latency_ms']['p99']:.1f} ms")
+        print("  stages (ms/doc): " + ", ".join(
+            f"{stage} {ms:.2f}" for stage, ms in sequential['stage_ms_per_doc'].items()))
+    
+    # Lifetime peak of this process, including model loading
+    report['peak_rss_mb'] = get_peak_rss_mb()
+    print(f"Peak RSS of the whole run: {report['peak_rss_mb']:.1f} MB")
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"✓ Results written to {args.output}")
+    
+    if baseline is not None:
+        print(f"Comparison against {args.baseline}:")
+        regressions = compare_to_baseline(report, baseline, args.tolerance)
+        if regressions:
+            print(f"✗ {len(regressions)} metrics regressed by more than {args.tolerance:.0%}")
+            sys.exit(1)
+        print("✓ No regressions")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
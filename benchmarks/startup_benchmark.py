@@ -0,0 +1,137 @@
+"""
+ABSA Startup Benchmark
+
+This script measures how long the analyzer takes to become useful, each
+sample in a fresh interpreter: the wall time of 'absa_main.py --help',
+the time to import absa_main, the time to the first analysis result
+(model loading included) and the latency of the next, warm result.
+Import and first-result latency are tracked separately, so a regression
+in either one shows up on its own.
+
+Usage:
+    python -m benchmarks.startup_benchmark --output startup.json
+    python -m benchmarks.startup_benchmark --baseline startup.json --tolerance 0.2
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from benchmarks.run_benchmarks import compare_to_baseline
+
+HEAVY_MODULES = ['nltk', 'stanza', 'torch']
+
+FIRST_TEXT = "The battery life is excellent but the camera is poor."
+WARM_TEXT = "The screen is bright and the delivery was fast."
+
+# Runs in the fresh interpreter; status output goes to stderr, the JSON sample to stdout
+PROBE = """
+import contextlib, json, sys, time
+start = time.perf_counter()
+import absa_main
+sample = {{'import_seconds': time.perf_counter() - start,
+          'heavy_modules_after_import': [m for m in {heavy!r} if m in sys.modules]}}
+if {analyze!r}:
+    with contextlib.redirect_stdout(sys.stderr):
+        start = time.perf_counter()
+        analyzer = absa_main.ABSAAnalyzer(cache_size=0, sentence_cache_size=0, lazy=True)
+        analyzer.analyze({first!r})
+        sample['first_result_seconds'] = time.perf_counter() - start
+        start = time.perf_counter()
+        analyzer.analyze({warm!r})
+        sample['warm_result_seconds'] = time.perf_counter() - start
+        sample['ready'] = analyzer.is_ready()
+print(json.dumps(sample))
+"""
+
+
+def time_help():
+    """Wall time of 'absa_main.py --help' in a new process."""
+    start = time.perf_counter()
+    subprocess.run([sys.executable, os.path.join(ROOT, 'absa_main.py'), '--help'],
+                   cwd=ROOT, stdout=subprocess.DEVNULL, check=True)
+    return time.perf_counter() - start
+
+
+def run_probe(analyze):
+    """Import (and optionally analyze) in a new process and return its sample."""
+    code = PROBE.format(heavy=HEAVY_MODULES, analyze=analyze, first=FIRST_TEXT, warm=WARM_TEXT)
+    result = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True,
+                            text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="ABSA startup benchmark")
+    parser.add_argument('--repeat', type=int, default=5,
+                        help="Fresh processes per measurement (medians are reported)")
+    parser.add_argument('--skip-analysis', action='store_true',
+                        help="Only measure imports (no models needed)")
+    parser.add_argument('--output', help="Write the results as JSON to this file")
+    parser.add_argument('--baseline', help="Compare against a previous JSON result")
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help="Allowed relative regression before failing (default 0.2)")
+    args = parser.parse_args()
+    
+    # Load the baseline first, it may be the file this run overwrites
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+    
+    help_seconds = [time_help() for _ in range(args.repeat)]
+    samples = [run_probe(analyze=False) for _ in range(args.repeat)]
+    
+    startup = {
+        'cli_help_seconds': float(np.median(help_seconds)),
+        'import_seconds': float(np.median([s['import_seconds'] for s in samples])),
+        'heavy_modules_after_import': samples[0]['heavy_modules_after_import']
+    }
+    print(f"--help: {startup['cli_help_seconds'] * 1000:.0f} ms, "
+          f"import absa_main: {startup['import_seconds'] * 1000:.0f} ms "
+          f"(heavy modules loaded: {', '.join(startup['heavy_modules_after_import']) or 'none'})")
+    
+    if not args.skip_analysis:
+        samples = [run_probe(analyze=True) for _ in range(args.repeat)]
+        if not all(s['ready'] for s in samples):
+            print("✗ Models could not be loaded; run 'python absa_main.py prepare' first")
+            return 1
+        startup['first_result_seconds'] = float(np.median([s['first_result_seconds'] for s in samples]))
+        startup['warm_result_seconds'] = float(np.median([s['warm_result_seconds'] for s in samples]))
+        print(f"first result: {startup['first_result_seconds']:.2f} s (model loading included), "
+              f"warm result: {startup['warm_result_seconds'] * 1000:.1f} ms")
+    
+    report = {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'repeat': args.repeat,
+        'startup': startup
+    }
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"✓ Results written to {args.output}")
+    
+    if baseline is not None:
+        print(f"Comparison against {args.baseline}:")
+        regressions = compare_to_baseline(report['startup'], baseline['startup'], args.tolerance)
+        if regressions:
+            print(f"✗ {len(regressions)} metrics regressed by more than {args.tolerance:.0%}")
+            return 1
+        print("✓ No regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+"""
+Worker Memory Benchmark
+
+This script measures how much memory each ParallelABSAAnalyzer worker
+process uses on its own, with every worker loading its own models and
+with the models preloaded in the parent and shared copy-on-write. Each
+pool analyzes the same synthetic corpus first, so the workers have
+touched their models the way a real job does. It then reports per
+worker the USS (memory only that worker uses), PSS and RSS, and the PSS
+of the whole process tree, read from /proc/<pid>/smaps_rollup (Linux
+only).
+
+Usage:
+    python -m benchmarks.worker_memory [--workers 4] [--output worker_memory.json]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from config import settings
+from benchmarks.run_benchmarks import generate_corpus
+from src.core.parallel import ParallelABSAAnalyzer
+from src.utils.resource_usage import get_memory_breakdown_mb
+
+MODES = {'per_worker_models': False, 'preloaded': True}
+
+
+def measure_pool(corpus, workers, preload, scoring):
+    """
+    Start a pool, analyze the corpus and measure its processes.
+    
+    Returns:
+        dict: Memory of the parent and of each worker in MB, and per-worker means
+    """
+    with ParallelABSAAnalyzer(workers=workers, start_method='fork', preload=preload,
+                              scoring=scoring) as analyzer:
+        start = time.perf_counter()
+        analyzer.analyze_batch(corpus)
+        seconds = time.perf_counter() - start
+        parent = get_memory_breakdown_mb()
+        samples = [get_memory_breakdown_mb(pid) for pid in analyzer.worker_pids()]
+    
+    samples = [sample for sample in samples if sample is not None]
+    mean = {key: sum(sample[key] for sample in samples) / len(samples) for key in samples[0]}
+    return {
+        'docs_per_sec': len(corpus) / seconds,
+        'parent_mb': parent,
+        'workers_mb': samples,
+        'mean_worker_mb': mean,
+        'total_pss_mb': parent['pss'] + sum(sample['pss'] for sample in samples)
+    }
+
+
+def main():
+    """Run the measurement."""
+    parser = argparse.ArgumentParser(description="Per-worker memory with and without preloaded models")
+    parser.add_argument('--workers', type=int, default=4, help="Worker processes per pool")
+    parser.add_argument('--documents', type=int, default=200, help="Synthetic documents analyzed per pool")
+    parser.add_argument('--scoring', choices=('aspect', 'context'), default=settings.SCORING_MODE,
+                        help="Scoring mode of the workers")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed for the synthetic corpus")
+    parser.add_argument('--output', help="Write the results as JSON to this file")
+    args = parser.parse_args()
+    
+    if get_memory_breakdown_mb() is None:
+        print("✗ /proc/<pid>/smaps_rollup is unavailable; this benchmark needs Linux 4.14+")
+        sys.exit(1)
+    
+    corpus = generate_corpus(args.documents, 1, 6, 1, random.Random(args.seed))
+    report = {
+        'meta': {
+            'timestamp': time.time(),
+            'workers': args.workers,
+            'documents': args.documents,
+            'stanza_processors': settings.STANZA_PROCESSORS,
+            'scoring': args.scoring
+        },
+        'modes': {}
+    }
+    
+    # Preloading fills this process with the models, so it is measured last
+    for name, preload in MODES.items():
+        print(f"Measuring {args.workers} workers ({name})...")
+        metrics = measure_pool(corpus, args.workers, preload, args.scoring)
+        report['modes'][name] = metrics
+        mean = metrics['mean_worker_mb']
+        print(f"  per worker: USS {mean['uss']:.1f} MB, PSS {mean['pss']:.1f} MB, "
+              f"RSS {mean['rss']:.1f} MB ({mean['shared']:.1f} MB shared)")
+        print(f"  process tree PSS {metrics['total_pss_mb']:.1f} MB, "
+              f"{metrics['docs_per_sec']:.1f} docs/sec")
+    
+    before = report['modes']['per_worker_models']['mean_worker_mb']['uss']
+    after = report['modes']['preloaded']['mean_worker_mb']['uss']
+    report['uss_saved_per_worker_mb'] = before - after
+    print(f"✓ Preloading saves {before - after:.1f} MB of unique memory per worker "
+          f"({before:.1f} -> {after:.1f} MB)")
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"✓ Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,10 +2,29 @@
 Configuration settings for ABSA project
 """
 
+import os
+
 # Model settings
 STANZA_LANGUAGE = 'en'
 NLTK_LANGUAGE = 'english'
 
+# Stanza processors to load; the engine only reads tokens, XPOS tags and the
+# dependency parse (depparse needs lemma). None loads the full default pipeline.
+STANZA_PROCESSORS = 'tokenize,pos,lemma,depparse'
+
+# Hand Stanza the engine's whitespace separated word lists instead of letting
+# it re-tokenize, so parse word ids line up exactly with the merged words
+STANZA_PRETOKENIZED = False
+
+# Log the load time, memory and latency the processor profile saves versus
+# the full default pipeline at startup. Both are measured once in fresh
+# processes and stored next to the models; the full pipeline's models are
+# downloaded with the profile's (a failed comparison only logs a warning)
+STANZA_PROFILE_COMPARE = os.environ.get('ABSA_PROFILE_COMPARE', '1').lower() in ('1', 'true', 'yes')
+
+# Sentence used to measure per-sentence latency at startup
+STANZA_PROBE_TEXT = "the battery life of this phone is excellent but the camera is poor"
+
 # Dependency relations to consider for aspect-opinion linking
 DEPENDENCY_RELATIONS = [
     "nsubj", "acl:relcl", "obj", "dobj", "agent", 
@@ -20,15 +39,129 @@ FEATURE_POS_TAGS = ['JJ', 'NN', 'JJR', 'NNS', 'RB']
 POSITIVE_THRESHOLD = 0.1
 NEGATIVE_THRESHOLD = -0.1
 
-# NLTK resources to download
-NLTK_RESOURCES = [
-    'stopwords',
-    'vader_lexicon', 
-    'punkt',
-    'averaged_perceptron_tagger',
-    'punkt_tab',
-    'averaged_perceptron_tagger_eng'
-]
+# Number of documents parsed together in one Stanza bulk call
+BATCH_SIZE = 64
+
+# Parallel analysis (ParallelABSAAnalyzer); None workers uses every CPU core
+PARALLEL_WORKERS = None
+# Documents sent to a worker process at a time
+PARALLEL_CHUNK_SIZE = 32
+# Chunks queued per worker before reading more input (backpressure)
+PARALLEL_MAX_PENDING = 2
+# multiprocessing start method; None uses the platform default
+PARALLEL_START_METHOD = None
+# Load the models once in the parent and fork the workers from it, so
+# they share the model memory copy-on-write instead of loading one copy
+# each (needs the 'fork' start method, i.e. Linux or macOS with fork)
+PARALLEL_PRELOAD = os.environ.get('ABSA_PRELOAD', '').lower() in ('1', 'true', 'yes')
+
+# PyTorch threads per process (None keeps torch's default of one intra-op
+# thread per core, which oversubscribes the CPU when several analyzers or
+# worker processes share a machine). ParallelABSAAnalyzer workers default
+# to an equal share of the available cores each.
+TORCH_INTRA_OP_THREADS = int(os.environ.get('ABSA_TORCH_THREADS', 0)) or None
+TORCH_INTER_OP_THREADS = None
+# Pin each ParallelABSAAnalyzer worker to its own share of the CPUs (Linux only)
+CPU_AFFINITY = False
+# Benchmark a few intra-op thread counts on a sample batch after loading
+# the models and keep the fastest (ModelManager.autotune_threads)
+TORCH_AUTOTUNE = os.environ.get('ABSA_TORCH_AUTOTUNE', '').lower() in ('1', 'true', 'yes')
+# Timed bulk calls per candidate thread count while auto-tuning
+AUTOTUNE_REPEATS = 3
+
+# Result cache in front of ABSAAnalyzer.analyze: maximum in-memory entries
+# (0 disables the cache) and an optional SQLite file shared across processes
+RESULT_CACHE_SIZE = 10000
+RESULT_CACHE_PATH = os.environ.get('ABSA_RESULT_CACHE')
+
+# Sentence-level parse cache: maximum sentences kept per analyzer / worker
+# (0 disables it). Sentences found there skip NLTK tagging and Stanza.
+SENTENCE_CACHE_SIZE = 50000
+
+# Aspect scoring: 'aspect' scores the bare aspect word with VADER, 'context'
+# aggregates the aspect word and its dependency-linked opinion words, with
+# negation from 'neg' edges (can be chosen per call as well)
+SCORING_MODE = 'aspect'
+
+# Distinct aspect terms whose VADER scores are memoized (None is unbounded)
+SCORE_CACHE_SIZE = 100000
+
+# Documents between checkpoints of resumable corpus jobs
+CHECKPOINT_INTERVAL = 1000
+
+# Documents looked up in the manifest and analyzed together in incremental runs
+MANIFEST_BLOCK_SIZE = 500
+
+# Let one Stanza parse per sentence drive tokenization, tagging and linking
+# instead of the NLTK tag / merge / re-tag passes (results can differ where
+# Stanza's tags disagree with NLTK's, see tests/test_mode_parity.py)
+SINGLE_PASS = False
+
+# Engine mode: 'stanza' links aspects to opinion words through the Stanza
+# dependency parse, 'rules' through POS-pattern windows over the NLTK tags
+# (no parse, for latency-critical callers; can be chosen per call as well)
+ENGINE_MODE = 'stanza'
+
+# Words scanned after a word for its opinion / target in 'rules' mode
+RULE_WINDOW = 4
+
+# Document size guard: documents longer than MAX_DOCUMENT_CHARS characters
+# are truncated at a word boundary ('truncate') or fail with
+# DocumentTooLargeError ('reject'); None disables the guard
+MAX_DOCUMENT_CHARS = 100000
+OVERSIZE_POLICY = 'truncate'
+
+# Documents with more sentences than this parse all of them in one Stanza
+# bulk call instead of sentence by sentence
+LONG_DOCUMENT_SENTENCES = 8
+
+# ParallelABSAAnalyzer splits documents of at least LONG_DOCUMENT_CHARS
+# characters into jobs of SENTENCE_CHUNK_SIZE sentences spread over the workers
+LONG_DOCUMENT_CHARS = 5000
+SENTENCE_CHUNK_SIZE = 16
+
+# Adaptive engine routing (EngineRouter): documents go to Stanza while the
+# estimated time to serve them, including queued work, fits the latency
+# budget, and to the rules engine beyond it or when the queue is deeper than
+# ROUTER_MAX_QUEUE_DEPTH. Costs start at these ms-per-word estimates and
+# follow measured batches with the given smoothing.
+ROUTER_LATENCY_BUDGET_MS = 200
+ROUTER_MAX_QUEUE_DEPTH = 256
+ROUTER_STANZA_MS_PER_WORD = 1.0
+ROUTER_RULES_MS_PER_WORD = 0.05
+ROUTER_SMOOTHING = 0.2
+
+# Record per-stage timings, counters and cache hit rates in the global
+# metrics registry (off by default; the disabled engine skips all bookkeeping)
+METRICS_ENABLED = os.environ.get('ABSA_METRICS', '') not in ('', '0')
+
+# HTTP service ('absa_main.py serve'): requests arriving within
+# SERVER_MAX_WAIT_MS of each other are analyzed together, up to
+# SERVER_MAX_BATCH_SIZE documents per micro-batch
+SERVER_HOST = os.environ.get('ABSA_HOST', '127.0.0.1')
+SERVER_PORT = int(os.environ.get('ABSA_PORT', 8000))
+SERVER_MAX_BATCH_SIZE = 32
+SERVER_MAX_WAIT_MS = 5
+# Largest accepted request body
+SERVER_MAX_BODY_BYTES = 1024 * 1024
+
+# NLTK resources to download, with the path nltk.data.find() looks them up by
+NLTK_RESOURCES = {
+    'stopwords': 'corpora/stopwords',
+    'vader_lexicon': 'sentiment/vader_lexicon.zip',
+    'punkt': 'tokenizers/punkt',
+    'averaged_perceptron_tagger': 'taggers/averaged_perceptron_tagger',
+    'punkt_tab': 'tokenizers/punkt_tab',
+    'averaged_perceptron_tagger_eng': 'taggers/averaged_perceptron_tagger_eng'
+}
+
+# Model directories (None uses the NLTK / Stanza defaults)
+NLTK_DATA_DIR = os.environ.get('ABSA_NLTK_DATA')
+STANZA_MODEL_DIR = os.environ.get('ABSA_STANZA_DIR')
+
+# Never download at runtime; resources must be prepared beforehand with
+# 'python absa_main.py prepare'
+OFFLINE = os.environ.get('ABSA_OFFLINE', '').lower() in ('1', 'true', 'yes')
 
 # Package requirements
 REQUIREMENTS = [
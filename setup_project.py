@@ -81,13 +81,13 @@ def verify_directory_structure():
 
 
 def setup_models():
-    """Initialize NLP models."""
+    """Download NLP model resources."""
     print("Setting up NLP models...")
     try:
         from src.models.model_manager import get_model_manager
         
         manager = get_model_manager()
-        if manager.setup_all():
+        if manager.prepare():
             print("✓ NLP models setup complete")
             return True
         else:
@@ -5,11 +5,606 @@ This module contains the main function for performing aspect-based sentiment ana
 It extracts aspects from text and determines sentiment for each aspect.
 """
 
+import hashlib
+import json
+import time
+
 import nltk
-from nltk.sentiment.vader import SentimentIntensityAnalyzer
+from nltk.sentiment.vader import SentimentIntensityAnalyzer, VaderConstants
+
+from config import settings
+from config.settings import (
+    DEPENDENCY_RELATIONS, ENGINE_MODE, FEATURE_POS_TAGS, LONG_DOCUMENT_SENTENCES, MAX_DOCUMENT_CHARS,
+    OVERSIZE_POLICY, POSITIVE_THRESHOLD, NEGATIVE_THRESHOLD, RULE_WINDOW, SCORING_MODE
+)
+from src.core.scoring import term_scorer
+from src.utils.text_processing import pos_tag_words, truncate_document
+
+# Bump whenever a change to this module alters analysis results
+ENGINE_VERSION = 2
+
+# Relations that link an aspect to an opinion word, and POS tags of candidate aspects
+LINK_RELATIONS = frozenset(DEPENDENCY_RELATIONS)
+FEATURE_TAGS = frozenset(FEATURE_POS_TAGS)
+
+# Scoring modes: 'aspect' scores the bare aspect word, 'context' aggregates
+# the aspect word and its linked opinion words
+SCORING_MODES = ('aspect', 'context')
+
+# Engine modes: 'stanza' links through the dependency parse, 'rules' through
+# POS-pattern windows over the NLTK tags without any parse
+ENGINE_MODES = ('stanza', 'rules')
+
+# What happens to documents longer than MAX_DOCUMENT_CHARS
+OVERSIZE_POLICIES = ('truncate', 'reject')
+
+
+class DocumentTooLargeError(ValueError):
+    """A document exceeds MAX_DOCUMENT_CHARS and the oversize policy is 'reject'."""
+
+# A word is negated by a 'neg' edge or, as UD v2 parsers attach negators as
+# 'advmod', by an 'advmod' edge from one of VADER's negation words
+NEGATION_WORDS = frozenset(VaderConstants.NEGATE)
+
+
+def engine_fingerprint(single_pass=False, scoring=SCORING_MODE, engine=ENGINE_MODE):
+    """
+    Get a fingerprint of everything that determines the engine's results.
+    
+    Cached results are keyed by this value, so changing the engine version,
+    the linking relations, the feature POS tags or the Stanza setup in
+    config/settings.py invalidates them automatically.
+    
+    Args:
+        single_pass (bool): Whether the single-pass engine mode is used
+        scoring (str): Scoring mode ('aspect' or 'context')
+        engine (str): Engine mode ('stanza' or 'rules')
+    
+    Returns:
+        str: Hex digest identifying the engine configuration
+    """
+    state = {
+        'engine_version': ENGINE_VERSION,
+        'dependency_relations': list(settings.DEPENDENCY_RELATIONS),
+        'feature_pos_tags': list(settings.FEATURE_POS_TAGS),
+        'stanza_language': settings.STANZA_LANGUAGE,
+        'stanza_processors': settings.STANZA_PROCESSORS,
+        'stanza_pretokenized': settings.STANZA_PRETOKENIZED,
+        'single_pass': single_pass,
+        'max_document_chars': settings.MAX_DOCUMENT_CHARS,
+        'oversize_policy': settings.OVERSIZE_POLICY
+    }
+    # Only non-default modes are added, so existing 'aspect' fingerprints stay valid
+    if scoring != 'aspect':
+        state['scoring'] = scoring
+    if engine != 'stanza':
+        state['engine'] = engine
+        state['rule_window'] = RULE_WINDOW
+    return hashlib.sha256(json.dumps(state, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+
+def limit_document(txt, max_chars=MAX_DOCUMENT_CHARS, oversize=OVERSIZE_POLICY):
+    """
+    Apply the document size guard.
+    
+    Args:
+        txt (str): Input text
+        max_chars (int): Longest accepted document (None accepts any length)
+        oversize (str): 'truncate' cuts longer documents at the last word
+            boundary before max_chars, 'reject' raises DocumentTooLargeError
+    
+    Returns:
+        str: The text, truncated if needed (with a warning, since the cut-off
+            text is missing from the results)
+    """
+    if max_chars is None or len(txt) <= max_chars:
+        return txt
+    if oversize == 'reject':
+        raise DocumentTooLargeError(f"Document has {len(txt)} characters, the limit is {max_chars}")
+    truncated = truncate_document(txt, max_chars)
+    print(f"⚠ Document truncated from {len(txt)} to {len(truncated)} characters "
+          f"(MAX_DOCUMENT_CHARS={max_chars}); the rest is not analyzed")
+    return truncated
+
+
+def document_sentences(txt, max_chars=MAX_DOCUMENT_CHARS, oversize=OVERSIZE_POLICY):
+    """
+    Split a document into the lowercased sentences the engine analyzes.
+    
+    Args:
+        txt (str): Input text
+        max_chars (int): Document size limit, see limit_document()
+        oversize (str): Oversize policy, see limit_document()
+    
+    Returns:
+        list: Lowercased sentences
+    """
+    return nltk.sent_tokenize(limit_document(txt, max_chars, oversize).lower())
+
+
+def merge_compounds(taggedList):
+    """
+    Merge consecutive singular nouns into compound words.
+    
+    Args:
+        taggedList (list): List of (word, pos_tag) tuples
+    
+    Returns:
+        tuple: (newwordList, sources) where sources[k] lists the indices in
+            taggedList that make up newwordList[k]
+    """
+    newwordList = []
+    sources = []
+    flag = 0
+    for i in range(0,len(taggedList)-1):
+        if(taggedList[i][1]=="NN" and taggedList[i+1][1]=="NN"):
+            newwordList.append(taggedList[i][0]+taggedList[i+1][0])
+            sources.append([i, i+1])
+            flag=1
+        else:
+            if(flag==1):
+                flag=0
+                continue
+            newwordList.append(taggedList[i][0])
+            sources.append([i])
+            if(i==len(taggedList)-2):
+                newwordList.append(taggedList[i+1][0])
+                sources.append([i+1])
+
+    return newwordList, sources
+
+
+def prepare_sentence(line, stop_words):
+    """
+    Tokenize, POS-tag and merge compound nouns for a single sentence.
+    
+    Args:
+        line (str): Lowercased sentence text
+        stop_words (set): Set of stopwords to filter out
+    
+    Returns:
+        tuple: (newwordList, finaltxt, taggedList) where newwordList is the
+            compound-merged word list, finaltxt the text handed to Stanza and
+            taggedList the POS tags of the stopword-filtered words
+    """
+    txt_list = nltk.word_tokenize(line)
+    taggedList = pos_tag_words(txt_list)
+
+    newwordList, _ = merge_compounds(taggedList)
+
+    finaltxt = ' '.join(word for word in newwordList)
+    new_txt_list = nltk.word_tokenize(finaltxt)
+    wordsList = [w for w in new_txt_list if not w in stop_words]
+    taggedList = pos_tag_words(wordsList)
+
+    return newwordList, finaltxt, taggedList
+
+
+def dependency_edges(doc, newwordList):
+    """
+    Collect the dependency edges of a parse of the compound-merged sentence.
+    
+    Args:
+        doc: Stanza Document parsed from the sentence's finaltxt
+        newwordList (list): Compound-merged word list of the sentence
+    
+    Returns:
+        list: List of [dependent, head, relation] edges; the head is 0 for the root
+    """
+    dep_node = []
+    for sent in doc.sentences:
+        for dep_edge in sent.dependencies:
+            dep_node.append([dep_edge[2].text, dep_edge[0].id, dep_edge[1]])
+
+    for i in range(0, len(dep_node)):
+        if (int(dep_node[i][1]) != 0):
+            dep_node[i][1] = newwordList[(int(dep_node[i][1]) - 1)]
+
+    return dep_node
+
+
+def stanza_input(line, nlp):
+    """
+    Get the text to hand Stanza for a raw sentence in single-pass mode.
+    
+    Args:
+        line (str): Lowercased sentence text
+        nlp: Stanza NLP pipeline object
+    
+    Returns:
+        str: The sentence, pre-split into words if the pipeline is pretokenized
+    """
+    if getattr(nlp, 'config', {}).get('tokenize_pretokenized'):
+        return ' '.join(nltk.word_tokenize(line))
+    return line
+
+
+def prepare_parsed_sentence(doc, stop_words):
+    """
+    Build the merged words, dependency edges and POS tags from one Stanza parse.
+    
+    Single-pass counterpart of prepare_sentence() + dependency_edges(): Stanza's
+    own tokens and XPOS tags drive compound merging and stopword filtering,
+    and its dependency tree over the raw sentence is projected onto the
+    merged words, so no NLTK tagging or second parse is needed.
+    
+    Results can differ from the two-pass mode where Stanza's tags disagree
+    with NLTK's: compounds are merged on Stanza's tags, feature tags come
+    from tagging the whole sentence instead of re-tagging the
+    stopword-filtered words, and a compound keeps its last token's tag.
+    
+    Args:
+        doc: Stanza Document parsed from the raw (lowercased) sentence
+        stop_words (set): Set of stopwords to filter out
+    
+    Returns:
+        tuple: (newwordList, dep_node, taggedList) as used by link_aspects()
+    """
+    words = [word for sent in doc.sentences for word in sent.words]
+    newwordList, sources = merge_compounds([(word.text, word.xpos) for word in words])
+
+    # Map every token to the first merged word that contains it
+    position = {}
+    for k, source in enumerate(sources):
+        for idx in source:
+            position.setdefault(idx, k)
+
+    dep_node = []
+    offset = 0
+    for sent in doc.sentences:
+        for word in sent.words:
+            dependent = position.get(offset + word.id - 1)
+            if word.head == 0:
+                head = 0
+            else:
+                head = position.get(offset + word.head - 1)
+            # Tokens dropped by merging and edges inside a compound are skipped
+            if dependent is None or head is None or dependent == head:
+                continue
+            dep_node.append([newwordList[dependent], 0 if word.head == 0 else newwordList[head], word.deprel])
+        offset += len(sent.words)
+
+    taggedList = [
+        (word, words[source[-1]].xpos)
+        for word, source in zip(newwordList, sources)
+        if not word in stop_words
+    ]
+
+    return newwordList, dep_node, taggedList
+
+
+def rule_edges(taggedWords, window=RULE_WINDOW):
+    """
+    Link words by POS patterns within a small window instead of a parse.
+    
+    The edges mimic the dependency relations the Stanza path links through:
+    an adjective before a noun ('great battery') is 'amod', a noun followed
+    by an adjective across verbs and adverbs ('the battery is really great')
+    is 'nsubj', an adverb right before an adjective, verb or adverb
+    (including negators such as 'not') or right after a verb ('works well')
+    is 'advmod', and a noun after a verb is 'obj'.
+    
+    Args:
+        taggedWords (list): (word, pos_tag) pairs of the merged words, stopwords included
+        window (int): Words scanned after each word
+    
+    Returns:
+        list: List of [dependent, head, relation] edges, as from dependency_edges()
+    """
+    dep_node = []
+    for i, (word, tag) in enumerate(taggedWords):
+        following = taggedWords[i + 1:i + 1 + window]
+        if tag.startswith('JJ'):
+            for other, other_tag in following:
+                if other_tag.startswith('NN'):
+                    dep_node.append([word, other, 'amod'])
+                    break
+                if not (other_tag.startswith('JJ') or other_tag == ','):
+                    break
+        elif tag.startswith('NN'):
+            for other, other_tag in following:
+                if other_tag.startswith('JJ'):
+                    dep_node.append([word, other, 'nsubj'])
+                    break
+                if not (other_tag.startswith('VB') or other_tag.startswith('RB')):
+                    break
+        elif tag.startswith('RB'):
+            if following and following[0][1].startswith(('JJ', 'VB', 'RB')):
+                dep_node.append([word, following[0][0], 'advmod'])
+            elif i and taggedWords[i - 1][1].startswith('VB'):
+                dep_node.append([word, taggedWords[i - 1][0], 'advmod'])
+        elif tag.startswith('VB'):
+            for other, other_tag in following:
+                if other_tag.startswith('NN'):
+                    dep_node.append([other, word, 'obj'])
+                    break
+                if not (other_tag.startswith('JJ') or other_tag in ('DT', 'PRP$', 'CD')):
+                    break
+    return dep_node
+
+
+def prepare_rule_sentence(line, stop_words):
+    """
+    Build the merged words, rule-based edges and POS tags of a sentence.
+    
+    'rules' engine counterpart of prepare_sentence() + dependency_edges():
+    one NLTK tagging pass drives compound merging, stopword filtering and
+    the POS-pattern linking of rule_edges(), so no Stanza parse is needed.
+    
+    Args:
+        line (str): Lowercased sentence text
+        stop_words (set): Set of stopwords to filter out
+    
+    Returns:
+        tuple: (newwordList, dep_node, taggedList) as used by link_aspects()
+    """
+    taggedWords = pos_tag_words(nltk.word_tokenize(line))
+    newwordList, sources = merge_compounds(taggedWords)
+    merged = [(word, taggedWords[source[-1]][1]) for word, source in zip(newwordList, sources)]
+    taggedList = [(word, tag) for word, tag in merged if not word in stop_words]
+    return newwordList, rule_edges(merged), taggedList
+
+
+def index_edges(dep_node):
+    """
+    Index dependency edges with a linking relation by the words they touch.
+    
+    Args:
+        dep_node (list): List of [dependent, head, relation] edges
+    
+    Returns:
+        dict: word -> words linked to it, in edge order
+    """
+    edge_index = {}
+    for dependent, head, relation in dep_node:
+        if relation not in LINK_RELATIONS:
+            continue
+        edge_index.setdefault(dependent, []).append(head)
+        if head != dependent:
+            edge_index.setdefault(head, []).append(dependent)
+    return edge_index
+
+
+def negated_words(dep_node):
+    """
+    Find the words modified by a negation.
+    
+    Args:
+        dep_node (list): List of [dependent, head, relation] edges
+    
+    Returns:
+        set: Heads of 'neg' edges and of 'advmod' edges from a negation word
+    """
+    return {
+        head for dependent, head, relation in dep_node
+        if relation == 'neg' or (relation == 'advmod' and dependent in NEGATION_WORDS)
+    }
+
+
+def link_aspects(dep_node, taggedList, negation=False):
+    """
+    Link candidate aspects to opinion words using the dependency edges.
+    
+    The edges are indexed once per sentence, so linking costs
+    O(features + edges) instead of a scan of every edge per feature.
+    
+    Args:
+        dep_node (list): List of [dependent, head, relation] edges
+        taggedList (list): POS tags of the stopword-filtered words
+        negation (bool): Also report which of the aspect and its linked words are negated
+    
+    Returns:
+        list: List of [aspect, linked_words] pairs, or of
+            [aspect, linked_words, negated_words] triples with negation=True
+    """
+    edge_index = index_edges(dep_node)
+
+    cluster = []
+    if not negation:
+        for word, tag in taggedList:
+            if tag in FEATURE_TAGS:
+                cluster.append([word, list(edge_index.get(word, ()))])
+        return cluster
+
+    negated = negated_words(dep_node)
+    for word, tag in taggedList:
+        if tag in FEATURE_TAGS:
+            linked = list(edge_index.get(word, ()))
+            cluster.append([word, linked, [w for w in [word] + linked if w in negated]])
+    return cluster
+
+
+def context_score(aspect, score):
+    """
+    Score an aspect by the sentiment of its own word and its linked words.
+    
+    Each distinct word is scored with VADER, negated words have their score
+    scaled by VADER's negation factor, and the mean of the non-neutral word
+    scores is the aspect's score.
+    
+    Args:
+        aspect (list): [aspect, linked_words, negated_words] from link_aspects(negation=True)
+        score (callable): Term -> VADER compound score
+    
+    Returns:
+        float: Context sentiment score between -1.0 and 1.0
+    """
+    word, linked, negated = aspect
+    total = 0.0
+    count = 0
+    for term in dict.fromkeys([word] + linked):
+        value = score(term)
+        if not value:
+            continue
+        if term in negated:
+            value *= VaderConstants.N_SCALAR
+        total += value
+        count += 1
+    return round(total / count, 4) if count else 0.0
+
+
+def score_aspects(finalcluster, sid, scoring=SCORING_MODE):
+    """
+    Score each aspect with VADER.
+    
+    Args:
+        finalcluster (list): Output of link_aspects() (with negation=True for 'context')
+        sid: NLTK SentimentIntensityAnalyzer or TermScorer object
+        scoring (str): 'aspect' scores the aspect word alone, 'context' also
+            its linked opinion words (see context_score())
+    
+    Returns:
+        list: List of [aspect, sentiment_score] pairs
+    """
+    score = term_scorer(sid).score
+    if scoring == 'context':
+        return [[aspect[0], context_score(aspect, score)] for aspect in finalcluster]
+    return [[aspect[0], score(aspect[0])] for aspect in finalcluster]
 
 
-def aspect_sentiment_analysis(txt, stop_words, nlp, sid):
+def score_aspects_batch(finalclusters, sid, scoring=SCORING_MODE):
+    """
+    Score the aspects of many documents, running VADER once per distinct term.
+    
+    Args:
+        finalclusters (list): One link_aspects() output per document
+        sid: NLTK SentimentIntensityAnalyzer or TermScorer object
+        scoring (str): Scoring mode, see score_aspects()
+    
+    Returns:
+        list: One list of [aspect, sentiment_score] pairs per document
+    """
+    if scoring == 'context':
+        terms = (term for finalcluster in finalclusters for aspect in finalcluster
+                 for term in [aspect[0]] + aspect[1])
+    else:
+        terms = (aspect[0] for finalcluster in finalclusters for aspect in finalcluster)
+    scores = term_scorer(sid).score_many(terms)
+    
+    if scoring == 'context':
+        return [[[aspect[0], context_score(aspect, scores.__getitem__)] for aspect in finalcluster]
+                for finalcluster in finalclusters]
+    return [[[aspect[0], scores[aspect[0]]] for aspect in finalcluster]
+            for finalcluster in finalclusters]
+
+
+def check_scoring(scoring):
+    """Raise ValueError for an unknown scoring mode."""
+    if scoring not in SCORING_MODES:
+        raise ValueError(f"Unknown scoring mode {scoring!r}, expected one of {', '.join(SCORING_MODES)}")
+
+
+def check_engine(engine):
+    """Raise ValueError for an unknown engine mode."""
+    if engine not in ENGINE_MODES:
+        raise ValueError(f"Unknown engine mode {engine!r}, expected one of {', '.join(ENGINE_MODES)}")
+
+
+def sentiment_label(score):
+    """Convert sentiment score to label."""
+    if score > POSITIVE_THRESHOLD:
+        return "Positive"
+    elif score < NEGATIVE_THRESHOLD:
+        return "Negative"
+    else:
+        return "Neutral"
+
+
+def detailed_results(text, results):
+    """
+    Build detailed results with sentiment labels for one analyzed text.
+    
+    Args:
+        text (str): The analyzed input text
+        results (list): List of [aspect, sentiment_score] pairs
+    
+    Returns:
+        dict: Detailed analysis results
+    """
+    details = {
+        'input_text': text,
+        'aspects_found': len(results),
+        'aspects': []
+    }
+
+    for aspect, sentiment_score in results:
+        details['aspects'].append({
+            'aspect': aspect,
+            'sentiment_score': sentiment_score,
+            'sentiment_label': sentiment_label(sentiment_score)
+        })
+
+    return details
+
+
+def sentence_key(line, single_pass=False, engine=ENGINE_MODE):
+    """Get the sentence cache key of a sentence under an engine configuration."""
+    return ('rules', line) if engine == 'rules' else (single_pass, line)
+
+
+def parse_sentence(line, stop_words, nlp, single_pass=False, sentence_cache=None, metrics=None,
+                   engine=ENGINE_MODE):
+    """
+    Produce the linking inputs of one sentence, using the sentence cache if given.
+    
+    Args:
+        line (str): Lowercased sentence text
+        stop_words (set): Set of stopwords to filter out
+        nlp: Stanza NLP pipeline object (unused in 'rules' mode)
+        single_pass (bool): Use the single-pass Stanza-driven preprocessing
+        sentence_cache: LRUCache of parsed sentences (optional)
+        metrics: MetricsRegistry receiving stage timings and counters (optional)
+        engine (str): 'stanza' or 'rules' (see prepare_rule_sentence())
+    
+    Returns:
+        tuple: (newwordList, dep_node, taggedList)
+    """
+    key = sentence_key(line, single_pass, engine)
+    if sentence_cache is not None:
+        parsed = sentence_cache.get(key)
+        if metrics is not None:
+            metrics.increment('sentence_cache_hits' if parsed is not None else 'sentence_cache_misses')
+        if parsed is not None:
+            return parsed
+
+    start = time.perf_counter() if metrics is not None else 0.0
+    if engine == 'rules':
+        parsed = prepare_rule_sentence(line, stop_words)
+        if metrics is not None:
+            metrics.lap('tokenize_tag', start)
+    elif single_pass:
+        doc = nlp(stanza_input(line, nlp))
+        if metrics is not None:
+            start = metrics.lap('parse', start)
+        parsed = prepare_parsed_sentence(doc, stop_words)
+        if metrics is not None:
+            metrics.lap('tokenize_tag', start)
+    else:
+        newwordList, finaltxt, taggedList = prepare_sentence(line, stop_words)
+        if metrics is not None:
+            start = metrics.lap('tokenize_tag', start)
+        doc = nlp(finaltxt)
+        if metrics is not None:
+            start = metrics.lap('parse', start)
+        parsed = (newwordList, dependency_edges(doc, newwordList), taggedList)
+        if metrics is not None:
+            metrics.lap('link', start)
+
+    if sentence_cache is not None:
+        sentence_cache.put(key, parsed)
+    return parsed
+
+
+def _count_sentence(metrics, parsed):
+    """Add one parsed sentence to the sentence/token/edge counters."""
+    newwordList, dep_node, taggedList = parsed
+    metrics.increment('sentences')
+    metrics.increment('tokens', len(newwordList))
+    metrics.increment('edges', len(dep_node))
+
+
+def aspect_sentiment_analysis(txt, stop_words, nlp, sid, single_pass=False, sentence_cache=None,
+                              metrics=None, scoring=SCORING_MODE, engine=ENGINE_MODE):
     """
     Perform aspect-based sentiment analysis on input text.
     
@@ -18,72 +613,200 @@ def aspect_sentiment_analysis(txt, stop_words, nlp, sid):
         stop_words (set): Set of stopwords to filter out
         nlp: Stanza NLP pipeline object
         sid: NLTK SentimentIntensityAnalyzer object
+        single_pass (bool): Let one Stanza parse per sentence drive tokenization,
+            tagging and linking instead of the NLTK tag/merge/re-tag passes
+        sentence_cache: LRUCache of parsed sentences; sentences found there
+            skip tagging and Stanza entirely (optional)
+        metrics: MetricsRegistry receiving stage timings (tokenize_tag, parse,
+            link, score) and document/sentence/token/edge/aspect counters (optional)
+        scoring (str): 'aspect' scores each aspect word alone, 'context' also
+            its linked opinion words with negation handling
+        engine (str): 'stanza' links aspects through the dependency parse,
+            'rules' through POS-pattern windows without Stanza (nlp may be None)
     
     Returns:
         list: List of [aspect, sentiment_score] pairs
     """
-    txt = txt.lower()
-    sentList = nltk.sent_tokenize(txt)
+    check_scoring(scoring)
+    check_engine(engine)
+    negation = scoring == 'context'
+    start = time.perf_counter() if metrics is not None else 0.0
+    sentList = document_sentences(txt)
+    if metrics is not None:
+        metrics.lap('tokenize_tag', start)
+    
+    # Long documents parse all their sentences in one Stanza bulk call
+    if len(sentList) > LONG_DOCUMENT_SENTENCES and engine == 'stanza':
+        return aspect_sentiment_analysis_batch([sentList], stop_words, nlp, sid,
+                                               single_pass=single_pass,
+                                               sentence_cache=sentence_cache, metrics=metrics,
+                                               scoring=scoring, engine=engine, presplit=True)[0]
 
     finalcluster = []
 
     for line in sentList:
-        newtaggedList = []
-        txt_list = nltk.word_tokenize(line)
-        taggedList = nltk.pos_tag(txt_list)
-
-        newwordList = []
-        flag = 0
-        for i in range(0,len(taggedList)-1):
-            if(taggedList[i][1]=="NN" and taggedList[i+1][1]=="NN"):
-                newwordList.append(taggedList[i][0]+taggedList[i+1][0])
-                flag=1
-            else:
-                if(flag==1):
-                    flag=0
-                    continue
-                newwordList.append(taggedList[i][0])
-                if(i==len(taggedList)-2):
-                    newwordList.append(taggedList[i+1][0])
-
-        finaltxt = ' '.join(word for word in newwordList)
-        new_txt_list = nltk.word_tokenize(finaltxt)
-        wordsList = [w for w in new_txt_list if not w in stop_words]
-        taggedList = nltk.pos_tag(wordsList)
+        parsed = parse_sentence(line, stop_words, nlp, single_pass, sentence_cache, metrics, engine)
+        newwordList, dep_node, taggedList = parsed
+        if metrics is not None:
+            _count_sentence(metrics, parsed)
+            start = time.perf_counter()
+        finalcluster.extend(link_aspects(dep_node, taggedList, negation))
+        if metrics is not None:
+            metrics.lap('link', start)
+
+    # Sentiment analysis
+    if metrics is None:
+        return score_aspects(finalcluster, sid, scoring)
+
+    start = time.perf_counter()
+    aspect_sentiments = score_aspects(finalcluster, sid, scoring)
+    metrics.lap('score', start)
+    metrics.increment('documents')
+    metrics.increment('aspects', len(aspect_sentiments))
+    return aspect_sentiments
 
-        doc = nlp(finaltxt)
 
-        dep_node = []
-        for sent in doc.sentences:
-            for dep_edge in sent.dependencies:
-                dep_node.append([dep_edge[2].text, dep_edge[0].id, dep_edge[1]])
-
-        for i in range(0, len(dep_node)):
-            if (int(dep_node[i][1]) != 0):
-                dep_node[i][1] = newwordList[(int(dep_node[i][1]) - 1)]
-
-        featureList = []
-        categories = []
-        for i in taggedList:
-            if(i[1]=='JJ' or i[1]=='NN' or i[1]=='JJR' or i[1]=='NNS' or i[1]=='RB'):
-                featureList.append(list(i))
-                categories.append(i[0])
-
-        for i in featureList:
-            filist = []
-            for j in dep_node:
-                if((j[0]==i[0] or j[1]==i[0]) and (j[2] in ["nsubj", "acl:relcl", "obj", "dobj", "agent", "advmod", "amod", "neg", "prep_of", "acomp", "xcomp", "compound"])):
-                    if(j[0]==i[0]):
-                        filist.append(j[1])
+def aspect_sentiment_analysis_batch(texts, stop_words, nlp, sid, single_pass=False,
+                                    sentence_cache=None, metrics=None, return_exceptions=False,
+                                    scoring=SCORING_MODE, details=False, engine=ENGINE_MODE,
+                                    presplit=False):
+    """
+    Perform aspect-based sentiment analysis on many documents at once.
+    
+    Every sentence of every document is preprocessed first, then all of them
+    are parsed in a single Stanza bulk call and the parses are mapped back to
+    their documents. Sentences repeated within the batch are parsed once and
+    sentences found in the sentence cache are not parsed at all. Every
+    distinct aspect term of the batch is scored by VADER once. Results are
+    identical to calling aspect_sentiment_analysis() on each text.
+    
+    Args:
+        texts (list): Input texts to analyze
+        stop_words (set): Set of stopwords to filter out
+        nlp: Stanza NLP pipeline object
+        sid: NLTK SentimentIntensityAnalyzer object
+        single_pass (bool): Use the single-pass Stanza-driven preprocessing
+        sentence_cache: LRUCache of parsed sentences (optional)
+        metrics: MetricsRegistry receiving stage timings and counters (optional)
+        return_exceptions (bool): If True, a document that fails is returned
+            as its exception instead of aborting the whole batch
+        scoring (str): Scoring mode ('aspect' or 'context')
+        details (bool): Return [aspect, sentiment_score, sentence_index, linked_words]
+            records instead of pairs
+        engine (str): 'stanza' or 'rules'; in 'rules' mode sentences are linked
+            while they are prepared and nothing is sent to Stanza
+        presplit (bool): texts are sentence lists from document_sentences()
+            (e.g. chunks of a long document) instead of raw texts
+    
+    Returns:
+        list: One list of [aspect, sentiment_score] pairs (or detail records) per input text
+    """
+    check_scoring(scoring)
+    check_engine(engine)
+    negation = scoring == 'context'
+    start = time.perf_counter() if metrics is not None else 0.0
+
+    # Per sentence: (cache key, cached parse, index of the text to parse, NLTK preparation)
+    prepared = []
+    stanza_texts = []
+    stanza_index = {}
+    for txt in texts:
+        try:
+            doc_sentences = []
+            for line in (txt if presplit else document_sentences(txt)):
+                key = sentence_key(line, single_pass, engine)
+                parsed = sentence_cache.get(key) if sentence_cache is not None else None
+                if metrics is not None and sentence_cache is not None:
+                    metrics.increment('sentence_cache_hits' if parsed is not None else 'sentence_cache_misses')
+                preparation = None
+                if parsed is not None:
+                    stanza_text = None
+                elif engine == 'rules':
+                    parsed = prepare_rule_sentence(line, stop_words)
+                    if sentence_cache is not None:
+                        sentence_cache.put(key, parsed)
+                    stanza_text = None
+                elif single_pass:
+                    stanza_text = stanza_input(line, nlp)
+                else:
+                    newwordList, stanza_text, taggedList = prepare_sentence(line, stop_words)
+                    preparation = (newwordList, taggedList)
+
+                # Sentences that merge down to nothing have no features, so they are not parsed
+                index = None
+                if stanza_text:
+                    index = stanza_index.get(stanza_text)
+                    if index is None:
+                        index = stanza_index[stanza_text] = len(stanza_texts)
+                        stanza_texts.append(stanza_text)
+                doc_sentences.append((key, parsed, index, preparation))
+            prepared.append(doc_sentences)
+        except Exception as e:
+            if not return_exceptions:
+                raise
+            prepared.append(e)
+
+    if metrics is not None:
+        start = metrics.lap('tokenize_tag', start)
+
+    docs = nlp.bulk_process(stanza_texts) if stanza_texts else []
+
+    if metrics is not None:
+        start = metrics.lap('parse', start)
+
+    finalclusters = []
+    sentence_indexes = []
+    for doc_sentences in prepared:
+        if isinstance(doc_sentences, Exception):
+            finalclusters.append(doc_sentences)
+            continue
+
+        try:
+            finalcluster = []
+            aspect_sentences = []
+            for sentence, (key, parsed, index, preparation) in enumerate(doc_sentences):
+                if parsed is None:
+                    doc = docs[index] if index is not None else None
+                    if single_pass:
+                        parsed = prepare_parsed_sentence(doc, stop_words) if doc else ([], [], [])
                     else:
-                        filist.append(j[0])
-            finalcluster.append([i[0], filist])
+                        newwordList, taggedList = preparation
+                        dep_node = dependency_edges(doc, newwordList) if doc else []
+                        parsed = (newwordList, dep_node, taggedList)
+                    if sentence_cache is not None:
+                        sentence_cache.put(key, parsed)
+                newwordList, dep_node, taggedList = parsed
+                if metrics is not None:
+                    _count_sentence(metrics, parsed)
+                finalcluster.extend(link_aspects(dep_node, taggedList, negation))
+                if details:
+                    aspect_sentences.extend([sentence] * (len(finalcluster) - len(aspect_sentences)))
+            finalclusters.append(finalcluster)
+            sentence_indexes.append(aspect_sentences)
+        except Exception as e:
+            if not return_exceptions:
+                raise
+            finalclusters.append(e)
 
-    # Sentiment analysis
-    aspect_sentiments = []
-    for aspect in finalcluster:
-        aspect_text = aspect[0]
-        sentiment_score = sid.polarity_scores(aspect_text)['compound']
-        aspect_sentiments.append([aspect_text, sentiment_score])
+    if metrics is not None:
+        start = metrics.lap('link', start)
+
+    # Sentiment analysis: every distinct aspect term of the batch is scored once
+    linked = [cluster for cluster in finalclusters if not isinstance(cluster, Exception)]
+    scored = score_aspects_batch(linked, sid, scoring)
+    if details:
+        scored = [
+            [[aspect, score, sentence, entry[1]]
+             for (aspect, score), sentence, entry in zip(aspect_sentiments, aspect_sentences, cluster)]
+            for aspect_sentiments, aspect_sentences, cluster in zip(scored, sentence_indexes, linked)
+        ]
+    scored = iter(scored)
+    results = [cluster if isinstance(cluster, Exception) else next(scored)
+               for cluster in finalclusters]
+
+    if metrics is not None:
+        metrics.lap('score', start)
+        metrics.increment('documents', len(linked))
+        metrics.increment('aspects', sum(len(cluster) for cluster in linked))
 
-    return aspect_sentiments
\ No newline at end of file
+    return results
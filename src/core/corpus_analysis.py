@@ -0,0 +1,160 @@
+"""
+Corpus Analysis Module
+
+This module streams documents from a corpus through an analyzer and
+writes detailed results as they are produced. Only the documents
+currently in flight are held in memory. Long jobs can record periodic
+checkpoints and send failing documents to a dead-letter file. With a
+manifest, unchanged documents take their stored results and only new or
+edited ones are analyzed. Records the reader could not parse are passed
+on as failures without being analyzed.
+"""
+
+from collections import deque
+
+from config.settings import CHECKPOINT_INTERVAL, MANIFEST_BLOCK_SIZE
+from src.core.absa_engine import detailed_results
+from src.utils.corpus_io import MalformedRecordError
+
+
+def _stream(analyzer, documents, return_exceptions):
+    """
+    Analyze every document, keeping only the documents in flight in memory.
+    
+    Yields:
+        tuple: (doc_id, text, input_offset, result) in input order
+    """
+    if hasattr(documents, 'spec') and hasattr(analyzer, 'imap_corpus'):
+        # Memory-mapped corpus: workers read the texts themselves
+        results = analyzer.imap_corpus(documents, documents.records,
+                                       return_exceptions=return_exceptions)
+        for (doc_id, text), result in zip(documents, results):
+            if isinstance(text, MalformedRecordError):
+                text, result = text.raw, text
+            yield doc_id, text, documents.offset, result
+        return
+    
+    in_flight = deque()
+    
+    def texts():
+        for doc_id, text in documents:
+            # Input offset just past this record, known as soon as it is read
+            in_flight.append((doc_id, text, getattr(documents, 'offset', None)))
+            if not isinstance(text, MalformedRecordError):
+                yield text
+    
+    def malformed():
+        # Records ahead of the next analyzed one that were never analyzed
+        while in_flight and isinstance(in_flight[0][1], MalformedRecordError):
+            doc_id, error, input_offset = in_flight.popleft()
+            yield doc_id, error.raw, input_offset, error
+    
+    for result in analyzer.imap(texts(), return_exceptions=return_exceptions):
+        yield from malformed()
+        doc_id, text, input_offset = in_flight.popleft()
+        yield doc_id, text, input_offset, result
+    yield from malformed()
+
+
+def _stream_incremental(analyzer, documents, manifest, return_exceptions, block_size):
+    """
+    Analyze only the documents the manifest has no current results for.
+    
+    Documents are read in blocks: each block is looked up in the manifest
+    with a few queries, its new or changed documents are analyzed together
+    and their results queued in the manifest. analyze_corpus() commits them
+    only once their output is written.
+    
+    Yields:
+        tuple: (doc_id, text, input_offset, result) in input order
+    """
+    block = []
+    
+    def flush():
+        readable = [(doc_id, text) for doc_id, text, _ in block
+                    if not isinstance(text, MalformedRecordError)]
+        lookups = iter(manifest.lookup(readable))
+        stored = [text if isinstance(text, MalformedRecordError) else next(lookups)
+                  for _, text, _ in block]
+        changed = [text for (_, text, _), results in zip(block, stored) if results is None]
+        fresh = iter(analyzer.imap(changed, return_exceptions=return_exceptions))
+        for (doc_id, text, input_offset), results in zip(block, stored):
+            if isinstance(text, MalformedRecordError):
+                text = text.raw
+            elif results is None:
+                results = next(fresh)
+                if not isinstance(results, Exception):
+                    manifest.record(doc_id, text, results)
+            yield doc_id, text, input_offset, results
+    
+    for doc_id, text in documents:
+        block.append((doc_id, text, getattr(documents, 'offset', None)))
+        if len(block) == block_size:
+            yield from flush()
+            block = []
+    if block:
+        yield from flush()
+
+
+def analyze_corpus(analyzer, documents, writer, dead_letter=None, checkpoint=None,
+                   checkpoint_every=CHECKPOINT_INTERVAL, manifest=None,
+                   manifest_block_size=MANIFEST_BLOCK_SIZE):
+    """
+    Analyze a stream of documents and write their detailed results in order.
+    
+    Args:
+        analyzer: ABSAAnalyzer or ParallelABSAAnalyzer (anything with imap())
+        documents (iterable): (doc_id, text) pairs, e.g. a CorpusReader
+        writer: ResultWriter receiving (doc_id, details) per document
+        dead_letter: DeadLetterWriter for documents that raise (None prints and writes no aspects)
+        checkpoint: Checkpoint updated every checkpoint_every documents
+        checkpoint_every (int): Documents between checkpoints (and manifest commits)
+        manifest: Manifest of a previous run; documents whose text and engine
+            fingerprint are unchanged are written from it instead of analyzed.
+            New results are committed together with each checkpoint, after
+            their output is written
+        manifest_block_size (int): Documents looked up and analyzed together with a manifest
+        
+    Returns:
+        int: Number of documents processed
+    """
+    start_record = getattr(documents, 'records', 0)
+    
+    def save_progress(input_offset, completed=False):
+        # Output first, then the manifest rows of the documents written, then
+        # the checkpoint: after a crash neither points past the output
+        output_offset = writer.position()
+        dead_letter_offset = dead_letter.position() if dead_letter else None
+        if manifest is not None:
+            manifest.commit()
+        if checkpoint is not None:
+            checkpoint.save(start_record + count, input_offset, output_offset, dead_letter_offset,
+                            dead_letter.count if dead_letter else 0, completed)
+    
+    if manifest is None:
+        analyzed = _stream(analyzer, documents, dead_letter is not None)
+    else:
+        analyzed = _stream_incremental(analyzer, documents, manifest, dead_letter is not None,
+                                       manifest_block_size)
+    
+    count = 0
+    input_offset = getattr(documents, 'offset', None)
+    for doc_id, text, input_offset, result in analyzed:
+        if isinstance(result, Exception):
+            if dead_letter is not None:
+                dead_letter.write(doc_id, text, result)
+            else:
+                # Only malformed records fail here; analysis errors already became []
+                print(f"Error reading record {doc_id}: {result}")
+                writer.write(doc_id, detailed_results(text, []))
+        else:
+            writer.write(doc_id, detailed_results(text, result))
+        count += 1
+        
+        if (checkpoint is not None or manifest is not None) and count % checkpoint_every == 0:
+            save_progress(input_offset)
+    
+    if checkpoint is not None or manifest is not None:
+        save_progress(input_offset, completed=True)
+    
+    return count
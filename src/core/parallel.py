@@ -0,0 +1,442 @@
+"""
+Parallel ABSA Module
+
+This module runs the analysis engine in a pool of worker processes.
+Each worker loads the NLTK and Stanza models once and then analyzes
+chunks of documents, so throughput scales with the number of CPU cores.
+Memory-mapped corpora are sent to workers as (start, end) document
+ranges, which each worker reads from its own mapping of the file. Long
+documents are split into sentence chunks analyzed by several workers at
+once and merged back in sentence order. The CPUs are divided between the
+workers: each gets its own PyTorch thread budget and, optionally, its own
+set of cores, so the pool does not oversubscribe the machine. With
+preloading, the models are loaded once in the parent and the workers are
+forked from it, sharing the model memory copy-on-write.
+"""
+
+import gc
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from config.settings import (
+    CPU_AFFINITY, ENGINE_MODE, LONG_DOCUMENT_CHARS, PARALLEL_WORKERS, PARALLEL_CHUNK_SIZE,
+    PARALLEL_MAX_PENDING, PARALLEL_PRELOAD, PARALLEL_START_METHOD, SCORING_MODE, SENTENCE_CHUNK_SIZE,
+    SINGLE_PASS, SENTENCE_CACHE_SIZE, STANZA_PROBE_TEXT, TORCH_INTER_OP_THREADS, TORCH_INTRA_OP_THREADS
+)
+from src.core.absa_engine import (
+    aspect_sentiment_analysis_batch, check_engine, check_scoring, document_sentences
+)
+from src.models.model_manager import available_cpus, get_model_manager, pin_cpus
+from src.utils.cache import LRUCache
+from src.utils.text_processing import get_stopwords
+
+
+# Models loaded by the worker initializer, one copy per worker process
+# (or inherited from a parent that preloaded them)
+_worker_models = {}
+
+# Memory-mapped corpora opened in this worker process, by MappedCorpus.spec()
+_worker_corpora = {}
+
+
+def _load_models(single_pass):
+    """
+    Load the models into _worker_models.
+    
+    Returns:
+        bool: True if the models are ready
+    """
+    _worker_models.clear()
+    manager = get_model_manager()
+    if not manager.setup_all():
+        return False
+    
+    nlp, sid = manager.get_models()
+    _worker_models.update({
+        'nlp': nlp,
+        'sid': sid,
+        'stop_words': get_stopwords(),
+        'single_pass': single_pass,
+        'sentence_cache': None
+    })
+    return True
+
+
+def _init_worker(single_pass, threads=None, inter_op_threads=None, cpu_slices=None, slot=None):
+    """
+    Load the models once per worker process.
+    
+    A worker forked from a parent that preloaded the models for the same
+    mode already has them and only turns its garbage collector back on.
+    With cpu_slices, the worker takes the next free slice (counted by the
+    shared slot value) and pins itself to those CPUs before torch starts
+    any threads.
+    """
+    if cpu_slices:
+        with slot.get_lock():
+            cpus = cpu_slices[slot.value % len(cpu_slices)]
+            slot.value += 1
+        if pin_cpus(cpus):
+            print(f"✓ Worker {os.getpid()} pinned to CPUs {cpus}")
+    
+    get_model_manager().configure_threads(threads, inter_op_threads)
+    gc.enable()
+    if _worker_models.get('single_pass') != single_pass and not _load_models(single_pass):
+        print(f"✗ Worker {os.getpid()} failed to initialize models")
+        return
+    _worker_models['sentence_cache'] = LRUCache(SENTENCE_CACHE_SIZE) if SENTENCE_CACHE_SIZE else None
+
+
+def _analyze_chunk(texts, scoring=SCORING_MODE, engine=ENGINE_MODE, presplit=False):
+    """Analyze a chunk of documents (or of sentence lists with presplit) inside a worker process."""
+    if not _worker_models:
+        raise RuntimeError("Worker models are not initialized")
+    
+    return aspect_sentiment_analysis_batch(
+        texts, _worker_models['stop_words'], _worker_models['nlp'], _worker_models['sid'],
+        single_pass=_worker_models['single_pass'],
+        sentence_cache=_worker_models['sentence_cache'], return_exceptions=True, scoring=scoring,
+        engine=engine, presplit=presplit
+    )
+
+
+def _analyze_range(spec, start, end, scoring=SCORING_MODE, engine=ENGINE_MODE):
+    """Analyze a range of documents of a memory-mapped corpus inside a worker process."""
+    from src.utils.mapped_corpus import MappedCorpus
+    
+    corpus = _worker_corpora.get(spec)
+    if corpus is None:
+        corpus = _worker_corpora[spec] = MappedCorpus(*spec)
+    # Malformed records are sent to the dead-letter file by the parent
+    texts = [text if isinstance(text, str) else '' for _, text in corpus.documents(start, end)]
+    return _analyze_chunk(texts, scoring, engine)
+
+
+class ParallelABSAAnalyzer:
+    """
+    ABSA analyzer that spreads documents over a pool of worker processes.
+    
+    Results always come back in input order. Input is consumed lazily and at
+    most max_pending chunks per worker are in flight, so a slow consumer or a
+    huge input stream does not pile up work in memory. Documents of at least
+    long_document_chars characters are split into chunks of
+    sentence_chunk_size sentences, so one long post keeps several workers
+    busy instead of blocking one.
+    
+    With preload, the models are loaded and warmed up in this process and
+    the workers are forked right after, so they share one copy of the
+    model memory instead of loading their own. RAM, not CPU, then stops
+    capping the number of workers.
+    """
+    
+    def __init__(self, workers=PARALLEL_WORKERS, chunk_size=PARALLEL_CHUNK_SIZE,
+                 max_pending=PARALLEL_MAX_PENDING, single_pass=SINGLE_PASS,
+                 start_method=PARALLEL_START_METHOD, scoring=SCORING_MODE, engine=ENGINE_MODE,
+                 long_document_chars=LONG_DOCUMENT_CHARS, sentence_chunk_size=SENTENCE_CHUNK_SIZE,
+                 threads_per_worker=TORCH_INTRA_OP_THREADS, inter_op_threads=TORCH_INTER_OP_THREADS,
+                 cpu_affinity=CPU_AFFINITY, preload=PARALLEL_PRELOAD):
+        """
+        Start the worker pool.
+        
+        Args:
+            workers (int): Number of worker processes (None uses every CPU core)
+            chunk_size (int): Documents sent to a worker at a time
+            max_pending (int): Chunks queued per worker before input reading pauses
+            single_pass (bool): Use the single-pass Stanza-driven engine mode
+            start_method (str): multiprocessing start method (None uses the platform default)
+            scoring (str): Default scoring mode, 'aspect' or 'context'
+            engine (str): Default engine mode, 'stanza' or 'rules'
+            long_document_chars (int): Documents this long are split over the workers
+                (None never splits)
+            sentence_chunk_size (int): Sentences per job of a split document
+            threads_per_worker (int): PyTorch intra-op threads per worker (None divides
+                the available CPUs evenly between the workers)
+            inter_op_threads (int): PyTorch inter-op threads per worker (None keeps torch's default)
+            cpu_affinity (bool): Pin each worker to its own slice of CPUs (Linux only)
+            preload (bool): Load the models here and fork the workers from this process
+                (needs the 'fork' start method; otherwise every worker loads its own)
+        """
+        check_scoring(scoring)
+        check_engine(engine)
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.max_pending = max_pending
+        self.single_pass = single_pass
+        self.scoring = scoring
+        self.engine = engine
+        self.long_document_chars = long_document_chars
+        self.sentence_chunk_size = sentence_chunk_size
+        cpus = available_cpus()
+        self.threads_per_worker = threads_per_worker or max(1, len(cpus) // self.workers)
+        cpu_slices = None
+        if cpu_affinity:
+            cpu_slices = [cpus[first:first + self.threads_per_worker]
+                          for first in range(0, len(cpus), self.threads_per_worker)]
+        # Long documents are split into sentences here, which needs the NLTK data path
+        get_model_manager()
+        
+        print(f"Starting {self.workers} ABSA worker processes "
+              f"({self.threads_per_worker} torch threads each)...")
+        context = multiprocessing.get_context(start_method)
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(single_pass, self.threads_per_worker, inter_op_threads, cpu_slices,
+                      context.Value('i', 0))
+        )
+        self.preloaded = preload and self._preload(context)
+    
+    def _preload(self, context):
+        """
+        Load and warm up the models in this process, then fork the workers.
+        
+        The garbage collector stays off until the workers are forked, so
+        no collection leaves holes in the pages the models live on. Torch
+        runs single-threaded meanwhile; this process gets its own thread
+        settings back once the workers exist.
+        
+        Returns:
+            bool: True if the workers share the models
+        """
+        if context.get_start_method() != 'fork':
+            print("⚠ Preloading needs the 'fork' start method; every worker loads its own models")
+            return False
+        
+        manager = get_model_manager()
+        intra_op_threads, autotune = manager.intra_op_threads, manager.autotune
+        default_threads = None
+        gc.disable()
+        try:
+            import torch
+            
+            default_threads = torch.get_num_threads()
+            # Torch must not have running thread pools when the process forks
+            # (the workers apply their own thread budgets), so no auto-tuning here
+            manager.autotune = False
+            manager.configure_threads(1)
+            if not _load_models(self.single_pass):
+                print("✗ Preloading failed; every worker loads its own models")
+                return False
+            # Lazily loaded state (NLTK tokenizer and tagger, Stanza buffers) is shared too
+            _analyze_chunk([STANZA_PROBE_TEXT], self.scoring, self.engine)
+            print(f"✓ Models preloaded, {manager.prepare_fork()} objects frozen for the workers")
+            # A fork-based pool starts every worker on its first job: fork them
+            # now, while the heap still matches the frozen models
+            self._executor.submit(os.getpid).result()
+            return True
+        except Exception as e:
+            _worker_models.clear()
+            print(f"✗ Preloading failed ({e}); every worker loads its own models")
+            return False
+        finally:
+            gc.enable()
+            manager.autotune = autotune
+            manager.intra_op_threads = intra_op_threads
+            if default_threads is not None:
+                torch.set_num_threads(intra_op_threads or default_threads)
+    
+    def worker_pids(self):
+        """Get the process ids of the running workers (e.g. to measure their memory)."""
+        # ProcessPoolExecutor keeps no public record of its processes
+        return list(self._executor._processes or {})
+    
+    def imap(self, texts, return_exceptions=False, scoring=None, engine=None):
+        """
+        Analyze texts lazily, yielding one result per text in input order.
+        
+        Args:
+            texts (iterable): Input texts to analyze
+            return_exceptions (bool): Yield a failed document's exception instead of []
+            scoring (str): Scoring mode for this call (defaults to self.scoring)
+            engine (str): Engine mode for this call (defaults to self.engine)
+            
+        Yields:
+            list: List of [aspect, sentiment_score] pairs for each text
+        """
+        scoring = scoring or self.scoring
+        engine = engine or self.engine
+        # Fail here: inside a worker the error would only turn into empty results
+        check_scoring(scoring)
+        check_engine(engine)
+        jobs = self._jobs(texts, scoring, engine)
+        return self._results(jobs, return_exceptions)
+    
+    def _jobs(self, texts, scoring, engine):
+        """
+        Submit chunks of texts to the workers, lazily.
+        
+        Yields:
+            tuple: (future, documents, merged, final); a long document is one
+                entry per sentence chunk (merged=True), the last one final
+        """
+        chunk = []
+        for text in texts:
+            if (self.long_document_chars is not None and isinstance(text, str)
+                    and len(text) >= self.long_document_chars):
+                if chunk:
+                    yield self._submit_chunk(chunk, scoring, engine)
+                    chunk = []
+                yield from self._submit_long(text, scoring, engine)
+                continue
+            
+            chunk.append(text)
+            if len(chunk) == self.chunk_size:
+                yield self._submit_chunk(chunk, scoring, engine)
+                chunk = []
+        if chunk:
+            yield self._submit_chunk(chunk, scoring, engine)
+    
+    def _submit_chunk(self, chunk, scoring, engine):
+        """Submit a chunk of texts as one job."""
+        return self._executor.submit(_analyze_chunk, chunk, scoring, engine), len(chunk), False, True
+    
+    def _submit_long(self, text, scoring, engine):
+        """
+        Split a long document into sentence chunks, submitting them lazily.
+        
+        Each chunk is its own job, so the chunks of one huge document count
+        against the backpressure budget like any other work.
+        """
+        try:
+            sentences = document_sentences(text)
+        except Exception as e:
+            # E.g. DocumentTooLargeError: report it like a failed analysis
+            failed = Future()
+            failed.set_exception(e)
+            yield failed, 1, True, True
+            return
+        
+        size = self.sentence_chunk_size
+        parts = [sentences[start:start + size] for start in range(0, len(sentences), size)] or [[]]
+        for number, part in enumerate(parts, 1):
+            yield (self._executor.submit(_analyze_chunk, [part], scoring, engine, True), 1, True,
+                   number == len(parts))
+    
+    def _results(self, jobs, return_exceptions):
+        """Yield the per-document results of submitted jobs in order, with backpressure."""
+        pending = deque()
+        # Results of the sentence chunks collected so far of the current long document
+        parts = []
+        max_in_flight = self.workers * self.max_pending
+        
+        try:
+            for job in jobs:
+                pending.append(job)
+                # Backpressure: wait for the oldest jobs before reading more input
+                while len(pending) >= max_in_flight:
+                    yield from self._collect(pending.popleft(), parts, return_exceptions)
+            
+            while pending:
+                yield from self._collect(pending.popleft(), parts, return_exceptions)
+        finally:
+            # Consumer stopped early or an error occurred: drop queued work
+            for future, _, _, _ in pending:
+                future.cancel()
+    
+    def imap_corpus(self, corpus, start=0, end=None, return_exceptions=False, scoring=None,
+                    engine=None):
+        """
+        Analyze documents of a memory-mapped corpus, yielding results in order.
+        
+        Workers get (start, end) document ranges and read the texts from
+        their own mapping of the file, so no text is pickled.
+        
+        Args:
+            corpus (MappedCorpus): Corpus to analyze
+            start (int): First document number
+            end (int): Document number to stop before (None is the end)
+            return_exceptions (bool): Yield a failed document's exception instead of []
+            scoring (str): Scoring mode for this call (defaults to self.scoring)
+            engine (str): Engine mode for this call (defaults to self.engine)
+            
+        Yields:
+            list: List of [aspect, sentiment_score] pairs for each document
+        """
+        scoring = scoring or self.scoring
+        engine = engine or self.engine
+        # Fail here: inside a worker the error would only turn into empty results
+        check_scoring(scoring)
+        check_engine(engine)
+        spec = corpus.spec()
+        jobs = (
+            (self._executor.submit(_analyze_range, spec, first, last, scoring, engine),
+             last - first, False, True)
+            for first, last in corpus.ranges(self.chunk_size, start, end)
+        )
+        return self._results(jobs, return_exceptions)
+    
+    def _collect(self, job, parts, return_exceptions):
+        """
+        Wait for one job and yield its per-document results.
+        
+        Sentence chunk results are kept in parts until the final chunk of
+        their document arrives.
+        """
+        future, size, merged, final = job
+        try:
+            results = future.result()
+        except Exception as e:
+            print(f"Error during analysis: {e}")
+            results = [e] * size
+        
+        if merged:
+            parts.extend(results)
+            if not final:
+                return
+            # Sentence chunks of one document: their aspects concatenate in sentence order
+            failed = [result for result in parts if isinstance(result, Exception)]
+            results = failed[:1] or [[pair for part in parts for pair in part]]
+            parts.clear()
+        
+        for result in results:
+            if isinstance(result, Exception) and not return_exceptions:
+                print(f"Error during analysis: {result}")
+                result = []
+            yield result
+    
+    def analyze_batch(self, texts, scoring=None, engine=None):
+        """
+        Analyze many texts in parallel.
+        
+        Args:
+            texts (iterable): Input texts to analyze
+            scoring (str): Scoring mode for this call (defaults to self.scoring)
+            engine (str): Engine mode for this call (defaults to self.engine)
+            
+        Returns:
+            list: One list of [aspect, sentiment_score] pairs per input text
+        """
+        return list(self.imap(texts, scoring=scoring, engine=engine))
+    
+    def analyze(self, text, scoring=None, engine=None):
+        """
+        Analyze a single text in a worker process.
+        
+        Args:
+            text (str): Input text to analyze
+            scoring (str): Scoring mode for this call (defaults to self.scoring)
+            engine (str): Engine mode for this call (defaults to self.engine)
+            
+        Returns:
+            list: List of [aspect, sentiment_score] pairs
+        """
+        return self.analyze_batch([text], scoring, engine)[0]
+    
+    def close(self, cancel_pending=False):
+        """
+        Shut the worker pool down, waiting for running chunks to finish.
+        
+        Args:
+            cancel_pending (bool): Drop chunks that have not started yet
+        """
+        self._executor.shutdown(wait=True, cancel_futures=cancel_pending)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close(cancel_pending=exc_type is not None)
+        return False
\ No newline at end of file
@@ -0,0 +1,123 @@
+"""
+Adaptive Engine Routing for ABSA
+
+This module decides per document whether the full Stanza engine or the
+cheap rule-based engine serves it. Each engine's cost is estimated as
+milliseconds per word, learned from the batches it actually served. A
+document goes to Stanza while the estimated time to finish it, including
+the work already queued ahead of it, stays within the latency budget;
+beyond that, and whenever the queue is deeper than a hard limit, it is
+shed to the rules so tail latency stays bounded during traffic spikes.
+"""
+
+from collections import Counter
+
+from config.settings import (
+    ROUTER_LATENCY_BUDGET_MS, ROUTER_MAX_QUEUE_DEPTH, ROUTER_RULES_MS_PER_WORD,
+    ROUTER_SMOOTHING, ROUTER_STANZA_MS_PER_WORD
+)
+
+
+def word_count(text):
+    """Approximate the length of a document in words."""
+    return max(len(text.split()), 1)
+
+
+class EngineRouter:
+    """
+    Per-document choice between the 'stanza' and 'rules' engines.
+    
+    Not thread-safe; use one router per batch thread.
+    """
+    
+    def __init__(self, budget_ms=ROUTER_LATENCY_BUDGET_MS, max_queue_depth=ROUTER_MAX_QUEUE_DEPTH,
+                 stanza_ms_per_word=ROUTER_STANZA_MS_PER_WORD,
+                 rules_ms_per_word=ROUTER_RULES_MS_PER_WORD, smoothing=ROUTER_SMOOTHING):
+        """
+        Args:
+            budget_ms (float): Latency a document should be served within
+            max_queue_depth (int): Queued documents beyond which everything goes to the rules
+            stanza_ms_per_word (float): Initial Stanza cost estimate
+            rules_ms_per_word (float): Initial rules cost estimate
+            smoothing (float): Weight of a new observation in the moving cost averages
+        """
+        self.budget_ms = budget_ms
+        self.max_queue_depth = max_queue_depth
+        self.smoothing = smoothing
+        self.ms_per_word = {'stanza': stanza_ms_per_word, 'rules': rules_ms_per_word}
+        self.mean_words = None
+        self.routes = Counter()
+    
+    def estimate_ms(self, engine, words):
+        """Estimate the time an engine needs for a document of the given length."""
+        return self.ms_per_word[engine] * words
+    
+    def route(self, texts, queue_depth=0):
+        """
+        Choose an engine for each document of a batch.
+        
+        Documents are considered in order, each one behind the estimated
+        work of the waiting documents and of the documents before it in the
+        batch. Reasons are 'within_budget', 'over_budget' and 'overload'.
+        
+        Args:
+            texts (list): Input texts of the batch
+            queue_depth (int): Documents still waiting for analysis
+        
+        Returns:
+            list: (engine, reason) per text
+        """
+        lengths = [word_count(text) for text in texts]
+        for words in lengths:
+            if self.mean_words is None:
+                self.mean_words = words
+            else:
+                self.mean_words += self.smoothing * (words - self.mean_words)
+        
+        choices = []
+        if queue_depth >= self.max_queue_depth:
+            choices = [('rules', 'overload')] * len(texts)
+        else:
+            # Waiting documents need serving too: count them as Stanza work of average length
+            pending_ms = queue_depth * self.estimate_ms('stanza', self.mean_words or 1)
+            for words in lengths:
+                cost = self.estimate_ms('stanza', words)
+                if pending_ms + cost <= self.budget_ms:
+                    choices.append(('stanza', 'within_budget'))
+                else:
+                    choices.append(('rules', 'over_budget'))
+                    cost = self.estimate_ms('rules', words)
+                pending_ms += cost
+        
+        self.routes.update(choices)
+        return choices
+    
+    def observe(self, engine, words, seconds):
+        """
+        Update an engine's cost estimate with a measured batch.
+        
+        Args:
+            engine (str): 'stanza' or 'rules'
+            words (int): Total words of the documents analyzed
+            seconds (float): Time the batch took
+        """
+        if words <= 0:
+            return
+        measured = seconds * 1000 / words
+        self.ms_per_word[engine] += self.smoothing * (measured - self.ms_per_word[engine])
+    
+    def stats(self):
+        """
+        Get the routing counters and current cost estimates.
+        
+        Returns:
+            dict: Documents per engine and per (engine, reason), and ms per word per engine
+        """
+        engines = Counter()
+        for (engine, _), count in self.routes.items():
+            engines[engine] += count
+        return {
+            'documents': dict(engines),
+            'reasons': {f"{engine}:{reason}": count for (engine, reason), count in self.routes.items()},
+            'ms_per_word': dict(self.ms_per_word)
+        }
@@ -0,0 +1,91 @@
+"""
+Aspect Scoring Module
+
+VADER's polarity_scores() runs its whole rule engine (tokenization,
+booster, negation, 'but' and punctuation rules) on every call, although
+the engine only ever scores short aspect terms that repeat across
+documents. TermScorer memoizes the compound score of each term, so every
+distinct term goes through VADER once and later lookups are dictionary
+hits. Scores are VADER's own, so results are unchanged.
+"""
+
+import functools
+
+from config.settings import SCORE_CACHE_SIZE
+
+
+class TermScorer:
+    """Memoizing wrapper around a VADER SentimentIntensityAnalyzer."""
+    
+    def __init__(self, sid, max_size=SCORE_CACHE_SIZE):
+        """
+        Args:
+            sid: NLTK SentimentIntensityAnalyzer object
+            max_size (int): Distinct terms whose scores are kept (None is unbounded)
+        """
+        self.sid = sid
+        self.score = functools.lru_cache(maxsize=max_size)(self._compound)
+    
+    def _compound(self, term):
+        """Score one term with the full VADER rule engine."""
+        return self.sid.polarity_scores(term)['compound']
+    
+    def score_many(self, terms):
+        """
+        Score many terms, each distinct term once.
+        
+        Args:
+            terms (iterable): Terms to score, repeats allowed
+        
+        Returns:
+            dict: Compound score of every distinct term
+        """
+        score = self.score
+        return {term: score(term) for term in dict.fromkeys(terms)}
+    
+    def polarity_scores(self, text):
+        """Full VADER scores of a text (not memoized), so a TermScorer can stand in for sid."""
+        return self.sid.polarity_scores(text)
+    
+    def clear(self):
+        """Forget every memoized score (counters are reset too)."""
+        self.score.cache_clear()
+    
+    def stats(self):
+        """
+        Get memo counters.
+        
+        Returns:
+            dict: size, max_size, hits, misses and hit_rate
+        """
+        info = self.score.cache_info()
+        lookups = info.hits + info.misses
+        return {
+            'size': info.currsize,
+            'max_size': info.maxsize,
+            'hits': info.hits,
+            'misses': info.misses,
+            'hit_rate': info.hits / lookups if lookups else 0.0
+        }
+
+
+def term_scorer(sid):
+    """
+    Get a TermScorer for sid.
+    
+    A TermScorer is returned as is, so its memo is shared across calls; a
+    plain SentimentIntensityAnalyzer gets a fresh scorer that only dedupes
+    terms within the current call.
+    """
+    if isinstance(sid, TermScorer):
+        return sid
+    return TermScorer(sid)
+
+
+def fresh_scorer(sid):
+    """
+    Get a TermScorer with an empty memo around the same VADER analyzer as sid.
+    
+    Used to time or compare runs without scores memoized by an earlier one.
+    """
+    return TermScorer(sid.sid if isinstance(sid, TermScorer) else sid)
@@ -0,0 +1,422 @@
+"""
+Asynchronous HTTP Service for ABSA
+
+This module serves the analyzer over HTTP using asyncio only. Requests
+arriving within a few milliseconds of each other are collected into one
+micro-batch and analyzed together in a worker thread, so a loaded server
+parses many documents per Stanza bulk call instead of one per request.
+With an EngineRouter on the analyzer, each document is routed to the
+Stanza or rules engine by the latency budget and the current queue depth,
+and every result names the engine that served it.
+
+Endpoints:
+    POST /analyze   {"text": "..."} or {"texts": ["...", ...]}
+    GET  /health    Liveness: 200 while the process is serving
+    GET  /ready     Readiness: 200 once the models are loaded, 503 before
+    GET  /metrics   Prometheus text (404 when metrics are disabled)
+"""
+
+import asyncio
+import functools
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from config.settings import (
+    SERVER_HOST, SERVER_PORT, SERVER_MAX_BATCH_SIZE, SERVER_MAX_WAIT_MS, SERVER_MAX_BODY_BYTES
+)
+from src.core.absa_engine import DocumentTooLargeError, detailed_results
+from src.models.model_manager import get_model_manager
+
+
+REASONS = {
+    200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+    413: 'Payload Too Large', 500: 'Internal Server Error', 503: 'Service Unavailable'
+}
+
+
+class HTTPError(Exception):
+    """Request error answered with the given status code."""
+    
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class MicroBatcher:
+    """
+    Collect concurrently submitted texts into batches for one analysis function.
+    
+    A batch is dispatched when it holds max_batch_size texts or max_wait_ms
+    after its first text arrived, whichever comes first. Batches run one at a
+    time in the executor; texts submitted meanwhile form the next batch.
+    """
+    
+    def __init__(self, analyze_batch, max_batch_size=SERVER_MAX_BATCH_SIZE,
+                 max_wait_ms=SERVER_MAX_WAIT_MS, executor=None):
+        """
+        Args:
+            analyze_batch (callable): Takes a list of texts and returns one result
+                or exception per text
+            max_batch_size (int): Maximum texts per batch
+            max_wait_ms (float): Longest time a text waits for others to join its batch
+            executor: concurrent.futures executor running the batches
+                (None uses the event loop's default executor)
+        """
+        self.analyze_batch = analyze_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.executor = executor
+        self.batches = 0
+        self.documents = 0
+        self._queue = None
+        self._arrived = None
+        self._task = None
+    
+    def start(self):
+        """Start dispatching batches on the running event loop."""
+        self._queue = asyncio.Queue()
+        self._arrived = asyncio.Event()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+    
+    async def stop(self):
+        """Stop dispatching; texts still queued are cancelled."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        while not self._queue.empty():
+            text, future = self._queue.get_nowait()
+            future.cancel()
+    
+    async def submit(self, texts):
+        """
+        Analyze texts as part of the next batches.
+        
+        Args:
+            texts (list): Input texts
+        
+        Returns:
+            list: One result or exception per text, in input order
+        """
+        loop = asyncio.get_running_loop()
+        futures = []
+        for text in texts:
+            future = loop.create_future()
+            self._queue.put_nowait((text, future))
+            futures.append(future)
+        self._arrived.set()
+        return await asyncio.gather(*futures, return_exceptions=True)
+    
+    def queue_depth(self):
+        """Get the number of texts waiting for a batch."""
+        return self._queue.qsize() if self._queue is not None else 0
+    
+    async def _next_batch(self):
+        """Wait for a first text, then gather more until the batch is full or the wait is over."""
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait
+        
+        while len(batch) < self.max_batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            self._arrived.clear()
+            try:
+                await asyncio.wait_for(self._arrived.wait(), remaining)
+            except asyncio.TimeoutError:
+                break
+        
+        # Requests whose client went away no longer need analysis
+        return [(text, future) for text, future in batch if not future.done()]
+    
+    async def _run(self):
+        """Dispatch batches until stopped."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._next_batch()
+            if not batch:
+                continue
+            
+            texts = [text for text, future in batch]
+            try:
+                results = await loop.run_in_executor(self.executor, self.analyze_batch, texts)
+            except Exception as e:
+                results = [e for _ in texts]
+            self.batches += 1
+            self.documents += len(texts)
+            
+            for (text, future), result in zip(batch, results):
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+
+class ABSAHTTPServer:
+    """
+    HTTP/1.1 front end of an ABSAAnalyzer with micro-batching.
+    
+    The server accepts connections immediately and loads the analyzer in the
+    background, so /health answers during model loading while /ready and
+    /analyze return 503 until ModelManager.is_initialized is set.
+    """
+    
+    def __init__(self, analyzer_factory, host=SERVER_HOST, port=SERVER_PORT,
+                 max_batch_size=SERVER_MAX_BATCH_SIZE, max_wait_ms=SERVER_MAX_WAIT_MS,
+                 max_body_bytes=SERVER_MAX_BODY_BYTES):
+        """
+        Args:
+            analyzer_factory (callable): Returns an ABSAAnalyzer (models may load lazily;
+                the server calls warmup() before reporting readiness)
+            host (str): Interface to listen on
+            port (int): Port to listen on (0 picks a free port)
+            max_batch_size (int): Maximum documents per micro-batch
+            max_wait_ms (float): Longest time a request waits for others to join its batch
+            max_body_bytes (int): Largest accepted request body
+        """
+        self.analyzer_factory = analyzer_factory
+        self.host = host
+        self.port = port
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.max_body_bytes = max_body_bytes
+        self.analyzer = None
+        self.batcher = None
+        self.server = None
+        # Stanza pipelines are not thread-safe: one thread runs all batches
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='absa-batch')
+        self._loading = None
+    
+    async def start(self):
+        """Start listening and begin loading the analyzer."""
+        self.server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        self._loading = asyncio.get_running_loop().create_task(self._load())
+        print(f"✓ Serving on http://{self.host}:{self.port}")
+    
+    async def _load(self):
+        """Build and warm up the analyzer in the batch thread, then start batching."""
+        loop = asyncio.get_running_loop()
+        try:
+            analyzer = await loop.run_in_executor(self.executor, self.analyzer_factory)
+            ready = await loop.run_in_executor(self.executor, analyzer.warmup)
+        except Exception as e:
+            print(f"✗ Failed to load analyzer: {e}")
+            return
+        
+        if not ready:
+            return
+        
+        self.analyzer = analyzer
+        if analyzer.router is not None:
+            # Read from the batch thread; qsize() is a plain length lookup
+            def analyze_batch(texts):
+                return analyzer.analyze_routed(texts, self.batcher.queue_depth(),
+                                               return_exceptions=True)
+        else:
+            analyze_batch = functools.partial(analyzer.analyze_batch, return_exceptions=True)
+        self.batcher = MicroBatcher(analyze_batch, self.max_batch_size, self.max_wait_ms,
+                                    self.executor)
+        self.batcher.start()
+    
+    def is_ready(self):
+        """Check if requests can be analyzed."""
+        return self.batcher is not None and get_model_manager().is_initialized
+    
+    async def serve_forever(self):
+        """Serve until cancelled."""
+        async with self.server:
+            await self.server.serve_forever()
+    
+    async def close(self):
+        """Stop accepting connections and release the batch thread."""
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        if self._loading is not None and not self._loading.done():
+            self._loading.cancel()
+        if self.batcher is not None:
+            await self.batcher.stop()
+        self.executor.shutdown(wait=False)
+    
+    async def _handle_connection(self, reader, writer):
+        """Answer the requests of one keep-alive connection."""
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                except HTTPError as e:
+                    await self._send(writer, e.status, {'error': str(e)}, keep_alive=False)
+                    break
+                if request is None:
+                    break
+                
+                method, path, headers, body, keep_alive = request
+                try:
+                    status, payload, content_type = await self._route(method, path, body)
+                except HTTPError as e:
+                    status, payload, content_type = e.status, {'error': str(e)}, None
+                await self._send(writer, status, payload, content_type, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+    
+    async def _read_request(self, reader):
+        """
+        Read one request from the connection.
+        
+        Returns:
+            tuple: (method, path, headers, body, keep_alive), or None once the
+                client closed the connection
+        """
+        try:
+            request_line = await reader.readline()
+            if not request_line:
+                return None
+            try:
+                method, target, version = request_line.decode('latin-1').split()
+            except ValueError:
+                raise HTTPError(400, "Malformed request line")
+            
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                headers[name.strip().lower()] = value.strip()
+        except (ValueError, asyncio.LimitOverrunError):
+            raise HTTPError(400, "Request line or header too long")
+        
+        try:
+            length = int(headers.get('content-length', 0))
+        except ValueError:
+            raise HTTPError(400, "Invalid Content-Length")
+        if length > self.max_body_bytes:
+            raise HTTPError(413, f"Request body exceeds {self.max_body_bytes} bytes")
+        body = await reader.readexactly(length) if length > 0 else b''
+        
+        connection = headers.get('connection', '').lower()
+        keep_alive = connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+        return method.upper(), target.split('?', 1)[0], headers, body, keep_alive
+    
+    async def _route(self, method, path, body):
+        """
+        Dispatch a request to its endpoint.
+        
+        Returns:
+            tuple: (status, payload, content_type); content_type None means JSON
+        """
+        if path == '/health':
+            return 200, {'status': 'ok'}, None
+        
+        if path == '/ready':
+            if self.is_ready():
+                return 200, {'status': 'ready'}, None
+            return 503, {'status': 'loading'}, None
+        
+        if path == '/metrics':
+            metrics = self.analyzer.metrics_snapshot(prometheus=True) if self.analyzer else None
+            if metrics is None:
+                raise HTTPError(404, "Metrics are disabled")
+            return 200, metrics, 'text/plain; version=0.0.4'
+        
+        if path == '/analyze':
+            if method != 'POST':
+                raise HTTPError(405, "Use POST")
+            return await self._analyze(body)
+        
+        raise HTTPError(404, f"Unknown path {path}")
+    
+    async def _analyze(self, body):
+        """Analyze the text(s) of a request through the micro-batcher."""
+        if not self.is_ready():
+            raise HTTPError(503, "Models are still loading")
+        
+        try:
+            request = json.loads(body or b'null')
+        except ValueError:
+            raise HTTPError(400, "Body must be JSON")
+        
+        if isinstance(request, dict) and isinstance(request.get('text'), str):
+            texts, single = [request['text']], True
+        elif (isinstance(request, dict) and isinstance(request.get('texts'), list)
+              and all(isinstance(text, str) for text in request['texts'])):
+            texts, single = request['texts'], False
+        else:
+            raise HTTPError(400, 'Expected {"text": "..."} or {"texts": ["...", ...]}')
+        
+        results = await self.batcher.submit(texts)
+        details = []
+        for text, result in zip(texts, results):
+            if isinstance(result, BaseException):
+                details.append({'input_text': text, 'error': str(result)})
+            elif isinstance(result, tuple):
+                # Routed result: (results, engine that served it)
+                result, engine = result
+                details.append(dict(detailed_results(text, result), engine=engine))
+            else:
+                details.append(detailed_results(text, result))
+        
+        if single:
+            if isinstance(results[0], DocumentTooLargeError):
+                raise HTTPError(413, str(results[0]))
+            return (500 if 'error' in details[0] else 200), details[0], None
+        return 200, {'results': details}, None
+    
+    async def _send(self, writer, status, payload, content_type=None, keep_alive=True):
+        """Write one response."""
+        if content_type is None:
+            body = json.dumps(payload).encode('utf-8')
+            content_type = 'application/json'
+        else:
+            body = payload.encode('utf-8')
+        
+        head = (
+            f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+            "\r\n"
+        )
+        writer.write(head.encode('latin-1') + body)
+        await writer.drain()
+
+
+def run_server(analyzer_factory, host=SERVER_HOST, port=SERVER_PORT,
+               max_batch_size=SERVER_MAX_BATCH_SIZE, max_wait_ms=SERVER_MAX_WAIT_MS):
+    """
+    Run the HTTP service until interrupted.
+    
+    Args:
+        analyzer_factory (callable): Returns an ABSAAnalyzer
+        host (str): Interface to listen on
+        port (int): Port to listen on
+        max_batch_size (int): Maximum documents per micro-batch
+        max_wait_ms (float): Longest time a request waits for others to join its batch
+    """
+    async def serve():
+        server = ABSAHTTPServer(analyzer_factory, host, port, max_batch_size, max_wait_ms)
+        await server.start()
+        try:
+            await server.serve_forever()
+        finally:
+            await server.close()
+    
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        print("\nServer stopped")
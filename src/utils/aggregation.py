@@ -0,0 +1,285 @@
+"""
+Aspect Aggregation for ABSA
+
+This module keeps corpus-level aspect summaries per group (e.g. product
+or category): how often each aspect was mentioned, its mean score and a
+histogram of its sentiment labels. Statistics live in flat NumPy arrays
+with one slot per (group, aspect) pair, so adding a document costs
+O(aspects), partial aggregates from different workers merge by adding
+arrays, and top-k queries never re-scan the analyzed documents.
+"""
+
+import numpy as np
+
+from config.settings import POSITIVE_THRESHOLD, NEGATIVE_THRESHOLD
+from src.utils.result_table import LABELS
+
+# Group argument of summary() and top_k() meaning every group combined;
+# group=None always means the group of documents added without a group
+ALL_GROUPS = object()
+
+# Aggregates that top_k() can rank aspects by
+RANKINGS = ('count', 'mean_score', 'negative', 'positive', 'negative_share', 'positive_share')
+
+
+def _label_index(score):
+    """Get the histogram column of a score (0 negative, 1 neutral, 2 positive)."""
+    if score > POSITIVE_THRESHOLD:
+        return 2
+    if score < NEGATIVE_THRESHOLD:
+        return 0
+    return 1
+
+
+class AspectAggregator:
+    """
+    Incremental per-group aspect statistics.
+    
+    Every (group, aspect) pair owns one slot of the count, score sum and
+    label histogram arrays, which grow by doubling.
+    """
+    
+    def __init__(self, capacity=1024):
+        """
+        Args:
+            capacity (int): Initially allocated slots
+        """
+        self.groups = []
+        self.aspects = []
+        self._group_ids = {}
+        self._aspect_ids = {}
+        self._slots = {}
+        self.size = 0
+        self.documents = 0
+        self.slot_group = np.zeros(capacity, dtype=np.int32)
+        self.slot_aspect = np.zeros(capacity, dtype=np.int32)
+        self.counts = np.zeros(capacity, dtype=np.int64)
+        self.score_sums = np.zeros(capacity, dtype=np.float64)
+        self.label_counts = np.zeros((capacity, len(LABELS)), dtype=np.int64)
+    
+    def _grow(self, needed):
+        """Make room for at least needed slots."""
+        capacity = len(self.counts)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name in ('slot_group', 'slot_aspect', 'counts', 'score_sums', 'label_counts'):
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+    
+    def _slot(self, group, aspect):
+        """Get the slot of a (group, aspect) pair, creating it if new."""
+        slot = self._slots.get((group, aspect))
+        if slot is not None:
+            return slot
+        
+        group_id = self._group_ids.get(group)
+        if group_id is None:
+            group_id = self._group_ids[group] = len(self.groups)
+            self.groups.append(group)
+        aspect_id = self._aspect_ids.get(aspect)
+        if aspect_id is None:
+            aspect_id = self._aspect_ids[aspect] = len(self.aspects)
+            self.aspects.append(aspect)
+        
+        slot = self._slots[(group, aspect)] = self.size
+        self._grow(slot + 1)
+        self.slot_group[slot] = group_id
+        self.slot_aspect[slot] = aspect_id
+        self.size += 1
+        return slot
+    
+    def update(self, results, group=None):
+        """
+        Add the results of one document.
+        
+        Args:
+            results (list): [aspect, sentiment_score] pairs (or detail records)
+            group: Group key of the document, e.g. a product id (None for one global group)
+        """
+        self.documents += 1
+        for record in results:
+            aspect, score = record[0], record[1]
+            slot = self._slot(group, aspect)
+            self.counts[slot] += 1
+            self.score_sums[slot] += score
+            self.label_counts[slot, _label_index(score)] += 1
+    
+    def update_many(self, results, groups=None):
+        """
+        Add the results of many documents.
+        
+        Args:
+            results (iterable): One result list per document
+            groups (iterable): Group key per document (None puts all in one group)
+        """
+        if groups is None:
+            for doc_results in results:
+                self.update(doc_results)
+        else:
+            for doc_results, group in zip(results, groups):
+                self.update(doc_results, group)
+    
+    def update_table(self, table, groups=None):
+        """
+        Add every row of a ResultTable at once.
+        
+        Args:
+            table (ResultTable): Columnar results
+            groups (list): Group key per table document, parallel to table.doc_ids
+                (None puts all documents in one group)
+        """
+        self.documents += len(table.doc_ids)
+        if not len(table):
+            return
+        
+        # Slot of every distinct (document group, table aspect code) pair
+        doc_groups = groups if groups is not None else [None] * len(table.doc_ids)
+        group_codes = {}
+        doc_group_codes = np.array([group_codes.setdefault(group, len(group_codes)) for group in doc_groups],
+                                   dtype=np.int64)
+        group_keys = list(group_codes)
+        pair_codes = doc_group_codes[table.doc_index] * len(table.vocabulary) + table.aspect_codes
+        unique_pairs, inverse = np.unique(pair_codes, return_inverse=True)
+        pair_slots = np.array([
+            self._slot(group_keys[pair // len(table.vocabulary)], table.vocabulary[pair % len(table.vocabulary)])
+            for pair in unique_pairs.tolist()
+        ], dtype=np.int64)
+        slots = pair_slots[inverse.reshape(-1)]
+        
+        np.add.at(self.counts, slots, 1)
+        np.add.at(self.score_sums, slots, table.scores)
+        np.add.at(self.label_counts, (slots, table.label_codes + 1), 1)
+    
+    def merge(self, other):
+        """
+        Add the statistics of another aggregator, e.g. one per worker.
+        
+        Args:
+            other (AspectAggregator): Partial aggregate to fold in
+        
+        Returns:
+            AspectAggregator: self
+        """
+        self.documents += other.documents
+        if not other.size:
+            return self
+        
+        slots = np.array([
+            self._slot(other.groups[group_id], other.aspects[aspect_id])
+            for group_id, aspect_id in zip(other.slot_group[:other.size].tolist(),
+                                           other.slot_aspect[:other.size].tolist())
+        ], dtype=np.int64)
+        # Slots are distinct, so plain fancy-index addition is safe
+        self.counts[slots] += other.counts[:other.size]
+        self.score_sums[slots] += other.score_sums[:other.size]
+        self.label_counts[slots] += other.label_counts[:other.size]
+        return self
+    
+    @classmethod
+    def merged(cls, aggregators):
+        """Combine partial aggregates into a new aggregator."""
+        result = cls()
+        for aggregator in aggregators:
+            result.merge(aggregator)
+        return result
+    
+    def summary(self, aspect, group=ALL_GROUPS):
+        """
+        Get the statistics of one aspect in one group.
+        
+        Args:
+            aspect (str): Aspect word
+            group: Group key (ALL_GROUPS combines every group, None is the
+                group of documents added without one)
+        
+        Returns:
+            dict: count, mean_score and per-label counts and shares (None if unseen)
+        """
+        if group is not ALL_GROUPS:
+            slot = self._slots.get((group, aspect))
+            if slot is None:
+                return None
+            return self._describe(aspect, int(self.counts[slot]), float(self.score_sums[slot]),
+                                  self.label_counts[slot])
+        
+        aspect_id = self._aspect_ids.get(aspect)
+        if aspect_id is None:
+            return None
+        slots = np.flatnonzero(self.slot_aspect[:self.size] == aspect_id)
+        return self._describe(aspect, int(self.counts[slots].sum()), float(self.score_sums[slots].sum()),
+                              self.label_counts[slots].sum(axis=0))
+    
+    def _describe(self, aspect, count, score_sum, label_counts):
+        """Build the summary dict of one aspect."""
+        return {
+            'aspect': aspect,
+            'count': count,
+            'mean_score': score_sum / count if count else 0.0,
+            'labels': {label: int(n) for label, n in zip(LABELS, label_counts)},
+            'shares': {label: int(n) / count if count else 0.0 for label, n in zip(LABELS, label_counts)}
+        }
+    
+    def _group_totals(self, group):
+        """Get (aspect ids, counts, score sums, label counts) of one group, or of ALL_GROUPS."""
+        size = self.size
+        if group is not ALL_GROUPS:
+            group_id = self._group_ids.get(group)
+            mask = self.slot_group[:size] == group_id if group_id is not None else np.zeros(size, dtype=bool)
+            return (self.slot_aspect[:size][mask], self.counts[:size][mask],
+                    self.score_sums[:size][mask], self.label_counts[:size][mask])
+        
+        # Across groups: sum the slots of each aspect
+        aspect_ids = self.slot_aspect[:size]
+        n = len(self.aspects)
+        counts = np.bincount(aspect_ids, weights=self.counts[:size], minlength=n).astype(np.int64)
+        score_sums = np.bincount(aspect_ids, weights=self.score_sums[:size], minlength=n)
+        label_counts = np.zeros((n, len(LABELS)), dtype=np.int64)
+        np.add.at(label_counts, aspect_ids, self.label_counts[:size])
+        return np.arange(n), counts, score_sums, label_counts
+    
+    def top_k(self, k=10, group=ALL_GROUPS, by='count', min_count=1):
+        """
+        Get the top aspects of a group.
+        
+        Args:
+            k (int): Number of aspects to return
+            group: Group key (ALL_GROUPS ranks aspects across every group, None
+                is the group of documents added without one)
+            by (str): One of RANKINGS; shares rank by the fraction of mentions with that label
+            min_count (int): Ignore aspects mentioned fewer times
+        
+        Returns:
+            list: Summary dicts (see summary()) in descending order
+        """
+        if by not in RANKINGS:
+            raise ValueError(f"Unknown ranking {by!r}, expected one of {', '.join(RANKINGS)}")
+        
+        aspect_ids, counts, score_sums, label_counts = self._group_totals(group)
+        keep = counts >= max(min_count, 1)
+        aspect_ids, counts, score_sums, label_counts = (
+            aspect_ids[keep], counts[keep], score_sums[keep], label_counts[keep]
+        )
+        if not len(counts):
+            return []
+        
+        if by == 'count':
+            values = counts.astype(np.float64)
+        elif by == 'mean_score':
+            values = score_sums / counts
+        else:
+            label = 0 if by.startswith('negative') else 2
+            values = label_counts[:, label].astype(np.float64)
+            if by.endswith('share'):
+                values = values / counts
+        
+        k = min(k, len(values))
+        top = np.argpartition(-values, k - 1)[:k]
+        top = top[np.argsort(-values[top], kind='stable')]
+        return [
+            self._describe(self.aspects[aspect_ids[i]], int(counts[i]), float(score_sums[i]), label_counts[i])
+            for i in top
+        ]
@@ -0,0 +1,203 @@
+"""
+Caching Utilities for ABSA
+
+This module contains the caches used to skip repeated work: a bounded
+in-memory LRU cache and a content-addressed result cache with an
+optional SQLite tier that can be shared between processes.
+"""
+
+import hashlib
+import json
+import sqlite3
+from collections import OrderedDict
+
+from src.utils.text_processing import truncate_document
+
+
+def normalize_text(text):
+    """
+    Normalize text for cache keys.
+    
+    The engine lowercases its input and tokenization ignores runs of
+    whitespace, so texts differing only in case or spacing share a key.
+    
+    Args:
+        text (str): Input text
+        
+    Returns:
+        str: Normalized text
+    """
+    return ' '.join(text.lower().split())
+
+
+class LRUCache:
+    """Bounded in-memory cache evicting the least recently used entry."""
+    
+    def __init__(self, max_size):
+        """
+        Args:
+            max_size (int): Maximum number of entries
+        """
+        self.max_size = max_size
+        self._data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(self, key, default=None):
+        """Get a value, marking it as recently used."""
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+    
+    def put(self, key, value):
+        """Store a value, evicting the oldest entry when full."""
+        if key in self._data:
+            self._data.move_to_end(key)
+        self._data[key] = value
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+            self.evictions += 1
+    
+    def clear(self):
+        """Remove all entries (counters are kept)."""
+        self._data.clear()
+    
+    def __contains__(self, key):
+        return key in self._data
+    
+    def __len__(self):
+        return len(self._data)
+    
+    def stats(self):
+        """Get hit/miss/eviction counters."""
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._data),
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
+
+
+class ResultCache:
+    """
+    Content-addressed cache of analysis results.
+    
+    Keys are a hash of the normalized text and an engine/config fingerprint,
+    so changing the engine or its settings never serves stale results. The
+    text is truncated like the engine truncates it before it is normalized,
+    so texts differing only in spacing share a key only if they are cut at
+    the same words.
+    Lookups go to an in-memory LRU tier first and then to an optional
+    SQLite file, which several processes can share.
+    """
+    
+    def __init__(self, fingerprint, max_size, path=None, max_chars=None):
+        """
+        Args:
+            fingerprint (str): Engine/config fingerprint mixed into every key
+            max_size (int): Maximum entries in the in-memory tier
+            path (str): SQLite file for the persistent tier (None disables it)
+            max_chars (int): Length the engine truncates documents to
+                (None when it analyzes or rejects longer ones whole)
+        """
+        self.fingerprint = fingerprint
+        self.max_chars = max_chars
+        self.memory = LRUCache(max_size)
+        self.path = path
+        self.disk_hits = 0
+        self._db = None
+        if path:
+            self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute("CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, value TEXT)")
+            self._db.commit()
+    
+    def key(self, text):
+        """Get the cache key of a text."""
+        text = truncate_document(text, self.max_chars)
+        content = f"{self.fingerprint}\0{normalize_text(text)}"
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
+    
+    def get(self, text):
+        """
+        Look up the results of a text.
+        
+        Args:
+            text (str): Input text
+            
+        Returns:
+            list: Cached [aspect, sentiment_score] pairs, or None on a miss
+        """
+        key = self.key(text)
+        results = self.memory.get(key)
+        if results is None and self._db is not None:
+            row = self._db.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                results = json.loads(row[0])
+                self.disk_hits += 1
+                self.memory.put(key, results)
+        
+        if results is None:
+            return None
+        # Callers get their own lists, so mutating them cannot corrupt the cache
+        return [list(pair) for pair in results]
+    
+    def put(self, text, results):
+        """
+        Store the results of a text.
+        
+        Args:
+            text (str): Input text
+            results (list): [aspect, sentiment_score] pairs
+        """
+        key = self.key(text)
+        results = [list(pair) for pair in results]
+        self.memory.put(key, results)
+        if self._db is not None:
+            self._db.execute("INSERT OR REPLACE INTO results (key, value) VALUES (?, ?)",
+                             (key, json.dumps(results)))
+            self._db.commit()
+    
+    def put_many(self, items):
+        """
+        Store the results of several texts in one transaction.
+        
+        Args:
+            items (list): (text, results) pairs
+        """
+        rows = []
+        for text, results in items:
+            key = self.key(text)
+            results = [list(pair) for pair in results]
+            self.memory.put(key, results)
+            rows.append((key, json.dumps(results)))
+        if self._db is not None and rows:
+            self._db.executemany("INSERT OR REPLACE INTO results (key, value) VALUES (?, ?)", rows)
+            self._db.commit()
+    
+    def stats(self):
+        """Get hit/miss/eviction counters of both tiers."""
+        stats = self.memory.stats()
+        # A memory miss served from disk is a hit overall
+        stats['disk_hits'] = self.disk_hits
+        stats['misses'] -= self.disk_hits
+        stats['hits'] += self.disk_hits
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        return stats
+    
+    def close(self):
+        """Close the persistent tier."""
+        if self._db is not None:
+            self._db.close()
+            self._db = None
\ No newline at end of file
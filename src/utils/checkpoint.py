@@ -0,0 +1,74 @@
+"""
+Checkpoint Utilities for ABSA
+
+This module records the progress of long-running corpus jobs so that an
+interrupted run can resume where it left off instead of starting over.
+"""
+
+import json
+import os
+import time
+
+
+class Checkpoint:
+    """
+    Progress record of a corpus job, stored as a small JSON file.
+    
+    The state holds how many input records were processed, the input byte
+    offset just past them and the output (and dead-letter) byte offsets at
+    that point. Writes are atomic, so a crash never leaves a torn checkpoint.
+    """
+    
+    def __init__(self, path):
+        """
+        Args:
+            path (str): Checkpoint file path
+        """
+        self.path = path
+    
+    def load(self):
+        """
+        Load the saved state.
+        
+        Returns:
+            dict: Saved state, or None if there is no checkpoint yet
+        """
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path, encoding='utf-8') as f:
+            return json.load(f)
+    
+    def save(self, records, input_offset, output_offset, dead_letter_offset=None,
+             dead_letters=0, completed=False):
+        """
+        Atomically save the job state.
+        
+        Args:
+            records (int): Number of input records fully processed
+            input_offset (int): Input byte offset after those records (None for stdin)
+            output_offset (int): Output byte offset after their results
+            dead_letter_offset (int): Dead-letter file byte offset
+            dead_letters (int): Number of records sent to the dead-letter file
+            completed (bool): Whether the whole input was processed
+        """
+        state = {
+            'records': records,
+            'input_offset': input_offset,
+            'output_offset': output_offset,
+            'dead_letter_offset': dead_letter_offset,
+            'dead_letters': dead_letters,
+            'completed': completed,
+            'updated_at': time.time()
+        }
+        
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+    
+    def clear(self):
+        """Remove the checkpoint file."""
+        if os.path.exists(self.path):
+            os.remove(self.path)
\ No newline at end of file
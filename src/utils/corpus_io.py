@@ -0,0 +1,326 @@
+"""
+Corpus Input/Output Utilities for ABSA
+
+This module contains streaming readers and writers for document corpora
+in JSONL, CSV and plain text (one document per line) formats. Files are
+processed record by record, so memory use does not grow with file size.
+A path of '-' stands for stdin / stdout. Records that cannot be decoded
+or parsed are yielded as MalformedRecordError instead of ending the read.
+"""
+
+import csv
+import json
+import os
+import sys
+
+FORMATS = ('jsonl', 'csv', 'text')
+
+
+def detect_format(path):
+    """
+    Guess a corpus format from a file extension.
+    
+    Args:
+        path (str): File path ('-' for stdin / stdout)
+        
+    Returns:
+        str: One of 'jsonl', 'csv' or 'text'
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension in ('.jsonl', '.ndjson', '.json'):
+        return 'jsonl'
+    if extension == '.csv':
+        return 'csv'
+    if path == '-':
+        return 'jsonl'
+    return 'text'
+
+
+class MalformedRecordError(ValueError):
+    """A corpus record that is not valid UTF-8 or not valid JSON."""
+    
+    def __init__(self, error, raw):
+        """
+        Args:
+            error (Exception): Why the record could not be read
+            raw (str): The record as found in the file (undecodable bytes replaced)
+        """
+        super().__init__(f"{type(error).__name__}: {error}")
+        self.raw = raw
+
+
+def parse_jsonl_record(line):
+    """
+    Parse one JSONL line.
+    
+    Args:
+        line (str): Decoded line
+        
+    Returns:
+        dict: The record, or a MalformedRecordError if the line is not valid JSON
+    """
+    try:
+        record = json.loads(line)
+    except ValueError as e:
+        return MalformedRecordError(e, line.rstrip('\r\n'))
+    return record
+
+
+class CorpusReader:
+    """
+    Streaming reader yielding (doc_id, text) pairs from a corpus file.
+    
+    For files, the byte offset just past the last yielded record is kept in
+    `offset`, so a later reader can resume from it with start_offset. Stdin
+    cannot seek; resuming it skips start_record records instead. A record
+    that cannot be read is yielded as (record number, MalformedRecordError).
+    """
+    
+    def __init__(self, path, fmt=None, text_field='text', id_field='id',
+                 start_offset=None, start_record=0):
+        """
+        Args:
+            path (str): Input file path ('-' for stdin)
+            fmt (str): 'jsonl', 'csv' or 'text' (guessed from the extension if None)
+            text_field (str): JSONL key / CSV column holding the document text
+            id_field (str): JSONL key / CSV column holding the document id
+            start_offset (int): Byte offset to resume reading a file from
+            start_record (int): Number of records already processed
+        """
+        self.path = path
+        self.fmt = fmt or detect_format(path)
+        if self.fmt not in FORMATS:
+            raise ValueError(f"Unsupported corpus format: {self.fmt}")
+        self.text_field = text_field
+        self.id_field = id_field
+        self.start_offset = start_offset
+        self.start_record = start_record
+        self.offset = start_offset
+        self.records = start_record
+        self._decode_error = None
+    
+    def _lines(self, stream):
+        """
+        Decode lines from a binary stream, tracking the byte offset.
+        
+        A line that is not valid UTF-8 is decoded with replacement
+        characters and the error kept for the record it belongs to.
+        """
+        for line in stream:
+            if self.offset is not None:
+                self.offset += len(line)
+            try:
+                yield line.decode('utf-8')
+            except UnicodeDecodeError as e:
+                self._decode_error = e
+                yield line.decode('utf-8', 'replace')
+    
+    def _records(self, lines, header):
+        """Parse decoded lines into (raw text, record) pairs."""
+        if self.fmt == 'csv':
+            for row in csv.reader(lines):
+                yield ','.join(row), dict(zip(header, row))
+        elif self.fmt == 'jsonl':
+            for line in lines:
+                if line.strip():
+                    yield line.rstrip('\r\n'), parse_jsonl_record(line)
+        else:
+            for line in lines:
+                line = line.rstrip('\r\n')
+                yield line, {self.text_field: line}
+    
+    def __iter__(self):
+        if self.path == '-':
+            stream = sys.stdin.buffer
+            self.offset = None
+        else:
+            stream = open(self.path, 'rb')
+            self.offset = 0
+        lines = self._lines(stream)
+        
+        try:
+            header = None
+            if self.fmt == 'csv':
+                header = next(csv.reader(lines), None)
+            if self.start_offset and self.path != '-':
+                stream.seek(self.start_offset)
+                self.offset = self.start_offset
+            self._decode_error = None
+            
+            number = 0
+            for raw, record in self._records(lines, header):
+                number += 1
+                error, self._decode_error = self._decode_error, None
+                if self.path == '-' and number <= self.start_record:
+                    continue
+                if error is not None:
+                    record = MalformedRecordError(error, raw)
+                if isinstance(record, MalformedRecordError):
+                    # The id field cannot be trusted, the record number identifies it
+                    doc_id = self.records
+                    self.records += 1
+                    yield doc_id, record
+                    continue
+                if not isinstance(record, dict):
+                    record = {self.text_field: record}
+                doc_id = record.get(self.id_field, self.records)
+                self.records += 1
+                yield doc_id, record.get(self.text_field) or ''
+        finally:
+            if self.path != '-':
+                stream.close()
+
+
+def read_documents(path, fmt=None, text_field='text', id_field='id',
+                   start_offset=None, start_record=0, mapped=False):
+    """
+    Stream documents from a corpus file.
+    
+    Args:
+        path (str): Input file path ('-' for stdin)
+        fmt (str): 'jsonl', 'csv' or 'text' (guessed from the extension if None)
+        text_field (str): JSONL key / CSV column holding the document text
+        id_field (str): JSONL key / CSV column holding the document id
+        start_offset (int): Byte offset to resume reading a file from
+        start_record (int): Number of records already processed
+        mapped (bool): Memory-map the file and index its lines (JSONL and text
+            files only, see mapped_corpus.MappedCorpus)
+        
+    Returns:
+        CorpusReader: Iterable of (doc_id, text) pairs; the id defaults to the record number
+    """
+    if mapped:
+        from src.utils.mapped_corpus import MappedCorpus
+        return MappedCorpus(path, fmt, text_field, id_field,
+                            start_offset=start_offset, start_record=start_record)
+    return CorpusReader(path, fmt, text_field, id_field, start_offset, start_record)
+
+
+class ResultWriter:
+    """
+    Streaming writer for detailed analysis results.
+    
+    JSONL output has one record per document; CSV output has one row per aspect.
+    """
+    
+    CSV_COLUMNS = ['id', 'aspect', 'sentiment_score', 'sentiment_label']
+    
+    def __init__(self, path, fmt=None, resume_offset=None):
+        """
+        Args:
+            path (str): Output file path ('-' for stdout)
+            fmt (str): 'jsonl' or 'csv' (guessed from the extension if None)
+            resume_offset (int): Truncate an existing file to this byte offset
+                and append to it instead of starting over
+        """
+        self.fmt = fmt or detect_format(path)
+        if self.fmt not in ('jsonl', 'csv'):
+            raise ValueError(f"Unsupported output format: {self.fmt}")
+        
+        appending = False
+        if path == '-':
+            self.stream = sys.stdout
+        elif resume_offset is not None and os.path.exists(path) and os.path.getsize(path):
+            self.stream = open(path, 'r+', encoding='utf-8', newline='')
+            # Drop anything written after the last checkpoint
+            self.stream.truncate(resume_offset)
+            self.stream.seek(resume_offset)
+            appending = resume_offset > 0
+        else:
+            self.stream = open(path, 'w', encoding='utf-8', newline='')
+        
+        self._csv = None
+        if self.fmt == 'csv':
+            self._csv = csv.writer(self.stream)
+            # Also when resuming into an output that is missing or empty
+            if not appending:
+                self._csv.writerow(self.CSV_COLUMNS)
+    
+    def write(self, doc_id, details):
+        """
+        Write the detailed results of one document.
+        
+        Args:
+            doc_id: Document id
+            details (dict): Detailed analysis results
+        """
+        if self._csv is not None:
+            for aspect in details['aspects']:
+                self._csv.writerow([doc_id, aspect['aspect'], aspect['sentiment_score'],
+                                    aspect['sentiment_label']])
+        else:
+            record = {'id': doc_id}
+            record.update(details)
+            self.stream.write(json.dumps(record, ensure_ascii=False) + '\n')
+    
+    def position(self):
+        """
+        Flush and get the current output byte offset.
+        
+        Returns:
+            int: Byte offset, or None when writing to stdout
+        """
+        self.stream.flush()
+        if self.stream is sys.stdout:
+            return None
+        return self.stream.tell()
+    
+    def close(self):
+        """Flush and close the output (stdout is only flushed)."""
+        self.stream.flush()
+        if self.stream is not sys.stdout:
+            self.stream.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+
+class DeadLetterWriter:
+    """Streaming JSONL writer for documents whose analysis raised an exception."""
+    
+    def __init__(self, path, resume_offset=None):
+        """
+        Args:
+            path (str): Dead-letter file path
+            resume_offset (int): Truncate an existing file to this byte offset and append
+        """
+        if resume_offset is not None and os.path.exists(path):
+            self.stream = open(path, 'r+', encoding='utf-8')
+            self.stream.truncate(resume_offset)
+            self.stream.seek(resume_offset)
+        else:
+            self.stream = open(path, 'w', encoding='utf-8')
+        self.count = 0
+    
+    def write(self, doc_id, text, error):
+        """
+        Record a failed document.
+        
+        Args:
+            doc_id: Document id
+            text (str): Document text
+            error (Exception): The exception raised while analyzing it
+        """
+        record = {'id': doc_id, 'text': text, 'error': f"{type(error).__name__}: {error}"}
+        self.stream.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self.count += 1
+    
+    def position(self):
+        """Flush and get the current byte offset."""
+        self.stream.flush()
+        return self.stream.tell()
+    
+    def close(self):
+        """Flush and close the file."""
+        self.stream.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
\ No newline at end of file
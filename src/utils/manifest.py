@@ -0,0 +1,142 @@
+"""
+Analysis Manifest for Incremental Corpus Runs
+
+This module records, per document id, a hash of the document text, the
+engine/config fingerprint it was analyzed with and its results, in a
+SQLite file. A later run over the same corpus only re-analyzes documents
+that are new, edited or were analyzed under a different configuration,
+and takes the stored results for everything else. Lookups go to the
+database one block of ids at a time, so manifests of tens of millions of
+documents are never loaded into memory.
+"""
+
+import hashlib
+import json
+import sqlite3
+
+from src.utils.cache import normalize_text
+
+# SQLite limits the number of bound parameters per statement
+MAX_LOOKUP_IDS = 500
+
+
+def content_hash(text):
+    """
+    Hash a document text for change detection.
+    
+    Texts that normalize equally (see cache.normalize_text) get the same
+    hash, since the engine gives them the same results.
+    
+    Args:
+        text (str): Document text
+    
+    Returns:
+        bytes: 16-byte digest
+    """
+    return hashlib.blake2b(normalize_text(text).encode('utf-8'), digest_size=16).digest()
+
+
+def _id_key(doc_id):
+    """Encode a document id so that e.g. 1 and '1' stay distinct."""
+    return json.dumps(doc_id, ensure_ascii=False)
+
+
+class Manifest:
+    """
+    Per-document record of what was analyzed, and with which configuration.
+    
+    Rows are (doc_id, content_hash, fingerprint, results); a stored result
+    is reused only if both the text hash and the fingerprint still match.
+    """
+    
+    def __init__(self, path, fingerprint):
+        """
+        Args:
+            path (str): SQLite file (created if missing)
+            fingerprint (str): Engine/config fingerprint of the current run
+                (see absa_engine.engine_fingerprint)
+        """
+        self.path = path
+        self.fingerprint = fingerprint
+        self.reused = 0
+        self.analyzed = 0
+        self._db = sqlite3.connect(path, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS documents ("
+            "doc_id TEXT PRIMARY KEY, content_hash BLOB, fingerprint TEXT, results TEXT)"
+        )
+        self._db.commit()
+        self._pending = []
+    
+    def lookup(self, documents):
+        """
+        Find the stored results of documents that have not changed.
+        
+        Args:
+            documents (list): (doc_id, text) pairs
+        
+        Returns:
+            list: Stored [aspect, sentiment_score] pairs per document, or None
+                where the document is new, changed or analyzed under another fingerprint
+        """
+        hashes = [content_hash(text) for _, text in documents]
+        keys = [_id_key(doc_id) for doc_id, _ in documents]
+        rows = {}
+        for start in range(0, len(keys), MAX_LOOKUP_IDS):
+            batch = keys[start:start + MAX_LOOKUP_IDS]
+            placeholders = ','.join('?' * len(batch))
+            for key, digest, fingerprint, results in self._db.execute(
+                    f"SELECT doc_id, content_hash, fingerprint, results FROM documents "
+                    f"WHERE doc_id IN ({placeholders})", batch):
+                rows[key] = (digest, fingerprint, results)
+        
+        stored = []
+        for key, digest in zip(keys, hashes):
+            row = rows.get(key)
+            if row is not None and row[0] == digest and row[1] == self.fingerprint:
+                stored.append(json.loads(row[2]))
+                self.reused += 1
+            else:
+                stored.append(None)
+        return stored
+    
+    def record(self, doc_id, text, results):
+        """
+        Queue the fresh results of a document (written by commit()).
+        
+        Args:
+            doc_id: Document id
+            text (str): Document text
+            results (list): Its [aspect, sentiment_score] pairs
+        """
+        self._pending.append((_id_key(doc_id), content_hash(text), self.fingerprint,
+                              json.dumps(results, ensure_ascii=False)))
+        self.analyzed += 1
+    
+    def commit(self):
+        """Write the queued records in one transaction."""
+        if not self._pending:
+            return
+        self._db.executemany(
+            "INSERT OR REPLACE INTO documents (doc_id, content_hash, fingerprint, results) "
+            "VALUES (?, ?, ?, ?)", self._pending
+        )
+        self._db.commit()
+        self._pending = []
+    
+    def __len__(self):
+        return self._db.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+    
+    def close(self):
+        """Commit queued records and close the database."""
+        self.commit()
+        self._db.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
@@ -0,0 +1,243 @@
+"""
+Memory-Mapped Corpus Reader for ABSA
+
+This module reads JSONL and plain text corpora through a read-only memory
+map instead of loading them. A compact index of line start offsets is
+built once with NumPy and saved next to the file, so documents can be
+fetched by number and worker processes can be handed (start, end)
+document ranges: each worker maps the same file and index, and the pages
+are shared through the OS page cache instead of being pickled to it.
+"""
+
+import mmap
+import os
+
+import numpy as np
+
+from src.utils.corpus_io import MalformedRecordError, detect_format, parse_jsonl_record
+
+# Bytes scanned for newlines at a time while building an index
+INDEX_BLOCK_SIZE = 64 * 1024 * 1024
+
+# Part of the cached index file name; bump when the indexing rules change
+# so indexes cached by older versions are rebuilt
+INDEX_VERSION = 2
+
+NEWLINE = ord('\n')
+# Lines starting with a byte outside this printable ASCII range may be blank
+FIRST_PRINTABLE = ord('!')
+LAST_PRINTABLE = ord('~')
+
+
+def build_line_index(buffer, fmt='jsonl', block_size=INDEX_BLOCK_SIZE):
+    """
+    Find the start offset of every record line in a buffer.
+    
+    For JSONL, lines that are empty or whitespace only are not records and
+    are skipped, as in CorpusReader; in text corpora every line is a
+    document.
+    
+    Args:
+        buffer: Bytes-like object (e.g. an mmap) holding the corpus
+        fmt (str): 'jsonl' or 'text'
+        block_size (int): Bytes scanned at a time
+    
+    Returns:
+        numpy.ndarray: n + 1 offsets; record i spans offsets[i]:offsets[i + 1]
+            including its line break and any skipped blank lines after it.
+            uint32 for files under 4 GiB, int64 otherwise.
+    """
+    size = len(buffer)
+    dtype = np.uint32 if size < 2 ** 32 else np.int64
+    if size == 0:
+        return np.zeros(1, dtype=dtype)
+    
+    data = np.frombuffer(buffer, dtype=np.uint8)
+    try:
+        blocks = [np.flatnonzero(data[start:start + block_size] == NEWLINE).astype(np.int64) + start
+                  for start in range(0, size, block_size)]
+        starts = np.concatenate([np.zeros(1, dtype=np.int64)] + [block + 1 for block in blocks])
+        # A line break at the very end does not start another line
+        starts = starts[starts < size]
+        if fmt == 'jsonl':
+            # Only the few lines that do not start with a printable character
+            # can be blank; check those the way CorpusReader does
+            ends = np.append(starts[1:], size)
+            first = data[starts]
+            candidates = np.flatnonzero((first < FIRST_PRINTABLE) | (first > LAST_PRINTABLE))
+            blank = [i for i in candidates
+                     if not bytes(buffer[starts[i]:ends[i]]).decode('utf-8', 'replace').strip()]
+            starts = np.delete(starts, blank)
+    finally:
+        # Release the buffer export so the mmap can be closed
+        del data
+    return np.append(starts, size).astype(dtype)
+
+
+class MappedCorpus:
+    """
+    Random-access, memory-mapped reader of (doc_id, text) records.
+    
+    Iterating yields documents from the current record on and keeps
+    `offset` and `records` up to date like CorpusReader, so it works with
+    checkpoints and analyze_corpus(). CSV is not supported, since quoted
+    fields may span lines.
+    """
+    
+    def __init__(self, path, fmt=None, text_field='text', id_field='id', index_path=None,
+                 start_offset=None, start_record=0):
+        """
+        Args:
+            path (str): Input file path (stdin cannot be mapped)
+            fmt (str): 'jsonl' or 'text' (guessed from the extension if None)
+            text_field (str): JSONL key holding the document text
+            id_field (str): JSONL key holding the document id
+            index_path (str): Where the line index is cached (default: <path>.idx-v2.npy)
+            start_offset (int): Byte offset to resume reading from
+            start_record (int): Number of records already processed (used without start_offset)
+        """
+        if path == '-':
+            raise ValueError("Memory-mapped reading needs a file, not stdin")
+        self.path = path
+        self.fmt = fmt or detect_format(path)
+        if self.fmt not in ('jsonl', 'text'):
+            raise ValueError(f"Unsupported format for memory-mapped reading: {self.fmt}")
+        self.text_field = text_field
+        self.id_field = id_field
+        self.index_path = index_path or f"{path}.idx-v{INDEX_VERSION}.npy"
+        
+        self._file = open(path, 'rb')
+        size = os.fstat(self._file.fileno()).st_size
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+        self.offsets = self._load_index(size)
+        
+        if start_offset:
+            self.records = int(np.searchsorted(self.offsets[:-1], start_offset))
+        else:
+            self.records = min(start_record, len(self))
+        self.offset = int(self.offsets[self.records])
+    
+    def _load_index(self, size):
+        """Load the cached line index if it is current, or build and save it."""
+        try:
+            if os.path.getmtime(self.index_path) >= os.path.getmtime(self.path):
+                offsets = np.load(self.index_path, mmap_mode='r')
+                if offsets.ndim == 1 and len(offsets) and offsets[-1] == size:
+                    return offsets
+        except (OSError, ValueError):
+            pass
+        
+        offsets = build_line_index(self._map, self.fmt)
+        try:
+            np.save(self.index_path, offsets)
+        except OSError:
+            # Read-only location: keep the index in memory only
+            self.index_path = None
+        return offsets
+    
+    def __len__(self):
+        return len(self.offsets) - 1
+    
+    def span(self, number):
+        """
+        Get the byte range of a document.
+        
+        Args:
+            number (int): Document number
+        
+        Returns:
+            tuple: (start, end) byte offsets, including the line break and skipped blank lines
+        """
+        return int(self.offsets[number]), int(self.offsets[number + 1])
+    
+    def __getitem__(self, number):
+        """
+        Fetch one document by number.
+        
+        Args:
+            number (int): Document number (negative numbers count from the end)
+        
+        Returns:
+            tuple: (doc_id, text); the id defaults to the document number. A
+                record that cannot be read is (number, MalformedRecordError).
+        """
+        if number < 0:
+            number += len(self)
+        if not 0 <= number < len(self):
+            raise IndexError(f"Document number out of range: {number}")
+        start, end = self.span(number)
+        # The span may end with skipped blank lines; the record is its first line
+        line = self._map[start:end].split(b'\n', 1)[0].rstrip(b'\r')
+        try:
+            line = line.decode('utf-8')
+        except UnicodeDecodeError as e:
+            return number, MalformedRecordError(e, line.decode('utf-8', 'replace'))
+        
+        if self.fmt == 'text':
+            return number, line
+        record = parse_jsonl_record(line) if line.strip() else {}
+        if isinstance(record, MalformedRecordError):
+            return number, record
+        if not isinstance(record, dict):
+            record = {self.text_field: record}
+        return record.get(self.id_field, number), record.get(self.text_field) or ''
+    
+    def documents(self, start=0, end=None):
+        """
+        Iterate over a range of documents without moving the reader.
+        
+        Args:
+            start (int): First document number
+            end (int): Document number to stop before (None reads to the end)
+        
+        Yields:
+            tuple: (doc_id, text)
+        """
+        end = len(self) if end is None else min(end, len(self))
+        for number in range(start, end):
+            yield self[number]
+    
+    def ranges(self, size, start=0, end=None):
+        """
+        Split documents into (start, end) ranges of at most size documents.
+        
+        Args:
+            size (int): Documents per range
+            start (int): First document number
+            end (int): Document number to stop before (None is the end)
+        
+        Yields:
+            tuple: (start, end) document numbers
+        """
+        end = len(self) if end is None else min(end, len(self))
+        for first in range(start, end, size):
+            yield first, min(first + size, end)
+    
+    def spec(self):
+        """
+        Get what a worker process needs to open the same corpus.
+        
+        Returns:
+            tuple: Arguments for MappedCorpus(*spec)
+        """
+        return self.path, self.fmt, self.text_field, self.id_field, self.index_path
+    
+    def __iter__(self):
+        while self.records < len(self):
+            document = self[self.records]
+            self.records += 1
+            self.offset = int(self.offsets[self.records])
+            yield document
+    
+    def close(self):
+        """Unmap and close the file."""
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+        self._file.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
@@ -0,0 +1,161 @@
+"""
+Metrics Utilities for ABSA
+
+This module contains a small in-process metrics registry used to
+instrument the analysis engine: stage timers, counters and gauges, with
+optional callbacks and export in the Prometheus text format.
+
+Instrumentation is opt-in: engine functions take metrics=None and skip
+all bookkeeping in that case, so the disabled cost is a few `is None`
+checks per sentence.
+"""
+
+import threading
+import time
+from collections import defaultdict
+
+
+class MetricsRegistry:
+    """In-process registry of stage timers, counters and gauges."""
+    
+    def __init__(self, prefix='absa'):
+        """
+        Args:
+            prefix (str): Prefix of exported metric names
+        """
+        self.prefix = prefix
+        self.timers = defaultdict(lambda: [0, 0.0, 0.0])  # stage -> [count, total, max]
+        self.counters = defaultdict(int)
+        self.gauges = {}
+        self.callbacks = []
+        self._lock = threading.Lock()
+    
+    def add_callback(self, callback):
+        """
+        Register a sink called on every event.
+        
+        Args:
+            callback (callable): Called as callback(kind, name, value) with kind
+                'timer' (value in seconds), 'counter' (increment) or 'gauge'
+        """
+        self.callbacks.append(callback)
+    
+    def observe(self, stage, seconds):
+        """Record one timing of a stage."""
+        with self._lock:
+            timer = self.timers[stage]
+            timer[0] += 1
+            timer[1] += seconds
+            if seconds > timer[2]:
+                timer[2] = seconds
+        for callback in self.callbacks:
+            callback('timer', stage, seconds)
+    
+    def lap(self, stage, start):
+        """
+        Record the time since start for a stage and return the current time.
+        
+        Args:
+            stage (str): Stage name
+            start (float): time.perf_counter() value the stage started at
+            
+        Returns:
+            float: Current time.perf_counter() value, the start of the next stage
+        """
+        now = time.perf_counter()
+        self.observe(stage, now - start)
+        return now
+    
+    def increment(self, name, value=1):
+        """Increase a counter."""
+        with self._lock:
+            self.counters[name] += value
+        for callback in self.callbacks:
+            callback('counter', name, value)
+    
+    def set_gauge(self, name, value):
+        """Set a gauge to its current value."""
+        with self._lock:
+            self.gauges[name] = value
+        for callback in self.callbacks:
+            callback('gauge', name, value)
+    
+    def record_cache_stats(self, cache_name, stats):
+        """
+        Publish the counters of a cache as gauges.
+        
+        Args:
+            cache_name (str): Cache name used in the gauge names
+            stats (dict): Output of a cache's stats() (None is ignored)
+        """
+        if not stats:
+            return
+        for key in ('size', 'hits', 'misses', 'evictions', 'hit_rate'):
+            if key in stats:
+                self.set_gauge(f"{cache_name}_cache_{key}", stats[key])
+    
+    def snapshot(self):
+        """
+        Get a copy of all metrics.
+        
+        Returns:
+            dict: 'timers' (count, total_seconds, mean_seconds, max_seconds per
+                stage), 'counters' and 'gauges'
+        """
+        with self._lock:
+            timers = {
+                stage: {
+                    'count': count,
+                    'total_seconds': total,
+                    'mean_seconds': total / count if count else 0.0,
+                    'max_seconds': maximum
+                }
+                for stage, (count, total, maximum) in self.timers.items()
+            }
+            return {'timers': timers, 'counters': dict(self.counters), 'gauges': dict(self.gauges)}
+    
+    def reset(self):
+        """Clear all recorded values (callbacks are kept)."""
+        with self._lock:
+            self.timers.clear()
+            self.counters.clear()
+            self.gauges.clear()
+    
+    def to_prometheus(self):
+        """
+        Export all metrics in the Prometheus text exposition format.
+        
+        Returns:
+            str: Metrics text, e.g. for a /metrics endpoint
+        """
+        snapshot = self.snapshot()
+        lines = []
+        
+        if snapshot['timers']:
+            name = f"{self.prefix}_stage_seconds"
+            lines.append(f"# HELP {name} Time spent per analysis stage")
+            lines.append(f"# TYPE {name} summary")
+            for stage, timer in sorted(snapshot['timers'].items()):
+                lines.append(f'{name}_sum{{stage="{stage}"}} {timer["total_seconds"]:.9f}')
+                lines.append(f'{name}_count{{stage="{stage}"}} {timer["count"]}')
+        
+        for counter, value in sorted(snapshot['counters'].items()):
+            name = f"{self.prefix}_{counter}_total"
+            lines.append(f"# TYPE {name} counter")
+            lines.append(f"{name} {value}")
+        
+        for gauge, value in sorted(snapshot['gauges'].items()):
+            name = f"{self.prefix}_{gauge}"
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {value}")
+        
+        return '\n'.join(lines) + '\n'
+
+
+# Global metrics registry instance
+metrics_registry = MetricsRegistry()
+
+
+def get_metrics_registry():
+    """Get the global metrics registry instance."""
+    return metrics_registry
\ No newline at end of file
@@ -0,0 +1,115 @@
+"""
+Resource Usage Utilities for ABSA
+
+This module contains helpers for measuring process memory, used to report
+the footprint of model loading and benchmark runs, and how much of a
+worker process's memory is its own versus shared with its parent.
+"""
+
+import os
+import sys
+
+
+def get_rss_mb(pid=None):
+    """
+    Get the current resident set size of a process.
+    
+    Args:
+        pid (int): Process id (defaults to the current process)
+        
+    Returns:
+        float: Resident memory in MB, or the peak RSS where /proc is unavailable
+    """
+    try:
+        with open(f"/proc/{pid or 'self'}/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError):
+        return get_peak_rss_mb()
+
+
+def get_peak_rss_mb():
+    """
+    Get the peak resident set size of the current process.
+    
+    Returns:
+        float: Peak resident memory in MB (0.0 if unavailable)
+    """
+    try:
+        import resource
+    except ImportError:
+        return 0.0
+    
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere
+    if sys.platform == 'darwin':
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+def reset_rss_high_water():
+    """
+    Reset the current process's RSS high-water mark (VmHWM), e.g. between benchmark phases.
+    
+    The lifetime peak from get_peak_rss_mb() is not affected.
+    
+    Returns:
+        bool: True if reset, False where /proc/self/clear_refs is unavailable (Linux only)
+    """
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def get_rss_high_water_mb():
+    """
+    Get the peak resident set size since the last reset_rss_high_water().
+    
+    Returns:
+        float: Peak resident memory in MB (the lifetime peak where /proc is unavailable)
+    """
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except (OSError, ValueError):
+        pass
+    return get_peak_rss_mb()
+
+
+def get_memory_breakdown_mb(pid=None):
+    """
+    Split the resident memory of a process into private and shared parts.
+    
+    USS (unique set size) is the memory only this process uses, i.e. what
+    ending it would free. PSS charges every shared page in equal parts to
+    the processes sharing it, so PSS summed over a process tree is its
+    total footprint.
+    
+    Args:
+        pid (int): Process id (defaults to the current process)
+        
+    Returns:
+        dict: 'rss', 'pss', 'uss' and 'shared' in MB, or None where
+            /proc/<pid>/smaps_rollup is unavailable (Linux 4.14+ only)
+    """
+    fields = {}
+    try:
+        with open(f"/proc/{pid or 'self'}/smaps_rollup") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) == 3 and parts[2] == 'kB':
+                    fields[parts[0].rstrip(':')] = int(parts[1]) / 1024
+    except (OSError, ValueError):
+        return None
+    
+    return {
+        'rss': fields.get('Rss', 0.0),
+        'pss': fields.get('Pss', 0.0),
+        'uss': fields.get('Private_Clean', 0.0) + fields.get('Private_Dirty', 0.0),
+        'shared': fields.get('Shared_Clean', 0.0) + fields.get('Shared_Dirty', 0.0)
+    }
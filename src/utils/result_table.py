@@ -0,0 +1,217 @@
+"""
+Columnar Result Storage for ABSA
+
+This module stores analysis results as one row per aspect in NumPy
+columns instead of nested lists and per-aspect dicts. Aspect and opinion
+words are dictionary-encoded against one shared vocabulary, so a row
+costs a few dozen bytes however many times a word repeats. Tables
+convert to pandas DataFrames and Arrow tables, and write Parquet
+(pandas and pyarrow are imported only when used; pyarrow is optional).
+"""
+
+from array import array
+
+import numpy as np
+
+from config.settings import POSITIVE_THRESHOLD, NEGATIVE_THRESHOLD
+
+# Label names by label code + 1 (codes are -1, 0 and 1)
+LABELS = ('Negative', 'Neutral', 'Positive')
+
+
+def _import_pyarrow():
+    """Import pyarrow with a helpful error if it is missing."""
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("Arrow/Parquet export needs pyarrow: pip install pyarrow")
+    return pyarrow
+
+
+class ResultTableBuilder:
+    """Append per-document results and build a ResultTable from them."""
+    
+    def __init__(self):
+        self.doc_ids = []
+        self._doc_index = array('i')
+        self._sentence = array('i')
+        self._aspect_codes = array('i')
+        self._scores = array('d')
+        self._opinion_offsets = array('q', [0])
+        self._opinion_codes = array('i')
+        self._vocabulary = {}
+    
+    def _code(self, word):
+        """Get the vocabulary code of a word, adding it if new."""
+        code = self._vocabulary.get(word)
+        if code is None:
+            code = self._vocabulary[word] = len(self._vocabulary)
+        return code
+    
+    def add(self, doc_id, results):
+        """
+        Append the results of one document.
+        
+        Args:
+            doc_id: Document identifier
+            results (list): [aspect, sentiment_score] pairs, or
+                [aspect, sentiment_score, sentence_index, linked_words] records
+                (pairs get sentence index -1 and no opinions)
+        """
+        doc = len(self.doc_ids)
+        self.doc_ids.append(doc_id)
+        for record in results:
+            self._doc_index.append(doc)
+            self._aspect_codes.append(self._code(record[0]))
+            self._scores.append(record[1])
+            if len(record) > 2:
+                self._sentence.append(record[2])
+                self._opinion_codes.extend([self._code(word) for word in record[3]])
+            else:
+                self._sentence.append(-1)
+            self._opinion_offsets.append(len(self._opinion_codes))
+    
+    def build(self):
+        """Create a ResultTable from everything appended so far."""
+        return ResultTable(
+            self.doc_ids,
+            np.frombuffer(self._doc_index, dtype=np.int32).copy(),
+            np.frombuffer(self._sentence, dtype=np.int32).copy(),
+            np.frombuffer(self._aspect_codes, dtype=np.int32).copy(),
+            np.frombuffer(self._scores, dtype=np.float64).copy(),
+            np.frombuffer(self._opinion_offsets, dtype=np.int64).copy(),
+            np.frombuffer(self._opinion_codes, dtype=np.int32).copy(),
+            list(self._vocabulary)
+        )
+
+
+class ResultTable:
+    """
+    Analysis results as columns, one row per aspect.
+    
+    Columns: doc_id (via doc_index into doc_ids), sentence, aspect (codes
+    into vocabulary), opinions (ragged: opinion_offsets into opinion_codes),
+    score and label (-1 negative, 0 neutral, 1 positive).
+    """
+    
+    def __init__(self, doc_ids, doc_index, sentence, aspect_codes, scores,
+                 opinion_offsets, opinion_codes, vocabulary):
+        self.doc_ids = doc_ids
+        self.doc_index = doc_index
+        self.sentence = sentence
+        self.aspect_codes = aspect_codes
+        self.scores = scores
+        self.opinion_offsets = opinion_offsets
+        self.opinion_codes = opinion_codes
+        self.vocabulary = vocabulary
+        self.label_codes = (
+            (scores > POSITIVE_THRESHOLD).astype(np.int8) - (scores < NEGATIVE_THRESHOLD).astype(np.int8)
+        )
+    
+    @classmethod
+    def from_results(cls, results, doc_ids=None):
+        """
+        Build a table from per-document analyzer results.
+        
+        Args:
+            results (iterable): One result list per document (pairs or detail records)
+            doc_ids (iterable): Document identifiers (defaults to 0, 1, 2, ...)
+        
+        Returns:
+            ResultTable: The results as columns
+        """
+        builder = ResultTableBuilder()
+        if doc_ids is None:
+            for doc_id, doc_results in enumerate(results):
+                builder.add(doc_id, doc_results)
+        else:
+            for doc_id, doc_results in zip(doc_ids, results):
+                builder.add(doc_id, doc_results)
+        return builder.build()
+    
+    def __len__(self):
+        return len(self.scores)
+    
+    @property
+    def nbytes(self):
+        """Memory held by the numeric columns in bytes."""
+        return sum(column.nbytes for column in (
+            self.doc_index, self.sentence, self.aspect_codes, self.scores,
+            self.opinion_offsets, self.opinion_codes, self.label_codes
+        ))
+    
+    def aspects(self):
+        """Get the aspect column as an array of strings."""
+        return np.asarray(self.vocabulary, dtype=object)[self.aspect_codes]
+    
+    def labels(self):
+        """Get the label column as an array of label names."""
+        return np.asarray(LABELS, dtype=object)[self.label_codes + 1]
+    
+    def opinions(self, row):
+        """Get the linked opinion words of one row."""
+        start, end = self.opinion_offsets[row], self.opinion_offsets[row + 1]
+        return [self.vocabulary[code] for code in self.opinion_codes[start:end]]
+    
+    def to_pandas(self):
+        """
+        Convert to a pandas DataFrame.
+        
+        Aspect and label become categorical columns, so the frame shares the
+        table's compact encoding.
+        
+        Returns:
+            pandas.DataFrame: Columns doc_id, sentence, aspect, opinions, score, label
+        """
+        import pandas as pd
+        
+        return pd.DataFrame({
+            'doc_id': np.asarray(self.doc_ids, dtype=object)[self.doc_index],
+            'sentence': self.sentence,
+            'aspect': pd.Categorical.from_codes(self.aspect_codes, categories=self.vocabulary),
+            'opinions': [self.opinions(row) for row in range(len(self))],
+            'score': self.scores,
+            'label': pd.Categorical.from_codes(self.label_codes + 1, categories=LABELS)
+        })
+    
+    def to_arrow(self):
+        """
+        Convert to an Arrow table without copying through Python objects.
+        
+        Returns:
+            pyarrow.Table: Columns doc_id, sentence, aspect, opinions, score, label
+        """
+        pa = _import_pyarrow()
+        
+        vocabulary = pa.array(self.vocabulary, type=pa.string())
+        try:
+            doc_ids = pa.array(self.doc_ids)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            # Mixed id types (e.g. ints and strings) are stored as strings
+            doc_ids = pa.array([None if doc_id is None else str(doc_id) for doc_id in self.doc_ids])
+        
+        return pa.table({
+            'doc_id': doc_ids.take(pa.array(self.doc_index)),
+            'sentence': pa.array(self.sentence),
+            'aspect': pa.DictionaryArray.from_arrays(pa.array(self.aspect_codes), vocabulary),
+            'opinions': pa.LargeListArray.from_arrays(
+                pa.array(self.opinion_offsets),
+                pa.DictionaryArray.from_arrays(pa.array(self.opinion_codes), vocabulary)
+            ),
+            'score': pa.array(self.scores),
+            'label': pa.DictionaryArray.from_arrays(
+                pa.array(self.label_codes + 1), pa.array(LABELS, type=pa.string())
+            )
+        })
+    
+    def write_parquet(self, path, compression='zstd'):
+        """
+        Write the table to a Parquet file.
+        
+        Args:
+            path (str): Output file
+            compression (str): Parquet compression codec
+        """
+        pa = _import_pyarrow()
+        pa.parquet.write_table(self.to_arrow(), path, compression=compression)
@@ -66,17 +66,54 @@ def tokenize_words(text):
     return word_tokenize(text)
 
 
+def truncate_document(text, max_chars):
+    """
+    Cut a text at the last word boundary before max_chars.
+    
+    Args:
+        text (str): Input text
+        max_chars (int): Longest kept text (None keeps any length)
+        
+    Returns:
+        str: The text, or its first part if it is longer than max_chars
+    """
+    if max_chars is None or len(text) <= max_chars:
+        return text
+    cut = text.rfind(' ', 0, max_chars + 1)
+    return text[:cut if cut > 0 else max_chars]
+
+
+# Perceptron tagger shared by every call in this process (see get_tagger)
+_tagger = None
+
+
+def get_tagger():
+    """
+    Get the process-wide perceptron tagger, loading it on first use.
+    
+    nltk.pos_tag() builds a new tagger for every call; keeping one also
+    lets forked worker processes share the weights loaded by their parent.
+    """
+    global _tagger
+    if _tagger is None:
+        from nltk.tag.perceptron import PerceptronTagger
+        _tagger = PerceptronTagger()
+    return _tagger
+
+
 def pos_tag_words(words):
     """
     Perform part-of-speech tagging on words.
     
+    Gives the same tags as nltk.pos_tag() with the shared tagger.
+    
     Args:
         words (list): List of words
         
     Returns:
         list: List of (word, pos_tag) tuples
     """
-    return nltk.pos_tag(words)
+    return get_tagger().tag(words)
 
 
 def filter_stopwords(words, stop_words):
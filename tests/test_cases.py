@@ -5,7 +5,34 @@ This module contains predefined test cases and utilities for testing
 the ABSA functionality.
 """
 
-from src.core.absa_engine import aspect_sentiment_analysis
+import time
+from collections import Counter
+
+from src.core.absa_engine import aspect_sentiment_analysis, sentiment_label
+from src.core.scoring import fresh_scorer
+
+
+def result_agreement(reference, candidate):
+    """
+    Count how far one document's results agree with reference results.
+    
+    Args:
+        reference (list): Reference [aspect, sentiment_score] pairs
+        candidate (list): [aspect, sentiment_score] pairs to check
+    
+    Returns:
+        tuple: (reference aspects, candidate aspects, aspects found by both,
+            of those the ones with the same sentiment label)
+    """
+    reference_aspects = Counter(aspect for aspect, _ in reference)
+    candidate_aspects = Counter(aspect for aspect, _ in candidate)
+    reference_labels = Counter((aspect, sentiment_label(score)) for aspect, score in reference)
+    candidate_labels = Counter((aspect, sentiment_label(score)) for aspect, score in candidate)
+    return (
+        len(reference), len(candidate),
+        sum((reference_aspects & candidate_aspects).values()),
+        sum((reference_labels & candidate_labels).values())
+    )
 
 
 class TestRunner:
@@ -87,6 +114,101 @@ class TestRunner:
             
             print("-" * 40)
     
+    def compare_modes(self, stop_words, nlp, sid):
+        """
+        Compare the single-pass engine mode with the two-pass mode.
+        
+        Args:
+            stop_words (set): Set of English stopwords
+            nlp: Stanza NLP pipeline object
+            sid: NLTK SentimentIntensityAnalyzer object
+        
+        Returns:
+            bool: True if every test case produced identical results
+        """
+        print("Comparing two-pass and single-pass engine modes")
+        print("=" * 50)
+        
+        all_match = True
+        for i, test_case in enumerate(self.test_cases, 1):
+            try:
+                two_pass = aspect_sentiment_analysis(test_case['text'], stop_words, nlp, sid)
+                single_pass = aspect_sentiment_analysis(test_case['text'], stop_words, nlp, sid,
+                                                        single_pass=True)
+            except Exception as e:
+                print(f"✗ Test {i}: {test_case['name']} - Error: {e}")
+                all_match = False
+                continue
+            
+            if two_pass == single_pass:
+                print(f"✓ Test {i}: {test_case['name']}")
+            else:
+                all_match = False
+                print(f"✗ Test {i}: {test_case['name']}")
+                print(f"  Two-pass:    {two_pass}")
+                print(f"  Single-pass: {single_pass}")
+        
+        print("-" * 40)
+        print("All modes match" if all_match else "Modes differ on some test cases")
+        return all_match
+    
+    def compare_engines(self, stop_words, nlp, sid, scoring='context'):
+        """
+        Compare the rule-based engine with the Stanza engine on the test cases.
+        
+        The Stanza results are the reference: aspect precision/recall and
+        label agreement on shared aspects measure what the rules give up,
+        the mean latencies what they save. Each engine is warmed up first
+        and timed with its own empty score memo.
+        
+        Args:
+            stop_words (set): Set of English stopwords
+            nlp: Stanza NLP pipeline object
+            sid: NLTK SentimentIntensityAnalyzer object
+            scoring (str): Scoring mode of both runs
+        
+        Returns:
+            dict: Totals and mean latency (ms) per engine
+        """
+        print(f"Comparing rule-based and Stanza engines ({scoring} scoring)")
+        print("=" * 50)
+        
+        texts = [test_case['text'] for test_case in self.test_cases]
+        seconds = {}
+        outputs = {}
+        for engine in ('stanza', 'rules'):
+            # Load lazily initialized state, then time with an empty score memo
+            aspect_sentiment_analysis(texts[0], stop_words, nlp, fresh_scorer(sid),
+                                      scoring=scoring, engine=engine)
+            scorer = fresh_scorer(sid)
+            start = time.perf_counter()
+            outputs[engine] = [aspect_sentiment_analysis(text, stop_words, nlp, scorer,
+                                                         scoring=scoring, engine=engine)
+                               for text in texts]
+            seconds[engine] = time.perf_counter() - start
+        
+        totals = [0, 0, 0, 0]
+        for i, test_case in enumerate(self.test_cases, 1):
+            results = {engine: outputs[engine][i - 1] for engine in outputs}
+            counts = result_agreement(results['stanza'], results['rules'])
+            totals = [total + count for total, count in zip(totals, counts)]
+            marker = "✓" if counts[0] == counts[1] == counts[3] else "✗"
+            print(f"{marker} Test {i}: {test_case['name']}")
+            if marker == "✗":
+                print(f"  Stanza: {results['stanza']}")
+                print(f"  Rules:  {results['rules']}")
+        
+        reference, candidate, shared, same_label = totals
+        latency = {engine: value * 1000 / len(self.test_cases) for engine, value in seconds.items()}
+        print("-" * 40)
+        print(f"Aspect recall {shared / reference if reference else 1.0:.1%}, "
+              f"precision {shared / candidate if candidate else 1.0:.1%}, "
+              f"label agreement {same_label / shared if shared else 1.0:.1%}")
+        print(f"Mean latency: Stanza {latency['stanza']:.2f} ms, rules {latency['rules']:.2f} ms "
+              f"({latency['stanza'] / latency['rules'] if latency['rules'] else 0.0:.1f}x faster)")
+        return {'reference': reference, 'candidate': candidate, 'shared': shared,
+                'same_label': same_label, 'latency_ms': latency}
+    
     def run_single_test(self, text, stop_words, nlp, sid):
         """
         Run ABSA on a single text input.
@@ -125,12 +247,15 @@ class TestRunner:
         print(f"Added test case: {name}")
 
 
-# Global test runner instance
-test_runner = TestRunner()
+# Global test runner instance, created on first use
+test_runner = None
 
 
 def get_test_runner():
     """Get the global test runner instance."""
+    global test_runner
+    if test_runner is None:
+        test_runner = TestRunner()
     return test_runner
 
 
@@ -146,7 +271,7 @@ if __name__ == "__main__":
         
         if nlp and sid and stop_words:
             # Run test examples
-            test_runner.run_all_tests(stop_words, nlp, sid)
+            get_test_runner().run_all_tests(stop_words, nlp, sid)
         else:
             print("Failed to initialize components")
     else:
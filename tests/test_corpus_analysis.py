@@ -0,0 +1,83 @@
+"""
+Tests for Corpus Analysis
+
+A corpus is analyzed through analyze_corpus() with a stub analyzer, so
+no models are needed; records the reader cannot parse must reach the
+dead-letter file without stopping the run.
+"""
+
+import json
+
+import pytest
+
+pytest.importorskip('nltk')
+
+from src.core.corpus_analysis import analyze_corpus
+from src.utils.corpus_io import CorpusReader, DeadLetterWriter, MalformedRecordError, ResultWriter
+
+CORPUS_WITH_BAD_LINE = (
+    b'{"id": "a", "text": "good battery"}\n'
+    b'{"id": "b", "text": "broken\n'
+    b'{"id": "c", "text": "poor camera"}\n'
+)
+
+
+class StubAnalyzer:
+    """Finds every word as an aspect with a neutral score."""
+    
+    def imap(self, texts, return_exceptions=False):
+        for text in texts:
+            yield [[word, 0.0] for word in text.split()]
+
+
+def read_jsonl(path):
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+def run(tmp_path, content, mapped=False):
+    corpus = tmp_path / 'corpus.jsonl'
+    corpus.write_bytes(content)
+    if mapped:
+        pytest.importorskip('numpy')
+        from src.utils.mapped_corpus import MappedCorpus
+        documents = MappedCorpus(str(corpus))
+    else:
+        documents = CorpusReader(str(corpus))
+    
+    output, dead = tmp_path / 'out.jsonl', tmp_path / 'dead.jsonl'
+    with ResultWriter(str(output)) as writer, DeadLetterWriter(str(dead)) as dead_letter:
+        count = analyze_corpus(StubAnalyzer(), documents, writer, dead_letter)
+    return count, read_jsonl(output), read_jsonl(dead)
+
+
+@pytest.mark.parametrize('mapped', [False, True], ids=['stream', 'mapped'])
+def test_malformed_json_line_goes_to_dead_letter(tmp_path, mapped):
+    count, results, dead = run(tmp_path, CORPUS_WITH_BAD_LINE, mapped)
+    
+    assert count == 3
+    assert [record['id'] for record in results] == ['a', 'c']
+    assert len(dead) == 1
+    assert dead[0]['id'] == 1
+    assert dead[0]['text'] == '{"id": "b", "text": "broken'
+    assert dead[0]['error'].startswith('MalformedRecordError')
+
+
+def test_invalid_utf8_line_goes_to_dead_letter(tmp_path):
+    content = b'{"text": "first"}\n{"text": "bad \xff byte"}\n{"text": "last"}\n'
+    count, results, dead = run(tmp_path, content)
+    
+    assert count == 3
+    assert [record['input_text'] for record in results] == ['first', 'last']
+    assert [record['id'] for record in dead] == [1]
+    assert 'UnicodeDecodeError' in dead[0]['error']
+
+
+def test_reader_keeps_numbering_after_malformed_record(tmp_path):
+    corpus = tmp_path / 'corpus.jsonl'
+    corpus.write_bytes(b'{"text": "x"}\n[oops\n{"text": "y"}\n')
+    documents = list(CorpusReader(str(corpus)))
+    
+    assert documents[0] == (0, 'x')
+    assert documents[1][0] == 1 and isinstance(documents[1][1], MalformedRecordError)
+    assert documents[2] == (2, 'y')
@@ -0,0 +1,90 @@
+"""
+Tests for the Long-Document Path
+
+Documents with more than LONG_DOCUMENT_SENTENCES sentences are parsed in
+one bulk call; they must get exactly the per-sentence results, with the
+engine the caller asked for. A stub parser stands in for Stanza, but the
+NLTK tokenizer and tagger data must be installed.
+"""
+
+import pytest
+
+nltk = pytest.importorskip('nltk')
+
+from src.core import absa_engine
+from src.core.absa_engine import aspect_sentiment_analysis
+from src.utils.text_processing import pos_tag_words
+
+LONG_TEXT = (
+    "The battery life is good. The camera quality is poor. "
+    "The screen is bright and sharp. The speaker sounds good. "
+    "The charger is slow but the case is solid."
+)
+
+
+class Word:
+    def __init__(self, id, text):
+        self.id = id
+        self.text = text
+
+
+class Sentence:
+    def __init__(self, text):
+        words = [Word(i, token) for i, token in enumerate(text.split(), 1)]
+        root = Word(0, 'ROOT')
+        # A chain parse: every word modifies the next one, the last is the root
+        heads = words[1:] + [root]
+        self.dependencies = [(head, 'root' if head is root else 'amod', word)
+                             for head, word in zip(heads, words)]
+
+
+class Document:
+    def __init__(self, text):
+        self.sentences = [Sentence(text)]
+
+
+class StubParser:
+    """Stands in for a Stanza pipeline, counting its bulk calls."""
+    
+    def __init__(self):
+        self.bulk_calls = 0
+    
+    def __call__(self, text):
+        return Document(text)
+    
+    def bulk_process(self, texts):
+        self.bulk_calls += 1
+        return [Document(text) for text in texts]
+
+
+class StubScorer:
+    def polarity_scores(self, text):
+        return {'compound': 0.5 if 'good' in text else -0.5 if 'poor' in text else 0.0}
+
+
+@pytest.fixture
+def nltk_data():
+    try:
+        nltk.sent_tokenize("a. b.")
+        pos_tag_words(nltk.word_tokenize("a b"))
+    except LookupError:
+        pytest.skip("NLTK tokenizer or tagger data is not installed")
+
+
+def test_long_document_keeps_the_requested_engine(monkeypatch, nltk_data):
+    # The configured default engine differs from the one the caller asks for
+    batch = absa_engine.aspect_sentiment_analysis_batch
+    names = batch.__code__.co_varnames[batch.__code__.co_argcount - len(batch.__defaults__):]
+    defaults = dict(zip(names, batch.__defaults__), engine='rules')
+    monkeypatch.setattr(batch, '__defaults__', tuple(defaults.values()))
+    
+    monkeypatch.setattr(absa_engine, 'LONG_DOCUMENT_SENTENCES', 2)
+    parser = StubParser()
+    bulk = aspect_sentiment_analysis(LONG_TEXT, set(), parser, StubScorer(), engine='stanza')
+    assert parser.bulk_calls == 1
+    
+    monkeypatch.setattr(absa_engine, 'LONG_DOCUMENT_SENTENCES', 10 ** 6)
+    per_sentence = aspect_sentiment_analysis(LONG_TEXT, set(), StubParser(), StubScorer(),
+                                             engine='stanza')
+    
+    assert bulk == per_sentence
@@ -0,0 +1,113 @@
+"""
+Tests for the Analysis Manifest
+
+Stored results may only be reused for documents whose text and engine
+fingerprint are unchanged, and must only be committed once the output
+of their documents is written.
+"""
+
+import pytest
+
+pytest.importorskip('nltk')
+
+from src.core.corpus_analysis import analyze_corpus
+from src.utils.manifest import MAX_LOOKUP_IDS, Manifest, _id_key
+
+
+class StubAnalyzer:
+    """Finds every word as an aspect and counts the texts it analyzes."""
+    
+    def __init__(self):
+        self.analyzed = []
+    
+    def imap(self, texts, return_exceptions=False):
+        for text in texts:
+            self.analyzed.append(text)
+            yield [[word, 0.0] for word in text.split()]
+
+
+class ListWriter:
+    """Collects written document ids; position() counts them."""
+    
+    def __init__(self):
+        self.ids = []
+    
+    def write(self, doc_id, details):
+        self.ids.append(doc_id)
+    
+    def position(self):
+        return len(self.ids)
+
+
+class ManifestCheckpoint:
+    """Records how many manifest rows were committed at every checkpoint."""
+    
+    def __init__(self, manifest):
+        self.manifest = manifest
+        self.saves = []
+    
+    def save(self, records, input_offset, output_offset, *args):
+        self.saves.append((records, output_offset, len(self.manifest)))
+
+
+def test_changed_text_is_analyzed_again(tmp_path):
+    path = str(tmp_path / 'manifest.sqlite')
+    with Manifest(path, 'v1') as manifest:
+        manifest.record('a', "good battery", [['battery', 0.4]])
+        manifest.record('b', "poor camera", [['camera', -0.4]])
+    
+    with Manifest(path, 'v1') as manifest:
+        stored = manifest.lookup([('a', "Good   battery"), ('b', "poor camera and screen")])
+    
+    # Case and spacing do not count as a change, new words do
+    assert stored == [[['battery', 0.4]], None]
+
+
+def test_fingerprint_change_invalidates_everything(tmp_path):
+    path = str(tmp_path / 'manifest.sqlite')
+    with Manifest(path, 'v1') as manifest:
+        manifest.record('a', "good battery", [['battery', 0.4]])
+        manifest.record(1, "fast delivery", [['delivery', 0.2]])
+    
+    with Manifest(path, 'v2') as manifest:
+        assert manifest.lookup([('a', "good battery"), (1, "fast delivery")]) == [None, None]
+
+
+def test_lookup_spans_several_blocks(tmp_path):
+    documents = [(number, f"text {number}") for number in range(2 * MAX_LOOKUP_IDS + 7)]
+    with Manifest(str(tmp_path / 'manifest.sqlite'), 'v1') as manifest:
+        for doc_id, text in documents:
+            manifest.record(doc_id, text, [[text, float(doc_id)]])
+        manifest.commit()
+        
+        # Ids 1 and '1' are different documents
+        stored = manifest.lookup(documents + [('1', "text 1")])
+    
+    assert stored[:-1] == [[[text, float(doc_id)]] for doc_id, text in documents]
+    assert stored[-1] is None
+
+
+def test_results_are_committed_after_their_output(tmp_path):
+    path = str(tmp_path / 'manifest.sqlite')
+    documents = [(number, f"word{number}") for number in range(7)]
+    writer = ListWriter()
+    
+    with Manifest(path, 'v1') as manifest:
+        commit = manifest.commit
+        
+        def checked_commit():
+            written = {_id_key(doc_id) for doc_id in writer.ids}
+            assert {row[0] for row in manifest._pending} <= written
+            commit()
+        
+        manifest.commit = checked_commit
+        checkpoint = ManifestCheckpoint(manifest)
+        analyze_corpus(StubAnalyzer(), documents, writer, checkpoint=checkpoint, checkpoint_every=3,
+                       manifest=manifest, manifest_block_size=5)
+        # Every checkpointed document is in the manifest
+        assert checkpoint.saves == [(3, 3, 3), (6, 6, 6), (7, 7, 7)]
+    
+    analyzer = StubAnalyzer()
+    with Manifest(path, 'v1') as manifest:
+        analyze_corpus(analyzer, documents + [(7, "new")], ListWriter(), manifest=manifest)
+    assert analyzer.analyzed == ["new"]
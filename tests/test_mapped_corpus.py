@@ -0,0 +1,58 @@
+"""
+Tests for the Memory-Mapped Corpus Reader
+
+MappedCorpus must number and resume documents exactly like CorpusReader,
+so record ids, checkpoints and manifests do not depend on the reader.
+"""
+
+import pytest
+
+pytest.importorskip('numpy')
+
+from src.utils.corpus_io import CorpusReader
+from src.utils.mapped_corpus import MappedCorpus
+
+JSONL_WITH_BLANK_LINES = (
+    '{"text": "a"}\n'
+    '   \n'
+    '\t\r\n'
+    '\n'
+    '{"text": "b"}\n'
+    ' \n'
+    '{"id": "x", "text": "c"}'
+)
+
+
+def write_corpus(tmp_path, content, name='corpus.jsonl'):
+    path = tmp_path / name
+    path.write_bytes(content.encode('utf-8'))
+    return str(path)
+
+
+def test_blank_lines_are_skipped_like_corpus_reader(tmp_path):
+    path = write_corpus(tmp_path, JSONL_WITH_BLANK_LINES)
+    expected = list(CorpusReader(path))
+    
+    with MappedCorpus(path) as corpus:
+        assert list(corpus) == expected
+        assert len(corpus) == 3
+        assert corpus[-1] == expected[-1]
+    assert expected == [(0, 'a'), (1, 'b'), ('x', 'c')]
+
+
+def test_resume_offset_matches_corpus_reader(tmp_path):
+    path = write_corpus(tmp_path, JSONL_WITH_BLANK_LINES)
+    reader = CorpusReader(path)
+    documents = iter(reader)
+    next(documents)
+    
+    with MappedCorpus(path, start_offset=reader.offset) as corpus:
+        assert list(corpus) == list(CorpusReader(path, start_offset=reader.offset,
+                                                 start_record=1))
+
+
+def test_text_corpus_keeps_every_line(tmp_path):
+    path = write_corpus(tmp_path, 'first\n\n  \nlast\n', name='corpus.txt')
+    
+    with MappedCorpus(path) as corpus:
+        assert list(corpus) == list(CorpusReader(path))
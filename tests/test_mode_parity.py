@@ -0,0 +1,41 @@
+"""
+Tests for the Single-Pass Engine Mode
+
+Checks that the single-pass mode gives exactly the results of the
+two-pass mode on every predefined test case; a failing case is one where
+the taggers disagree (see absa_engine.prepare_parsed_sentence). Needs the
+Stanza models on disk, so it is skipped where they were never downloaded.
+"""
+
+import pytest
+
+pytest.importorskip('nltk')
+pytest.importorskip('stanza')
+
+from src.core.absa_engine import aspect_sentiment_analysis
+from src.models.model_manager import get_model_manager
+from src.utils.text_processing import get_stopwords
+from tests.test_cases import TestRunner
+
+TEST_CASES = TestRunner().test_cases
+
+
+@pytest.fixture(scope='module')
+def models():
+    manager = get_model_manager()
+    if not manager.stanza_models_available():
+        pytest.skip("Stanza models are not downloaded")
+    if not manager.setup_all():
+        pytest.skip("Models could not be initialized")
+    nlp, sid = manager.get_models()
+    return get_stopwords(), nlp, sid
+
+
+@pytest.mark.parametrize('test_case', TEST_CASES, ids=[case['name'] for case in TEST_CASES])
+def test_single_pass_matches_two_pass(models, test_case):
+    stop_words, nlp, sid = models
+    two_pass = aspect_sentiment_analysis(test_case['text'], stop_words, nlp, sid)
+    single_pass = aspect_sentiment_analysis(test_case['text'], stop_words, nlp, sid,
+                                            single_pass=True)
+    
+    assert single_pass == two_pass
@@ -0,0 +1,73 @@
+"""
+Tests for the Result Cache
+
+Results are keyed by the normalized (and, like the engine does it,
+truncated) text and the engine fingerprint; the in-memory tier is a
+bounded LRU and the SQLite tier outlives the cache instance.
+"""
+
+import pytest
+
+pytest.importorskip('nltk')
+
+from src.utils.cache import LRUCache, ResultCache
+
+RESULTS = [['battery', 0.44], ['camera', -0.47]]
+
+
+def test_texts_differing_in_case_and_spacing_share_results():
+    cache = ResultCache('v1', max_size=10)
+    cache.put("The battery is good", RESULTS)
+    
+    assert cache.get("the  battery is\tGOOD ") == RESULTS
+    assert cache.get("the battery is bad") is None
+    assert cache.stats()['hits'] == 1
+
+
+def test_fingerprint_is_part_of_the_key():
+    assert ResultCache('v1', 10).key("text") != ResultCache('v2', 10).key("text")
+    assert ResultCache('v1', 10).key("text") == ResultCache('v1', 10).key("TEXT")
+
+
+def test_key_follows_the_truncated_text():
+    cache = ResultCache('v1', 10, max_chars=14)
+    # Cut after "cccc" and after "bbbb": different texts reach the engine
+    assert cache.key("aaaa bbbb cccc dddd") != cache.key("aaaa  bbbb cccc dddd")
+    # Both cut after "cccc", so the engine sees the same words
+    assert cache.key("aaaa bbbb cccc dddd") == cache.key("aaaa bbbb cccc eeee")
+
+
+def test_returned_results_are_copies():
+    cache = ResultCache('v1', 10)
+    cache.put("text", RESULTS)
+    cache.get("text")[0][1] = 1.0
+    
+    assert cache.get("text") == RESULTS
+
+
+def test_lru_evicts_the_least_recently_used_entry():
+    cache = LRUCache(max_size=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    cache.get('a')
+    cache.put('c', 3)
+    
+    assert 'b' not in cache
+    assert cache.get('a') == 1 and cache.get('c') == 3
+    assert cache.stats()['evictions'] == 1
+
+
+def test_sqlite_tier_persists_across_instances(tmp_path):
+    path = str(tmp_path / 'cache.sqlite')
+    cache = ResultCache('v1', 10, path)
+    cache.put_many([("first text", RESULTS), ("second text", [])])
+    cache.close()
+    
+    reopened = ResultCache('v1', 10, path)
+    try:
+        assert reopened.get("First text") == RESULTS
+        assert reopened.get("second text") == []
+        assert reopened.stats()['disk_hits'] == 2
+        assert ResultCache('v2', 10, path).get("first text") is None
+    finally:
+        reopened.close()